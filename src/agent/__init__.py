@@ -1,3 +1,11 @@
-from .build import observation_screenshot_callback, take_initial_screenshot
+from .build import observation_screenshot_callback, take_initial_screenshot, trace_step_callback
 from .executor import SandboxExecutor
 from .sandbox_agent import SandboxCodeAgent
+
+__all__ = [
+    "SandboxCodeAgent",
+    "SandboxExecutor",
+    "observation_screenshot_callback",
+    "take_initial_screenshot",
+    "trace_step_callback",
+]
@@ -1,6 +1,10 @@
+import time
+
 from PIL import Image
 from smolagents import ActionStep, LogLevel
 
+from telemetry import TRACER, span
+
 from .sandbox_agent import SandboxCodeAgent
 
 
@@ -25,6 +29,7 @@ def take_initial_screenshot(agent: SandboxCodeAgent) -> None:
             initial_step.observations = f"⚠️ Failed to save initial screenshot: {e}"
 
 
+@span("agent.screenshot")
 def observation_screenshot_callback(memory_step: ActionStep, agent: SandboxCodeAgent) -> None:
     """Enhanced callback that takes screenshots with the FastAPI sandbox client."""
     host_shared = agent.python_executor.vm.cfg.host_container_shared_dir
@@ -63,3 +68,17 @@ def observation_screenshot_callback(memory_step: ActionStep, agent: SandboxCodeA
             # print(f"Captured a VM screenshot: {image.size[0]}x{image.size[1]} pixels")
         except Exception as e:
             memory_step.observations = f"⚠️ Failed to load screenshot: {e}"
+
+
+def trace_step_callback(memory_step: ActionStep, agent: SandboxCodeAgent) -> None:
+    """Record the finished step (LLM call + code execution) as a timing span."""
+    duration = memory_step.duration or 0.0
+    # The synthetic step smolagents appends after max_steps only carries end_time and duration
+    start = memory_step.start_time or (memory_step.end_time or time.time()) - duration
+    TRACER.add(
+        "agent.step",
+        start,
+        duration,
+        step=memory_step.step_number,
+        error=memory_step.error is not None,
+    )
@@ -20,6 +20,7 @@ from websocket import create_connection
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 from sandbox.configs import SandboxVMConfig
 from sandbox.sandbox import SandboxVMManager
+from telemetry import span
 
 
 class SandboxExecutor(RemotePythonExecutor):
@@ -59,28 +60,7 @@ class SandboxExecutor(RemotePythonExecutor):
             self.cleanup()
             raise
 
-    def _wait_for_services(self, retries: int = 10, delay: float = 5.0):
-        fastapi_url = f"http://{self.vm.cfg.host_sandbox_server_host}:{self.vm.cfg.host_sandbox_server_port}/health"
-        jupyter_url = f"http://{self.vm.cfg.host_sandbox_jupyter_kernel_host}:{self.vm.cfg.host_sandbox_jupyter_kernel_port}/api/kernels"
-
-        for attempt in range(1, retries + 1):
-            fastapi_ok = jupyter_ok = False
-            try:
-                fastapi_ok = requests.get(fastapi_url, timeout=2).status_code == 200
-            except Exception as e:
-                self.logger.log(f"⏳ FastAPI not ready (attempt {attempt}): {e}", level=LogLevel.DEBUG)
-            try:
-                jupyter_ok = requests.get(jupyter_url, timeout=2).status_code == 200
-            except Exception as e:
-                self.logger.log(f"⏳ Jupyter Kernel Gateway not ready (attempt {attempt}): {e}", level=LogLevel.DEBUG)
-
-            if fastapi_ok and jupyter_ok:
-                self.logger.log("✅ Both FastAPI and Jupyter Kernel Gateway are reachable.", level=LogLevel.INFO)
-                return
-
-            time.sleep(delay)
-        raise RuntimeError("❌ Required services are not reachable after retries.")
-
+    @span("executor.init_kernel")
     def _initialize_kernel_connection(self, retries: int = 5, delay: float = 2.0):
         self.logger.log_rule("🧠 Kernel Initialization")
         self.logger.log("🔗 Fetch existing kernels", level=LogLevel.DEBUG)
@@ -180,6 +160,7 @@ class SandboxExecutor(RemotePythonExecutor):
         self.logger.log(f"📄 Execution logs:\n{logs}", level=LogLevel.DEBUG)
         self.logger.log("result", result, level=LogLevel.DEBUG)
 
+    @span("executor.install_packages")
     def install_packages(self, additional_imports: list[str]):
         packages = additional_imports + ["smolagents", "pyautogui"]
         self.logger.log(f"📆 Installing packages: {', '.join(packages)}", level=LogLevel.DEBUG)
@@ -239,6 +220,38 @@ class SandboxExecutor(RemotePythonExecutor):
             self.logger.log_error(f"💥 Code execution failed: {e}")
             raise
 
+    def attach_logger(self, logger: AgentLogger):
+        """Rebind the executor (and its VM + SSH session) to another agent's logger."""
+        self.logger = logger
+        if hasattr(self, "vm"):
+            self.vm.logger = logger
+            self.vm.ssh.logger = logger
+
+    def is_healthy(self) -> bool:
+        """Cheap liveness check of the FastAPI server, the kernel gateway and our websocket."""
+        if self._exited or not self.ws or not self.ws.connected:
+            return False
+        try:
+            self.vm.sandbox_client.health()
+            return requests.get(f"{self.base_url}/api/kernels/{self.kernel_id}", timeout=5).status_code == 200
+        except Exception as e:
+            self.logger.log(f"🩺 Health check failed: {e}", level=LogLevel.DEBUG)
+            return False
+
+    def reset(self):
+        """Restart the kernel so the VM can be handed to the next task with a clean interpreter.
+
+        Only the interpreter is reset: the guest's disk, files, running processes and
+        installed packages stay as the previous task left them.
+        """
+        self.logger.log("♻️ Restarting sandbox kernel...", level=LogLevel.INFO)
+        if self.ws:
+            self.ws.close()
+        r = requests.post(f"{self.base_url}/api/kernels/{self.kernel_id}/restart", timeout=30)
+        if r.status_code != 200:
+            raise RuntimeError(f"❌ Kernel restart failed: {r.status_code} — {r.text}")
+        self._initialize_kernel_connection()
+
     def cleanup(self):
         if getattr(self, "_exited", False):
             return
@@ -9,9 +9,11 @@ from .executor import SandboxExecutor
 class SandboxCodeAgent(BaseCodeAgent):
     """Extends the original CodeAgent with sandbox VM support."""
 
-    def __init__(self, *args, executor_type="local", executor_kwargs=None, **kwargs):
+    def __init__(self, *args, executor_type="local", executor_kwargs=None, executor=None, **kwargs):
         self.executor_type = executor_type
         self.executor_kwargs = executor_kwargs or {}
+        # An already booted executor (e.g. leased from a warm pool) is owned by whoever handed it in
+        self._external_executor = executor
         super().__init__(*args, executor_type=executor_type, executor_kwargs=executor_kwargs, **kwargs)
 
         # Inject SSH and sandbox client if sandbox executor
@@ -21,6 +23,9 @@ class SandboxCodeAgent(BaseCodeAgent):
 
     def create_python_executor(self):
         if self.executor_type == "sandbox":
+            if self._external_executor is not None:
+                self._external_executor.attach_logger(self.logger)
+                return self._external_executor
             executor = SandboxExecutor(
                 additional_imports=self.additional_authorized_imports,
                 logger=self.logger,
@@ -32,6 +37,9 @@ class SandboxCodeAgent(BaseCodeAgent):
 
     def cleanup(self):
         """Clean up sandbox or other remote resources if needed."""
+        if self._external_executor is not None:
+            self.logger.log("🔙 Executor is externally owned, skipping cleanup", level=LogLevel.DEBUG)
+            return
         try:
             if hasattr(self, "python_executor") and hasattr(self.python_executor, "cleanup"):
                 self.logger.log("🧹 Calling cleanup on python executor...", level=LogLevel.INFO)
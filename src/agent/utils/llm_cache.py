@@ -0,0 +1,186 @@
+"""Content-addressed cache of LLM responses.
+
+A completion is keyed by the SHA-256 of everything that determines it: the
+model id and parameters, the call's stop sequences / response format, and
+every message with its text and the raw pixels of its images. Re-running a
+task set after an infra fix then replays the model calls up to the point
+where the run diverges, instead of paying for them again.
+
+Layout (one small JSON file per response, LRU by mtime like the setup
+snapshots):
+
+    <root>/<key[:2]>/<key>.json     {"message": {...}, "input_tokens": n, "output_tokens": n}
+
+In replay-only mode a miss raises `CacheMiss` instead of calling the model,
+which makes infra benchmarking runs exactly reproducible.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from smolagents.models import ChatMessage, Model
+
+logger = logging.getLogger(__name__)
+
+# Never part of a key (and never written to disk)
+_SECRET_PARAMS = ("api_key", "token", "authorization")
+
+
+class CacheMiss(RuntimeError):
+    """A replay-only cache has no response for this prompt."""
+
+
+def _underlying(model: Model) -> Model:
+    """The model at the bottom of a wrapper chain (e.g. a `RateLimitedModel`)."""
+    while isinstance(getattr(model, "model", None), Model):
+        model = model.model
+    return model
+
+
+def _digest_part(part: Any) -> Any:
+    if not isinstance(part, dict):
+        return part
+    if part.get("type") == "image":
+        image = part.get("image")
+        h = hashlib.sha256()
+        if hasattr(image, "tobytes"):  # PIL image: hash mode, size and pixels, not an encoding of them
+            h.update(f"{image.mode}:{image.size}".encode())
+            h.update(image.tobytes())
+        else:
+            h.update(image if isinstance(image, bytes) else str(image).encode())
+        return {"type": "image", "sha256": h.hexdigest()}
+    return part
+
+
+def cache_key(model: Model, messages: List[Dict[str, Any]], **call_kwargs: Any) -> str:
+    base = _underlying(model)
+    params = {k: v for k, v in base.kwargs.items() if not any(s in k.lower() for s in _SECRET_PARAMS)}
+    tools = call_kwargs.pop("tools_to_call_from", None)
+    payload = {
+        "model": [type(base).__name__, base.model_id, params],
+        "call": {**call_kwargs, "tools": [t.name for t in tools or []]},
+        "messages": [
+            {
+                "role": str(m.get("role")),
+                "content": [_digest_part(p) for p in m["content"]]
+                if isinstance(m.get("content"), list)
+                else m.get("content"),
+            }
+            for m in messages
+        ],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, root: Path, budget_bytes: int, replay_only: bool = False):
+        self.root = Path(root)
+        self.budget_bytes = budget_bytes
+        self.replay_only = replay_only
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+        self._size = sum(p.stat().st_size for p in self.root.glob("*/*.json"))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"root": self.root, "budget_bytes": self.budget_bytes, "replay_only": self.replay_only}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text())
+            os.utime(path)  # Mark as recently used
+        except (OSError, json.JSONDecodeError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        data = json.dumps(entry)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(data)
+        tmp.replace(path)
+        with self._lock:
+            self._size += len(data)
+            over = self._size > self.budget_bytes
+        if over:
+            self.enforce_budget()
+
+    def enforce_budget(self) -> None:
+        """Evict least recently used responses until the cache is back under 90% of its budget."""
+        entries = []
+        for p in self.root.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        size = sum(e[1] for e in entries)
+        evicted = 0
+        for _, nbytes, p in entries:
+            if size <= self.budget_bytes * 0.9:
+                break
+            p.unlink(missing_ok=True)
+            size -= nbytes
+            evicted += 1
+        with self._lock:
+            self._size = size
+            self.evictions += evicted
+        logger.info("🗑 Evicted %d cached LLM response(s), %.1fM left", evicted, size / 1024**2)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "size_mb": round(self._size / 1024**2, 1),
+                "replay_only": self.replay_only,
+            }
+
+
+class CachedModel(Model):
+    """Serves completions from a `ResponseCache`, calling the wrapped model only on a miss."""
+
+    def __init__(self, model: Model, cache: ResponseCache):
+        super().__init__(model_id=model.model_id)
+        self.model = model
+        self.cache = cache
+
+    def generate(self, messages: List[Dict[str, Any]], **kwargs) -> ChatMessage:
+        key = cache_key(self.model, messages, **kwargs)
+        entry = self.cache.get(key)
+        if entry is None:
+            if self.cache.replay_only:
+                raise CacheMiss(f"No cached response for prompt {key[:16]} (replay-only)")
+            message = self.model.generate(messages, **kwargs)
+            entry = {
+                "message": json.loads(message.model_dump_json()),
+                "input_tokens": self.model.last_input_token_count,
+                "output_tokens": self.model.last_output_token_count,
+            }
+            self.cache.put(key, entry)
+        self.last_input_token_count = entry["input_tokens"]
+        self.last_output_token_count = entry["output_tokens"]
+        return ChatMessage.from_dict(entry["message"])
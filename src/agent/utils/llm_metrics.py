@@ -0,0 +1,47 @@
+"""Per-call timing of LLM completions.
+
+`MeteredModel` sits directly on the provider model, below the rate limiter
+and the response cache, so it sees exactly the calls that reach the provider
+(cache hits and limiter queueing are not part of its latency). Each call is
+recorded as an `llm.call` span with its outcome and token counts, which
+`telemetry.metrics` turns into call counters and latency histograms.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List
+
+from smolagents.models import ChatMessage, Model
+
+from telemetry import TRACER
+
+from .rate_limit import is_rate_limit
+
+
+class MeteredModel(Model):
+    """Wraps a smolagents `Model` and records every completion as an `llm.call` span."""
+
+    def __init__(self, model: Model):
+        super().__init__(model_id=model.model_id)
+        self.model = model
+
+    def generate(self, messages: List[Dict[str, Any]], *args, **kwargs) -> ChatMessage:
+        start, t0 = time.time(), time.perf_counter()
+        try:
+            message = self.model.generate(messages, *args, **kwargs)
+        except Exception as e:
+            outcome = "rate_limited" if is_rate_limit(e) else "error"
+            TRACER.add("llm.call", start, time.perf_counter() - t0, outcome=outcome, error=type(e).__name__)
+            raise
+        self.last_input_token_count = self.model.last_input_token_count
+        self.last_output_token_count = self.model.last_output_token_count
+        TRACER.add(
+            "llm.call",
+            start,
+            time.perf_counter() - t0,
+            outcome="ok",
+            input_tokens=self.last_input_token_count,
+            output_tokens=self.last_output_token_count,
+        )
+        return message
@@ -2,9 +2,13 @@ import json
 import socket
 import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Set
+
+from filelock import FileLock
 
 PORTMAP_FILE = Path("portmap.json")
+# Serialises allocations between processes (e.g. several workers on one host)
+PORTMAP_LOCK = FileLock(str(PORTMAP_FILE) + ".lock")
 PORT_KEYS = ["ssh", "vnc", "sandbox_server", "jupyter"]
 START_PORT = 60000
 
@@ -17,22 +21,32 @@ class PortManager:
 
     def get_ports(self, container_name: str) -> Dict[str, int]:
         """Return the ports assigned to a container. Create new ones if not found."""
-        with self._lock:
+        with self._lock, PORTMAP_LOCK:
+            # Another process may have allocated ports since we last looked
+            self._portmap = self._load_portmap()
             if container_name in self._portmap:
                 return self._portmap[container_name]
 
+            taken = {port for assigned in self._portmap.values() for port in assigned.values()}
             ports = {}
             for key in PORT_KEYS:
-                port = self._find_open_port()
+                port = self._find_open_port(taken)
                 ports[key] = port
 
             self._portmap[container_name] = ports
             self._save_portmap()
             return ports
 
-    def _find_open_port(self) -> int:
-        """Return the next available open port."""
-        while not self._is_port_free(self._next):
+    def release(self, container_name: str) -> None:
+        """Forget the ports of a container that has been torn down for good."""
+        with self._lock, PORTMAP_LOCK:
+            self._portmap = self._load_portmap()
+            if self._portmap.pop(container_name, None) is not None:
+                self._save_portmap()
+
+    def _find_open_port(self, taken: Set[int]) -> int:
+        """Return the next open port not already assigned to any container."""
+        while self._next in taken or not self._is_port_free(self._next):
             self._next += 1
         port = self._next
         self._next += 1
@@ -57,7 +71,7 @@ class PortManager:
 
     def reset(self):
         """Clear all mappings (e.g., for test/debug)."""
-        with self._lock:
+        with self._lock, PORTMAP_LOCK:
             self._portmap = {}
             self._save_portmap()
 
@@ -0,0 +1,246 @@
+"""Shared adaptive rate limiter for LLM calls.
+
+All agents of a run (and of every process on the host that points at the
+same state file: isolated task processes, several workers) draw from one
+pair of token buckets, requests per minute and tokens per minute. The state
+lives in a small JSON file guarded by a `FileLock`, like the port map.
+
+On top of the buckets, each process caps its in-flight calls with a shared
+AIMD window. A provider 429 halves it and pauses everyone for the
+`Retry-After` period. A completion slower than `slow_latency` shrinks it a
+little. Every other success grows it by 1/window, up to `max_concurrency`.
+`RateLimitedModel` retries 429s itself, so a rate-limit hit costs a wait
+instead of a whole agent step.
+
+The time each call spent waiting for the limiter is recorded as an
+`llm.queue_wait` span and summarised by `RateLimiter.stats()`.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from filelock import FileLock
+from smolagents.models import ChatMessage, Model
+
+from telemetry import TRACER
+
+logger = logging.getLogger(__name__)
+
+# Prompt tokens of one 1280x800 screenshot at high detail (6 tiles of 170 + 85 base)
+IMAGE_TOKENS = 1105
+CHARS_PER_TOKEN = 4
+
+
+@dataclass
+class RateLimits:
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    max_concurrency: int = 8  # Ceiling of the AIMD window
+    min_concurrency: int = 1
+    slow_latency: Optional[float] = None  # Completions slower than this count as congestion
+    output_tokens: int = 1000  # Reserved per call until the real usage is known
+    max_retries: int = 5  # 429s absorbed per call before giving up
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough prompt size: text length / 4 plus a fixed cost per image."""
+    chars = images = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for part in content or []:
+            if part.get("type") == "image":
+                images += 1
+            else:
+                chars += len(part.get("text") or "")
+    return chars // CHARS_PER_TOKEN + images * IMAGE_TOKENS
+
+
+def is_rate_limit(exc: BaseException) -> bool:
+    return getattr(exc, "status_code", None) == 429 or "RateLimit" in type(exc).__name__
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """`Retry-After` seconds from the provider response attached to the exception, if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    def __init__(self, limits: RateLimits, state_path: Path):
+        self.limits = limits
+        self.state_path = Path(state_path)
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file_lock = FileLock(str(self.state_path) + ".lock")
+        self._cond = threading.Condition()
+        self._inflight = 0
+        self._window = float(limits.max_concurrency)
+        self._calls = self._rate_limited = 0
+        self._wait_total = self._wait_max = 0.0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Isolated task processes get their own window; the buckets stay shared through the file
+        return {"limits": self.limits, "state_path": self.state_path}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    # ------------------------------------------------------------------
+    # Shared buckets ----------------------------------------------------
+    # ------------------------------------------------------------------
+    @contextlib.contextmanager
+    def _shared(self) -> Iterator[Dict[str, float]]:
+        """Read-refill-modify-write the shared bucket state under the file lock."""
+        with self._file_lock:
+            now = time.time()
+            try:
+                state = json.loads(self.state_path.read_text())
+            except (OSError, json.JSONDecodeError):
+                state = {}
+            rpm, tpm = self.limits.requests_per_minute, self.limits.tokens_per_minute
+            elapsed = max(now - state.get("updated", now), 0.0)
+            state["requests"] = min(state.get("requests", rpm or 0) + elapsed * (rpm or 0) / 60, rpm or 0)
+            state["tokens"] = min(state.get("tokens", tpm or 0) + elapsed * (tpm or 0) / 60, tpm or 0)
+            state.setdefault("window", float(self.limits.max_concurrency))
+            state.setdefault("paused_until", 0.0)
+            state["updated"] = now
+            yield state
+            self.state_path.write_text(json.dumps(state))
+
+    def _delay(self, state: Dict[str, float], tokens: int) -> float:
+        """Seconds until both buckets can cover one request of `tokens` (0 = now)."""
+        delay = max(state["paused_until"] - state["updated"], 0.0)
+        rpm, tpm = self.limits.requests_per_minute, self.limits.tokens_per_minute
+        if rpm and state["requests"] < 1:
+            delay = max(delay, (1 - state["requests"]) * 60 / rpm)
+        if tpm and state["tokens"] < tokens:
+            delay = max(delay, (tokens - state["tokens"]) * 60 / tpm)
+        return delay
+
+    # ------------------------------------------------------------------
+    # Acquire / release -------------------------------------------------
+    # ------------------------------------------------------------------
+    def acquire(self, tokens: int) -> int:
+        """Block until a call of ~`tokens` may go out; returns the tokens actually reserved."""
+        start, t0 = time.time(), time.perf_counter()
+        if self.limits.tokens_per_minute:
+            tokens = min(tokens, int(self.limits.tokens_per_minute))  # a single call must always fit
+        with self._cond:
+            while self._inflight >= max(int(self._window), self.limits.min_concurrency):
+                self._cond.wait()
+            self._inflight += 1
+        try:
+            while True:
+                with self._shared() as state:
+                    self._window = state["window"]
+                    delay = self._delay(state, tokens)
+                    if not delay:
+                        state["requests"] -= 1
+                        state["tokens"] -= tokens
+                        break
+                time.sleep(min(delay, 1.0))
+        except BaseException:
+            self._leave()
+            raise
+
+        waited = time.perf_counter() - t0
+        TRACER.add("llm.queue_wait", start, waited, tokens=tokens)
+        with self._cond:
+            self._calls += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return tokens
+
+    def release(
+        self,
+        reserved: int,
+        used: Optional[int],
+        latency: float,
+        rate_limited: bool = False,
+        pause: Optional[float] = None,
+        failed: bool = False,
+    ) -> None:
+        """Settle the token reservation and feed the call's outcome into the AIMD window."""
+        limits = self.limits
+        with self._shared() as state:
+            if used is not None:
+                state["tokens"] -= used - reserved
+            window = state["window"]
+            if rate_limited:
+                window = window / 2
+                state["paused_until"] = max(state["paused_until"], state["updated"] + (pause or 1.0))
+            elif failed:
+                pass
+            elif limits.slow_latency and latency > limits.slow_latency:
+                window = window * 0.9
+            else:
+                window = window + 1 / window
+            state["window"] = min(max(window, limits.min_concurrency), limits.max_concurrency)
+            self._window = state["window"]
+        if rate_limited:
+            logger.warning("🚦 Provider rate limit hit, LLM window now %.1f", self._window)
+        self._leave(rate_limited)
+
+    def _leave(self, rate_limited: bool = False) -> None:
+        with self._cond:
+            self._inflight -= 1
+            self._rate_limited += rate_limited
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "calls": self._calls,
+                "rate_limited": self._rate_limited,
+                "queue_wait_total": round(self._wait_total, 3),
+                "queue_wait_mean": round(self._wait_total / self._calls, 3) if self._calls else 0.0,
+                "queue_wait_max": round(self._wait_max, 3),
+                "window": round(self._window, 2),
+                "limits": asdict(self.limits),
+            }
+
+
+class RateLimitedModel(Model):
+    """Wraps a smolagents `Model` so every completion goes through a `RateLimiter`."""
+
+    def __init__(self, model: Model, limiter: RateLimiter):
+        super().__init__(model_id=model.model_id)
+        self.model = model
+        self.limiter = limiter
+
+    def generate(self, messages: List[Dict[str, Any]], *args, **kwargs) -> ChatMessage:
+        estimate = estimate_tokens(messages) + self.limiter.limits.output_tokens
+        for attempt in range(self.limiter.limits.max_retries + 1):
+            reserved = self.limiter.acquire(estimate)
+            t0 = time.perf_counter()
+            try:
+                message = self.model.generate(messages, *args, **kwargs)
+            except Exception as e:
+                latency = time.perf_counter() - t0
+                if not is_rate_limit(e):
+                    self.limiter.release(reserved, None, latency, failed=True)
+                    raise
+                # Out of retries or not, a 429 still shrinks the window and pauses the other callers
+                pause = retry_after(e) or 2.0**attempt
+                self.limiter.release(reserved, None, latency, rate_limited=True, pause=pause)
+                if attempt == self.limiter.limits.max_retries:
+                    raise
+                continue
+            self.last_input_token_count = self.model.last_input_token_count
+            self.last_output_token_count = self.model.last_output_token_count
+            used = (self.last_input_token_count or 0) + (self.last_output_token_count or 0)
+            self.limiter.release(reserved, used or None, time.perf_counter() - t0)
+            return message
@@ -0,0 +1,196 @@
+"""TaskCatalog — the examples tree compiled into one indexed SQLite store.
+
+Every `examples/<tool>/<uid>/<uid>.json` becomes a row holding the parsed
+metadata plus side tables for tags, evaluator functions and config step
+types, so selections like "all cli-only dbt tasks using compare_csv" are a
+single indexed query instead of parsing ~500 JSON files:
+
+    catalog = TaskCatalog(DEFAULT_CATALOG, examples_root)
+    catalog.refresh()                       # re-parses only files whose mtime/size changed
+    catalog.mapping(tool="dbt", tags=["cli"], evaluator="compare_csv")
+    catalog.meta(uid)                       # the task JSON, without touching the file
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CATALOG = Path("results/catalog.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    uid           TEXT PRIMARY KEY,
+    tool          TEXT NOT NULL,
+    mtime_ns      INTEGER NOT NULL,
+    size          INTEGER NOT NULL,
+    action_number INTEGER,
+    meta          TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_tags (uid TEXT NOT NULL, tag TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS task_evaluators (uid TEXT NOT NULL, func TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS task_configs (uid TEXT NOT NULL, position INTEGER NOT NULL, type TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS tasks_tool ON tasks (tool);
+CREATE INDEX IF NOT EXISTS task_tags_tag ON task_tags (tag, uid);
+CREATE INDEX IF NOT EXISTS task_evaluators_func ON task_evaluators (func, uid);
+CREATE INDEX IF NOT EXISTS task_configs_type ON task_configs (type, uid);
+"""
+_SIDE_TABLES = ("task_tags", "task_evaluators", "task_configs")
+
+
+def evaluator_funcs(meta: Dict[str, Any]) -> List[str]:
+    """Evaluator function names of a task (`func` may be a single name or a list)."""
+    spec = meta.get("evaluator") or meta.get("evaluation") or {}
+    funcs = spec.get("func", [])
+    return [funcs] if isinstance(funcs, str) else list(funcs)
+
+
+def step_kind(step: Dict[str, Any]) -> str:
+    """Kind of a config step (`type` in the benchmark JSON, `func` in older tasks)."""
+    return step.get("type") or step.get("func") or "?"
+
+
+def benchmark_dir(examples_root: Path) -> Path:
+    """Dir that relative file paths in the benchmark JSON are anchored at (`<benchmark>/evaluation_examples/examples`).
+
+    A root shallower than that anchors at the filesystem root instead of failing.
+    """
+    return Path(examples_root).resolve().parent.parent
+
+
+def config_types(meta: Dict[str, Any]) -> List[str]:
+    return [step_kind(step) for step in meta.get("config", [])]
+
+
+class TaskCatalog:
+    def __init__(self, path: Path, examples_root: Path):
+        self.path = Path(path)
+        self.examples_root = Path(examples_root)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Build -------------------------------------------------------------
+    # ------------------------------------------------------------------
+    def _scan(self) -> Iterable[Tuple[str, str, Path, os.stat_result]]:
+        """Yield (tool, uid, path, stat) for every `<tool>/<uid>/<uid>.json` in the tree."""
+        for tool_dir in os.scandir(self.examples_root):
+            if not tool_dir.is_dir():
+                continue
+            for task_dir in os.scandir(tool_dir.path):
+                path = Path(task_dir.path) / f"{task_dir.name}.json"
+                try:
+                    yield tool_dir.name, task_dir.name, path, path.stat()
+                except (FileNotFoundError, NotADirectoryError):
+                    continue
+
+    def refresh(self) -> int:
+        """Bring the catalog in line with the tree; returns how many tasks were (re)parsed."""
+        with self._lock:
+            known = {
+                uid: (mtime_ns, size)
+                for uid, mtime_ns, size in self._conn.execute("SELECT uid, mtime_ns, size FROM tasks")
+            }
+        seen, changed = set(), []
+        for tool, uid, path, st in self._scan():
+            seen.add(uid)
+            if known.get(uid) != (st.st_mtime_ns, st.st_size):
+                changed.append((tool, uid, path, st))
+        gone = set(known) - seen
+
+        with self._lock, self._conn:
+            for uid in gone:
+                self._delete(uid)
+            for tool, uid, path, st in changed:
+                try:
+                    meta = json.loads(path.read_text())
+                except (OSError, json.JSONDecodeError) as e:
+                    logger.warning("⚠️ Skipping unreadable task %s: %s", path, e)
+                    self._delete(uid)
+                    continue
+                self._delete(uid)
+                self._conn.execute(
+                    "INSERT INTO tasks VALUES (?, ?, ?, ?, ?, ?)",
+                    (uid, tool, st.st_mtime_ns, st.st_size, meta.get("action_number"), json.dumps(meta)),
+                )
+                self._conn.executemany("INSERT INTO task_tags VALUES (?, ?)", [(uid, t) for t in meta.get("tags", [])])
+                self._conn.executemany(
+                    "INSERT INTO task_evaluators VALUES (?, ?)", [(uid, f) for f in evaluator_funcs(meta)]
+                )
+                self._conn.executemany(
+                    "INSERT INTO task_configs VALUES (?, ?, ?)",
+                    [(uid, i, t) for i, t in enumerate(config_types(meta))],
+                )
+        if changed or gone:
+            logger.info("📚 Catalog refreshed: %d (re)indexed, %d removed", len(changed), len(gone))
+        return len(changed)
+
+    def _delete(self, uid: str) -> None:
+        self._conn.execute("DELETE FROM tasks WHERE uid = ?", (uid,))
+        for table in _SIDE_TABLES:
+            self._conn.execute(f"DELETE FROM {table} WHERE uid = ?", (uid,))
+
+    # ------------------------------------------------------------------
+    # Queries -----------------------------------------------------------
+    # ------------------------------------------------------------------
+    def select(
+        self,
+        tool: Optional[str] = None,
+        tags: Sequence[str] = (),
+        exclude_tags: Sequence[str] = (),
+        evaluator: Optional[str] = None,
+        config_type: Optional[str] = None,
+    ) -> List[Tuple[str, str]]:
+        """(tool, uid) of every task matching all given filters."""
+        sql, params = ["SELECT tool, uid FROM tasks WHERE 1"], []
+        if tool:
+            sql.append("AND tool = ?")
+            params.append(tool)
+        for tag in tags:
+            sql.append("AND uid IN (SELECT uid FROM task_tags WHERE tag = ?)")
+            params.append(tag)
+        for tag in exclude_tags:
+            sql.append("AND uid NOT IN (SELECT uid FROM task_tags WHERE tag = ?)")
+            params.append(tag)
+        if evaluator:
+            sql.append("AND uid IN (SELECT uid FROM task_evaluators WHERE func = ?)")
+            params.append(evaluator)
+        if config_type:
+            sql.append("AND uid IN (SELECT uid FROM task_configs WHERE type = ?)")
+            params.append(config_type)
+        sql.append("ORDER BY tool, uid")
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(" ".join(sql), params)]
+
+    def mapping(self, **filters: Any) -> Dict[str, List[str]]:
+        """Matching tasks as a tool → uids mapping (the task-file format)."""
+        result: Dict[str, List[str]] = {}
+        for tool, uid in self.select(**filters):
+            result.setdefault(tool, []).append(uid)
+        return result
+
+    def meta(self, uid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT meta FROM tasks WHERE uid = ?", (uid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def metas(self, uids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        wanted = list(uids)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT uid, meta FROM tasks WHERE uid IN ({','.join('?' * len(wanted))})", wanted
+            ).fetchall()
+        return {uid: json.loads(meta) for uid, meta in rows}
@@ -1,6 +1,15 @@
-from benchmark.helpers.config.general import download_file_from_vm, upload_file_to_vm
+from benchmark.helpers.config.general import download_file_from_vm, upload_and_execute_script, upload_file_to_vm
 from benchmark.helpers.evaluation.metrics import compare_csv
 
+__all__ = [
+    "CONFIG_DISPATCH",
+    "EVAL_DISPATCH",
+    "compare_csv",
+    "download_file_from_vm",
+    "upload_and_execute_script",
+    "upload_file_to_vm",
+]
+
 CONFIG_DISPATCH = {
     "upload_file_to_vm": upload_file_to_vm,
 }
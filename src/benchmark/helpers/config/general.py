@@ -1,15 +1,19 @@
 # simplified_setup_helpers.py
 # Minimal helper utilities to support updated orchestrator VM setup
 
+from __future__ import annotations
+
 import platform
 import shutil
 from pathlib import Path
-from typing import Union
+from typing import TYPE_CHECKING, Union
 
 from smolagents import LogLevel
 
 from agent.sandbox_agent import SandboxCodeAgent
-from orchestrator import TaskSpec
+
+if TYPE_CHECKING:
+    from orchestrator import TaskSpec
 
 
 def upload_and_execute_script(
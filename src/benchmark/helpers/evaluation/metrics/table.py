@@ -1,12 +1,16 @@
+from __future__ import annotations
+
 import shutil
 from pathlib import Path
-from typing import Iterable
+from typing import TYPE_CHECKING, Iterable
 
 from smolagents import LogLevel
 
 from agent.sandbox_agent import SandboxCodeAgent
-from benchmark.helpers import download_file_from_vm
-from orchestrator import TaskSpec
+from benchmark.helpers.config.general import download_file_from_vm
+
+if TYPE_CHECKING:
+    from orchestrator import TaskSpec
 
 
 def compare_csv(
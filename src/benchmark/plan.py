@@ -0,0 +1,175 @@
+"""Task plans — each task JSON compiled against the handler tables before any VM boots.
+
+Two task formats are in circulation:
+
+    {"config": [{"func": "upload_file_to_vm", "arguments": {...}}],
+     "evaluation": {"func": "compare_csv", "arguments": {...}}}
+
+    {"config": [{"type": "copyfile_from_host_to_guest", "parameters": {...}}],
+     "evaluator": {"func": ["check_yaml_file", ...], "conj": "and",
+                   "result": [...], "expected": [...], "options": [...], "postconfig": [...]}}
+
+`compile_task` turns either one into a `TaskPlan` of bound (handler,
+arguments) steps and lists everything that would stop the task from being
+scored: config or evaluator steps without a handler, arguments the handler
+does not accept, and local files that are referenced but missing.
+
+    plan = compile_task(spec, CONFIG_DISPATCH, EVAL_DISPATCH)
+    if not plan.ok:
+        print(plan.problems)
+"""
+
+from __future__ import annotations
+
+import inspect
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from benchmark.catalog import benchmark_dir, step_kind
+
+if TYPE_CHECKING:
+    from orchestrator import TaskSpec
+
+# Argument names whose string value is a file on the host (relative to the task folder or the benchmark dir)
+LOCAL_PATH_ARGS = {"local_path", "local_expected", "src", "settings_file", "setting_file", "config_file"}
+
+
+@dataclass
+class PlanStep:
+    name: str
+    func: Optional[Callable[..., Any]]
+    arguments: Dict[str, Any]
+
+
+@dataclass
+class TaskPlan:
+    uid: str
+    tool: str
+    config: List[PlanStep] = field(default_factory=list)
+    postconfig: List[PlanStep] = field(default_factory=list)  # Run after the agent, before evaluation
+    evaluators: List[PlanStep] = field(default_factory=list)
+    conj: str = "and"  # How the scores of several evaluators combine
+    problems: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)  # Handler names without an implementation
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def combine(self, scores: Sequence[Optional[float]]) -> Optional[float]:
+        """One score from the evaluators' scores (`and` → all must pass, `or` → any)."""
+        if not scores:
+            return None
+        if len(scores) == 1:
+            return scores[0]
+        values = [float(s or 0.0) for s in scores]
+        return max(values) if self.conj == "or" else min(values)
+
+
+def step_arguments(step: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments of a config step (`parameters` in the benchmark JSON, `arguments` in older tasks)."""
+    return dict(step.get("parameters") or step.get("arguments") or {})
+
+
+def _pick(value: Any, index: int) -> Any:
+    return value[index] if isinstance(value, list) else value
+
+
+def evaluator_steps(evaluation: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """(func name, arguments) of every evaluator in an `evaluation` / `evaluator` block."""
+    funcs = evaluation.get("func", [])
+    if "arguments" in evaluation:
+        return [(funcs, dict(evaluation["arguments"]))]
+    names = [funcs] if isinstance(funcs, str) else list(funcs)
+    steps = []
+    for i, name in enumerate(names):
+        arguments = {key: _pick(evaluation[key], i) for key in ("result", "expected") if key in evaluation}
+        arguments.update(_pick(evaluation.get("options"), i) or {})
+        steps.append((name, arguments))
+    return steps
+
+
+def _local_paths(arguments: Any) -> Iterable[str]:
+    """Host file references anywhere in a (nested) argument structure."""
+    if isinstance(arguments, list):
+        for item in arguments:
+            yield from _local_paths(item)
+    elif isinstance(arguments, dict):
+        local_file = arguments.get("type") == "local_file"
+        for key, value in arguments.items():
+            if isinstance(value, str) and (key in LOCAL_PATH_ARGS or (local_file and key == "path")):
+                yield value
+            elif isinstance(value, (dict, list)):
+                yield from _local_paths(value)
+
+
+class _Compiler:
+    def __init__(self, spec: "TaskSpec", plan: TaskPlan):
+        self.spec = spec
+        self.plan = plan
+        # Relative paths in the benchmark JSON are anchored at the benchmark dir or the task folder
+        self.roots = (benchmark_dir(spec.tool_dir.parent), spec.folder)
+
+    def step(self, where: str, name: str, arguments: Dict[str, Any], dispatch: Dict[str, Callable]) -> PlanStep:
+        func = dispatch.get(name)
+        if func is None:
+            self.plan.problems.append(f"{where}: no handler for {name!r}")
+            self.plan.missing.append(name)
+        else:
+            try:
+                inspect.signature(func).bind(task=None, agent=None, **arguments)
+            except TypeError as e:
+                self.plan.problems.append(f"{where}: {name}() {e}")
+            except ValueError:
+                pass  # No introspectable signature
+        for value in _local_paths(arguments):
+            if not any((root / value).exists() for root in self.roots):
+                self.plan.problems.append(f"{where}: missing file {value}")
+        return PlanStep(name, func, arguments)
+
+
+def compile_task(
+    spec: "TaskSpec", config_dispatch: Dict[str, Callable], eval_dispatch: Dict[str, Callable]
+) -> TaskPlan:
+    plan = TaskPlan(spec.uid, spec.tool)
+    compiler = _Compiler(spec, plan)
+    for n, step in enumerate(spec.config, start=1):
+        plan.config.append(compiler.step(f"config[{n}]", step_kind(step), step_arguments(step), config_dispatch))
+
+    evaluation = spec.evaluation
+    if not evaluation:
+        plan.problems.append("no evaluator")
+        return plan
+    for n, step in enumerate(evaluation.get("postconfig", []), start=1):
+        plan.postconfig.append(
+            compiler.step(f"postconfig[{n}]", step_kind(step), step_arguments(step), config_dispatch)
+        )
+    for name, arguments in evaluator_steps(evaluation):
+        plan.evaluators.append(compiler.step("evaluator", name, arguments, eval_dispatch))
+    if not plan.evaluators:
+        plan.problems.append("no evaluator")
+    plan.conj = evaluation.get("conj", "and")
+    return plan
+
+
+def plan_report(plans: Sequence[TaskPlan]) -> Dict[str, Any]:
+    unsupported = [p for p in plans if not p.ok]
+    return {
+        "tasks": len(plans),
+        "runnable": len(plans) - len(unsupported),
+        "unsupported": len(unsupported),
+        "missing_handlers": dict(Counter(name for p in unsupported for name in set(p.missing)).most_common()),
+        "unsupported_by_tool": dict(Counter(p.tool for p in unsupported).most_common()),
+        "problems": {p.uid: p.problems for p in unsupported},
+    }
+
+
+def format_plan_report(report: Dict[str, Any], top: int = 10) -> str:
+    lines = [f"{report['runnable']}/{report['tasks']} task(s) runnable, {report['unsupported']} unsupported"]
+    missing = list(report["missing_handlers"].items())
+    if missing:
+        lines.append("missing handlers (tasks affected): " + ", ".join(f"{n} ×{c}" for n, c in missing[:top]))
+        if len(missing) > top:
+            lines[-1] += f", … {len(missing) - top} more"
+    return "\n".join(lines)
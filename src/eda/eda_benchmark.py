@@ -9,13 +9,15 @@ import colorsys
 import json
 from collections import Counter
 from pathlib import Path
-from typing import List, Set
+from typing import List, Optional, Set
 
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import seaborn as sns  # type: ignore
 
+from benchmark.catalog import DEFAULT_CATALOG, TaskCatalog
+
 # ─────────────────────────────────────────────────  GLOBAL STYLE  ───────────────────────────────────────────────
 sns.set_theme(style="whitegrid", font_scale=0.95)
 
@@ -41,9 +43,28 @@ def _lighten(color, frac=0.5):
     return colorsys.hls_to_rgb(h, l, s)
 
 
-def collect(mapping_path: str | Path, examples_root: str | Path) -> pd.DataFrame:
-    mapping = json.loads(Path(mapping_path).read_text())
+def collect(
+    mapping_path: Optional[str | Path],
+    examples_root: str | Path,
+    catalog_path: str | Path = DEFAULT_CATALOG,
+    **filters,
+) -> pd.DataFrame:
+    """Task metadata as a DataFrame, read from the task catalog.
+
+    `filters` are catalog filters (tool=, tags=, exclude_tags=, evaluator=, config_type=);
+    without a mapping file every matching task is loaded.
+    """
     examples_root = Path(examples_root)
+    catalog = TaskCatalog(Path(catalog_path), examples_root)
+    catalog.refresh()
+    selected = catalog.mapping(**filters)
+    if mapping_path is None:
+        mapping = selected
+    else:
+        mapping = json.loads(Path(mapping_path).read_text())
+        if any(filters.values()):
+            mapping = {tool: [u for u in uids if u in selected.get(tool, [])] for tool, uids in mapping.items()}
+    metas = catalog.metas(u for uids in mapping.values() for u in uids)
 
     rows: list[dict] = []
     missing: Set[str] = set()
@@ -51,14 +72,14 @@ def collect(mapping_path: str | Path, examples_root: str | Path) -> pd.DataFrame
 
     for tool, uids in mapping.items():
         for uid in uids:
-            meta = examples_root / tool / uid / f"{uid}.json"
-            if not meta.is_file():
+            data = metas.get(uid)
+            if data is None:
+                meta = examples_root / tool / uid / f"{uid}.json"
                 if str(meta) not in missing:
                     print(f"⚠️ missing {meta}")
                     missing.add(str(meta))
                 n_missing += 1
                 continue
-            data = json.loads(meta.read_text())
             n_found += 1
             rows.append(
                 {
@@ -262,10 +283,23 @@ if __name__ == "__main__":
     import argparse
 
     parser = argparse.ArgumentParser(description="Benchmark JSON EDA")
-    parser.add_argument("mapping", type=Path, help="tool→uuid list JSON")
+    parser.add_argument("mapping", type=Path, nargs="?", help="tool→uuid list JSON (default: every catalog match)")
     parser.add_argument("examples_root", type=Path, help="evaluation_examples/examples/")
+    parser.add_argument("--catalog", type=Path, default=DEFAULT_CATALOG, help="indexed task catalog")
+    parser.add_argument("--tool", help="only tasks of this tool")
+    parser.add_argument("--tag", action="append", default=[], help="only tasks with this tag (repeatable)")
+    parser.add_argument("--evaluator", help="only tasks evaluated with this function")
+    parser.add_argument("--config-type", help="only tasks with a config step of this type")
     args = parser.parse_args()
-    df = collect(args.mapping, args.examples_root)
+    df = collect(
+        args.mapping,
+        args.examples_root,
+        args.catalog,
+        tool=args.tool,
+        tags=args.tag,
+        evaluator=args.evaluator,
+        config_type=args.config_type,
+    )
     figs = make_plots(df)
     for f in figs:
         f.tight_layout()
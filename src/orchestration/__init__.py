@@ -0,0 +1,51 @@
+# orchestration/__init__.py
+
+from .distributed import Coordinator, Worker
+from .failures import INFRA, REPLAY, InfraError, RetryPolicy, classify
+from .journal import QueueJournal, RunJournal
+from .outcomes import OutcomeStore, load_outcomes, outcome_row
+from .pipeline import STAGE_NAMES, Stage, StagePipeline, parse_stage_limits
+from .pool import PoolExhaustedError, WarmPool
+from .reaper import Reaper
+from .rundb import RunDatabase, feature_estimate
+from .scheduler import HostCapacity, ResourceScheduler, VMProfile, parse_size
+from .settle import SettleConfig, flush_artifacts, wait_until_settled
+from .setup_cache import DISK_ONLY_STEPS, plan_setup_snapshots
+from .sharding import assign_shards, merge_results, parse_shard, shard_mapping
+
+__all__ = [
+    "Coordinator",
+    "DISK_ONLY_STEPS",
+    "HostCapacity",
+    "INFRA",
+    "InfraError",
+    "PoolExhaustedError",
+    "OutcomeStore",
+    "QueueJournal",
+    "REPLAY",
+    "Reaper",
+    "ResourceScheduler",
+    "RetryPolicy",
+    "RunDatabase",
+    "RunJournal",
+    "STAGE_NAMES",
+    "SettleConfig",
+    "Stage",
+    "StagePipeline",
+    "VMProfile",
+    "WarmPool",
+    "Worker",
+    "assign_shards",
+    "classify",
+    "feature_estimate",
+    "flush_artifacts",
+    "load_outcomes",
+    "merge_results",
+    "outcome_row",
+    "parse_shard",
+    "parse_size",
+    "parse_stage_limits",
+    "plan_setup_snapshots",
+    "shard_mapping",
+    "wait_until_settled",
+]
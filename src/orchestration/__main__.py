@@ -0,0 +1,24 @@
+"""Maintenance commands for run results: python -m orchestration <command> ..."""
+
+import argparse
+import logging
+from pathlib import Path
+
+from .sharding import merge_results
+
+
+def main():
+    ap = argparse.ArgumentParser(prog="python -m orchestration")
+    commands = ap.add_subparsers(dest="command", required=True)
+    merge = commands.add_parser("merge-shards", help="merge the results roots of several shards into one")
+    merge.add_argument("dest", type=Path, help="merged results root (created if missing)")
+    merge.add_argument("sources", type=Path, nargs="+", help="results roots of the shards")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.command == "merge-shards":
+        merge_results(args.dest, args.sources)
+
+
+if __name__ == "__main__":
+    main()
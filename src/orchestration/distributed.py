@@ -0,0 +1,279 @@
+"""Coordinator / worker mode for running one task set across several hosts.
+
+The coordinator owns the task queue, the run journal and the duration
+history; workers (one per Docker/KVM host, or several on one machine) pull
+tasks, run them with their local Orchestrator and stream stage events and
+results back. The wire protocol is newline-delimited JSON over TCP:
+
+    worker → coordinator                        coordinator → worker
+    {"op": "hello", "worker": id, "slots": n}   {"op": "welcome"}
+    {"op": "pull"}                              {"op": "task", "tool": t, "uid": u, "setup": [fp, n] | null}
+                                                {"op": "wait"}    (nothing queued right now)
+                                                {"op": "drain"}   (all tasks finished)
+    {"op": "event", "uid": u, "stage": s, ...}
+    {"op": "result", "uid": u, "status": s, "duration": d, "score": x,
+     "failure": f, "attempts": n, "spans": [...]}
+
+Tasks in flight on a worker that disconnects are put back at the front of
+the queue. Once every task has reported, each pull is answered with "drain"
+and the coordinator stops after its workers have hung up (or DRAIN_TIMEOUT
+passed). Both sides must see the same examples tree (shared checkout).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+from telemetry import METRICS, TRACER
+
+from .outcomes import outcome_row
+
+if TYPE_CHECKING:
+    from orchestrator import Orchestrator, TaskSpec
+
+    from .journal import RunJournal
+    from .outcomes import OutcomeStore
+    from .rundb import RunDatabase
+
+logger = logging.getLogger(__name__)
+
+WAIT_INTERVAL = 5.0
+DRAIN_TIMEOUT = 4 * WAIT_INTERVAL  # Idle workers pull again within WAIT_INTERVAL
+MAX_MESSAGE = 16 * 1024**2  # Results carry the task's trace spans
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    """Parse "host:port" (or ":port" for all interfaces)."""
+    host, _, port = value.rpartition(":")
+    if not port.isdigit():
+        raise ValueError(f"Invalid address {value!r}, expected HOST:PORT")
+    return host or "0.0.0.0", int(port)
+
+
+async def _send(writer: asyncio.StreamWriter, msg: Dict[str, Any]) -> None:
+    writer.write((json.dumps(msg, default=str) + "\n").encode())
+    await writer.drain()
+
+
+async def _recv(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    line = await reader.readline()
+    return json.loads(line) if line else None
+
+
+# ────────────────────────────── Coordinator ──────────────────────────────
+class Coordinator:
+    """Hands out tasks to workers and records everything they report."""
+
+    def __init__(
+        self,
+        tasks: List["TaskSpec"],
+        journal: "RunJournal",
+        run_db: "RunDatabase",
+        address: str,
+        outcomes: Optional["OutcomeStore"] = None,
+    ):
+        self.host, self.port = parse_address(address)
+        self.journal = journal
+        self.run_db = run_db
+        self.outcomes = outcomes
+        self.specs: Dict[str, "TaskSpec"] = {spec.uid: spec for spec in tasks}
+        self.pending: Deque["TaskSpec"] = deque(tasks)
+        self.inflight: Dict[str, str] = {}  # uid → worker id
+        self._finished = asyncio.Event()
+        self._remaining = len(self.specs)
+        self._connected = 0
+        self._disconnected = asyncio.Event()
+
+    async def serve(self) -> None:
+        if not self.specs:
+            return
+        server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_MESSAGE)
+        logger.info("🛰 Coordinator listening on %s:%d with %d task(s)", self.host, self.port, len(self.specs))
+        METRICS.add_collector(self._metric_samples)
+        try:
+            async with server:
+                await self._finished.wait()
+                # Keep answering pulls with "drain" until every worker has hung up
+                while self._connected:
+                    self._disconnected.clear()
+                    try:
+                        await asyncio.wait_for(self._disconnected.wait(), DRAIN_TIMEOUT)
+                    except asyncio.TimeoutError:
+                        logger.warning("⚠️ %d worker(s) did not drain, closing", self._connected)
+                        break
+        finally:
+            METRICS.remove_collector(self._metric_samples)
+        logger.info("🏁 All %d task(s) finished", len(self.specs))
+
+    def _metric_samples(self):
+        yield "orchestrator_queue_depth", {"queue": "coordinator"}, len(self.pending)
+        yield "orchestrator_running_tasks", {}, len(self.inflight)
+        yield "orchestrator_busy_workers", {}, len(set(self.inflight.values()))
+
+    def _next_task(self) -> Dict[str, Any]:
+        if self.pending:
+            spec = self.pending.popleft()
+            return {"op": "task", "tool": spec.tool, "uid": spec.uid, "setup": spec.setup_key}
+        return {"op": "wait"} if self.inflight else {"op": "drain"}
+
+    def _complete(self, uid: str, status: str, duration: Optional[float], result: Dict[str, Any]) -> None:
+        if self.inflight.pop(uid, None) is None:
+            return  # stale result of a task that was already requeued
+        spec = self.specs[uid]
+        spec.score, spec.failure, spec.attempt = result.get("score"), result.get("failure"), result.get("attempts", 1)
+        if duration is not None:
+            self.run_db.record(spec, duration, status, failure=spec.failure, attempts=spec.attempt)
+            if self.outcomes:
+                self.outcomes.record(outcome_row(spec, TRACER.events(task=uid), duration, status))
+        self._remaining -= 1
+        if self._remaining == 0:
+            self._finished.set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        hello = await _recv(reader)
+        if not hello or hello.get("op") != "hello":
+            writer.close()
+            return
+        worker = hello["worker"]
+        logger.info("🤝 Worker %s connected (%s slot(s))", worker, hello.get("slots"))
+        self._connected += 1
+        try:
+            await _send(writer, {"op": "welcome"})
+            while (msg := await _recv(reader)) is not None:
+                op = msg.pop("op")
+                if op == "pull":
+                    reply = self._next_task()
+                    if reply["op"] == "task":
+                        self.inflight[reply["uid"]] = worker
+                        logger.info("📦 %s → %s", reply["uid"], worker)
+                    await _send(writer, reply)
+                elif op == "event":
+                    uid, stage = msg.pop("uid"), msg.pop("stage")
+                    self.journal.record(uid, stage, worker=worker, **msg)
+                    METRICS.observe_transition(stage, msg)
+                elif op == "result":
+                    TRACER.extend(msg.get("spans", []))
+                    self._complete(msg["uid"], msg["status"], msg.get("duration"), msg)
+        except (ConnectionError, json.JSONDecodeError) as e:
+            logger.warning("⚠️ Connection to %s broke: %s", worker, e)
+        finally:
+            lost = [uid for uid, owner in self.inflight.items() if owner == worker]
+            for uid in lost:
+                del self.inflight[uid]
+                self.pending.appendleft(self.specs[uid])
+                self.journal.record(uid, "requeued", worker=worker)
+            if lost:
+                logger.warning("↩️ Worker %s left, requeued %d task(s)", worker, len(lost))
+            else:
+                logger.info("👋 Worker %s disconnected", worker)
+            writer.close()
+            self._connected -= 1
+            self._disconnected.set()
+
+
+# ────────────────────────────── Worker ──────────────────────────────
+class ForwardingJournal:
+    """Journal stand-in for a worker: stage events are streamed to the coordinator."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def record(self, uid: str, stage: str, **data: Any) -> None:
+        self.send({"op": "event", "ts": time.time(), "uid": uid, "stage": stage, **data})
+
+    def send(self, msg: Dict[str, Any]) -> None:
+        # Called from task threads → hop onto the event loop; one queue keeps events and results in order
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, msg)
+
+    async def forward(self, writer: asyncio.StreamWriter) -> None:
+        while True:
+            await _send(writer, await self._queue.get())
+            self._queue.task_done()
+
+    async def flush(self) -> None:
+        await self._queue.join()
+
+
+class Worker:
+    """Pulls tasks from a coordinator and runs up to `slots` of them at once."""
+
+    def __init__(self, address: str, slots: int):
+        self.host, self.port = parse_address(address)
+        self.slots = slots
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.journal = ForwardingJournal()
+
+    async def run(self, orch: "Orchestrator") -> None:
+        loop = asyncio.get_running_loop()
+        self.journal.bind(loop)
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_MESSAGE)
+        await _send(writer, {"op": "hello", "worker": self.worker_id, "slots": self.slots})
+        if (await _recv(reader) or {}).get("op") != "welcome":
+            raise ConnectionError("Coordinator rejected the handshake")
+        logger.info("🛰 Worker %s connected to %s:%d", self.worker_id, self.host, self.port)
+
+        async def run_task(tool: str, uid: str, setup_key: Optional[list]):
+            status, duration, score, failure, attempts = "error", None, None, None, 1
+            try:
+                spec = orch.make_task(tool, uid)
+                # Setup fingerprints are planned over the whole run, i.e. by the coordinator
+                spec.setup_key = tuple(setup_key) if setup_key else None
+                async with orch.scheduler.admit(spec.uid, spec.demand):
+                    orch._transition(spec, "admitted")
+                    await loop.run_in_executor(orch.pool, orch._execute, spec)
+                status, score, failure, attempts = spec.status, spec.score, spec.failure, spec.attempt
+                duration = time.time() - spec.started if spec.started else None
+            except Exception as e:
+                logger.error("🔥 Task %s could not be run on this worker: %s", uid, e)
+                self.journal.record(uid, "failed", error=str(e))
+            finally:
+                result = {
+                    "op": "result",
+                    "uid": uid,
+                    "status": status,
+                    "duration": duration,
+                    "score": score,
+                    "failure": failure,
+                    "attempts": attempts,
+                    "spans": TRACER.take(uid),
+                }
+                self.journal.send(result)
+                free.release()
+
+        free = asyncio.Semaphore(self.slots)
+        running: List[asyncio.Task] = []
+        forwarder = asyncio.create_task(self.journal.forward(writer))
+        try:
+            while True:
+                await free.acquire()
+                await _send(writer, {"op": "pull"})
+                msg = await _recv(reader)
+                if msg is None:
+                    # The coordinator only stops once every result is in; losing it mid-task is an error
+                    if not all(task.done() for task in running):
+                        raise ConnectionError("Coordinator closed the connection")
+                    break
+                if msg["op"] == "task":
+                    running.append(asyncio.create_task(run_task(msg["tool"], msg["uid"], msg.get("setup"))))
+                    continue
+                free.release()
+                if msg["op"] == "drain":
+                    await asyncio.gather(*running)
+                    await self.journal.flush()
+                    break
+                await asyncio.sleep(WAIT_INTERVAL)
+        finally:
+            forwarder.cancel()
+            writer.close()
+        logger.info("🏁 Worker %s drained", self.worker_id)
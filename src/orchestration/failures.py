@@ -0,0 +1,120 @@
+"""Failure classification and the infra-retry policy.
+
+Every task failure is recorded with one of these kinds:
+
+    infra        the sandbox broke: container/QEMU boot, sshd, FastAPI or kernel
+                 gateway not coming up, a guest command failing while the VM
+                 boots (mounts, bootstrap), SSH/websocket/HTTP connections
+                 dropping, an isolated task process dying
+    setup        setup.sh exited non-zero
+    agent        the agent run itself raised (parsing, step limits, its own code)
+    provider     the LLM API failed (rate limits after retries, 5xx, timeouts)
+    replay       a replay-only LLM cache had no response for the prompt
+    evaluation   the evaluator raised
+    capacity     no VM could be had (the warm pool's boot budget is spent);
+                 another attempt could not get one either
+
+Only `infra` failures say nothing about the task, so only they are retried,
+on a fresh VM, while the run's `RetryPolicy` has budget left.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from docker.errors import DockerException
+from paramiko.ssh_exception import SSHException
+from requests.exceptions import ConnectionError as HTTPConnectionError
+from requests.exceptions import Timeout as HTTPTimeout
+from websocket import WebSocketException
+
+from sandbox.errors import RemoteCommandError, VMManagerError
+
+from .pool import PoolExhaustedError
+
+if TYPE_CHECKING:
+    from orchestrator import TaskSpec
+
+INFRA, SETUP, AGENT, PROVIDER, REPLAY, EVALUATION = "infra", "setup", "agent", "provider", "replay", "evaluation"
+CAPACITY = "capacity"
+
+INFRA_ERRORS = (
+    VMManagerError,
+    DockerException,
+    SSHException,
+    WebSocketException,
+    HTTPConnectionError,
+    HTTPTimeout,
+    ConnectionError,
+    TimeoutError,
+    BrokenProcessPool,
+)
+
+# Journal stage a task is in → failure kind when the exception itself says nothing
+_STAGE_KINDS = {
+    "admitted": INFRA,
+    "booting": INFRA,
+    "booted": INFRA,
+    "setup": SETUP,
+    "agent": AGENT,
+    "evaluate": EVALUATION,
+}
+
+
+class InfraError(RuntimeError):
+    """The sandbox stopped working underneath a task (e.g. found unhealthy after the agent run)."""
+
+
+def _chain(exc: BaseException) -> Iterator[BaseException]:
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def _is_provider_error(exc: BaseException) -> bool:
+    module = type(exc).__module__.split(".", 1)[0]
+    return module in ("litellm", "openai") or getattr(exc, "status_code", None) == 429
+
+
+def classify(exc: BaseException, stage: str) -> str:
+    """Failure kind of `exc`, raised while the task was in journal stage `stage`."""
+    from agent.utils.llm_cache import CacheMiss
+
+    for e in _chain(exc):
+        if isinstance(e, CacheMiss):
+            return REPLAY
+        if isinstance(e, PoolExhaustedError):
+            return CAPACITY
+        if isinstance(e, RemoteCommandError):
+            # A guest command failing says little by itself: during boot it is the sandbox, during setup the task
+            return _STAGE_KINDS.get(stage, AGENT)
+        if isinstance(e, (InfraError, *INFRA_ERRORS)):
+            return INFRA
+        if _is_provider_error(e):
+            return PROVIDER
+    return _STAGE_KINDS.get(stage, AGENT)
+
+
+@dataclass
+class RetryPolicy:
+    """How often infra failures are retried: per task, and in total for the run."""
+
+    max_attempts: int = 3  # First try included
+    budget: Optional[int] = None  # Retries left for the whole run (None = no run-wide cap)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def take(self, spec: "TaskSpec") -> bool:
+        """Claim a retry for `spec` if its failure is retryable and budget is left."""
+        if spec.failure != INFRA or spec.attempt >= self.max_attempts:
+            return False
+        with self._lock:
+            if self.budget is not None:
+                if self.budget <= 0:
+                    return False
+                self.budget -= 1
+        return True
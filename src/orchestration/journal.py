@@ -0,0 +1,122 @@
+"""RunJournal — append-only JSONL log of task stage transitions.
+
+Each line is one event:
+
+    {"ts": 1718000000.0, "uid": "...", "stage": "booted", "container": "sandbox-..."}
+
+Lines are fsynced as they are written, so after a crash the journal tells us
+which uids already finished (last stage `done` / `failed`) and which ones
+were cut off mid-flight, together with the container they were running in.
+A task whose last attempt failed on infrastructure (`"failure": "infra"`)
+never got a fair run, so it counts as unfinished and is retried on resume.
+A torn trailing line from a crash is ignored on replay.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Set
+
+from .failures import INFRA
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STAGES = ("done", "failed")
+
+
+def _finished(state: Dict[str, Any]) -> bool:
+    return state["stage"] in TERMINAL_STAGES and not (state["stage"] == "failed" and state.get("failure") == INFRA)
+
+
+class RunJournal:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._fh = self._open()
+
+    def _open(self):
+        fh = open(self.path, "a+", encoding="utf-8")
+        # Terminate a line torn by a crash so the next event starts cleanly
+        if fh.tell() > 0:
+            fh.seek(fh.tell() - 1)
+            if fh.read(1) != "\n":
+                fh.write("\n")
+        return fh
+
+    def close(self) -> None:
+        with self._lock:
+            self._fh.close()
+
+    def rotate(self) -> Path:
+        """Move the current journal aside (for a fresh run) and start an empty one."""
+        with self._lock:
+            self._fh.close()
+            backup = self.path.with_name(f"{self.path.stem}.{int(time.time())}{self.path.suffix}")
+            if self.path.exists():
+                self.path.rename(backup)
+            self._fh = self._open()
+        return backup
+
+    # ------------------------------------------------------------------
+    # Writes ------------------------------------------------------------
+    # ------------------------------------------------------------------
+    def record(self, uid: str, stage: str, **data: Any) -> None:
+        line = json.dumps({"ts": time.time(), "uid": uid, "stage": stage, **data}, default=str)
+        with self._lock:
+            self._fh.write(line + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    # ------------------------------------------------------------------
+    # Replay ------------------------------------------------------------
+    # ------------------------------------------------------------------
+    def replay(self) -> Dict[str, Dict[str, Any]]:
+        """Fold the journal into the latest state per uid (stage + last known container)."""
+        states: Dict[str, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return states
+        with open(self.path, encoding="utf-8") as f:
+            for n, line in enumerate(f, start=1):
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("⚠️ Skipping torn journal line %d in %s", n, self.path)
+                    continue
+                state = states.setdefault(event["uid"], {})
+                state.update(event)
+        return states
+
+    def completed(self) -> Set[str]:
+        return {uid for uid, state in self.replay().items() if _finished(state)}
+
+    def unfinished(self) -> Dict[str, str]:
+        """uid → container name for every task that started but never finished (see `completed`)."""
+        return {
+            uid: state.get("container") or f"sandbox-{uid[:12]}"
+            for uid, state in self.replay().items()
+            if not _finished(state)
+        }
+
+
+class QueueJournal:
+    """Journal stand-in for a task running in a child process.
+
+    Events are put on a multiprocessing queue as `(uid, stage, data)` tuples and
+    written to the real journal by the parent; `close()` puts the `None` sentinel
+    that tells the parent no more events will follow.
+    """
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    def record(self, uid: str, stage: str, **data: Any) -> None:
+        self.queue.put((uid, stage, data))
+
+    def close(self) -> None:
+        self.queue.put(None)
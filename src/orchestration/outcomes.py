@@ -0,0 +1,121 @@
+"""OutcomeStore — one Parquet row per finished task, for analysing whole runs.
+
+Rows are buffered and written as immutable part files under one directory,
+so appending never rewrites earlier results and several runs (or a resumed
+one) simply add parts:
+
+    results/outcomes/part-1718000000000000000-4242.parquet
+    results/outcomes/part-1718000360000000000-4242.parquet
+
+`load_outcomes(dir)` reads all parts into one DataFrame. Each row holds the
+task's identity (uid, tool, tags; plus the sample number for pass@k runs,
+one row per sample), its outcome (status, score, failure kind, attempts),
+wall-clock per orchestrator stage, agent steps and the LLM calls and tokens
+that reached the provider (cache hits excluded). Rows still in
+the buffer when the process dies are lost; the journal has the stages.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from telemetry import TASK_STAGES
+
+if TYPE_CHECKING:
+    from orchestrator import TaskSpec
+
+logger = logging.getLogger(__name__)
+
+FLUSH_ROWS = 25
+FLUSH_SECONDS = 60.0
+
+
+def outcome_row(
+    spec: "TaskSpec",
+    events: Iterable[Dict[str, Any]],
+    duration: Optional[float],
+    status: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Flatten a finished task and its trace spans (all attempts) into one row."""
+    row: Dict[str, Any] = {
+        "uid": spec.uid,
+        "tool": spec.tool,
+        "tags": list(spec.tags),
+        "sample": spec.sample,
+        "status": status or spec.status,
+        "score": spec.score,
+        "failure": spec.failure,
+        "attempts": spec.attempt,
+        "started": spec.started,
+        "duration": duration,
+        **{f"{stage}_seconds": 0.0 for stage in TASK_STAGES},
+        "steps": 0,
+        "llm_calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+    }
+    for e in events:
+        name, args = e["name"], e["args"]
+        if name in TASK_STAGES:
+            row[f"{name}_seconds"] += e["dur"] / 1e6
+        elif name == "agent.step":
+            row["steps"] += 1
+        elif name == "llm.call":
+            row["llm_calls"] += 1
+            row["input_tokens"] += args.get("input_tokens") or 0
+            row["output_tokens"] += args.get("output_tokens") or 0
+    return row
+
+
+class OutcomeStore:
+    """Thread-safe buffer of outcome rows, flushed to Parquet part files."""
+
+    def __init__(self, root: Path, flush_rows: int = FLUSH_ROWS, flush_seconds: float = FLUSH_SECONDS):
+        self.root = Path(root)
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()
+        self._rows: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+
+    def record(self, row: Dict[str, Any]) -> None:
+        with self._lock:
+            self._rows.append(row)
+            due = len(self._rows) >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_seconds
+        if due:
+            self.flush()
+
+    def flush(self) -> Optional[Path]:
+        with self._lock:
+            rows, self._rows = self._rows, []
+            self._last_flush = time.monotonic()
+            if not rows:
+                return None
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self.root / f"part-{time.time_ns()}-{os.getpid()}.parquet"
+            tmp = path.with_suffix(".tmp")
+            # Written aside and renamed, so a reader never sees half a part
+            pd.DataFrame(rows).to_parquet(tmp, index=False)
+            tmp.replace(path)
+        logger.debug("📦 Wrote %d outcome row(s) to %s", len(rows), path)
+        return path
+
+    def close(self) -> None:
+        path = self.flush()
+        if path:
+            logger.info("📦 Task outcomes in %s", self.root)
+
+
+def load_outcomes(root: Path) -> pd.DataFrame:
+    """All outcome rows under `root`, oldest part first."""
+    parts = sorted(Path(root).glob("part-*.parquet"))
+    if not parts:
+        return pd.DataFrame()
+    return pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
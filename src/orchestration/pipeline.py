@@ -0,0 +1,139 @@
+"""StagePipeline — per-stage async queues with their own concurrency limits.
+
+Instead of holding one worker for a task from boot to teardown, every stage
+(boot → setup → agent → evaluate → teardown) has its own queue and a fixed
+number of workers. VM boots of upcoming tasks overlap with the LLM-bound
+agent steps of running tasks, and teardown runs off the critical path.
+
+Stage functions are synchronous and run on a shared thread pool. If one
+raises, `on_error` is called and the item skips ahead to the next stage
+marked `always=True` (teardown), so resources are still released. A failed
+item for which `retry` returns True goes back to the first stage afterwards,
+keeping its admission.
+
+    pipeline = StagePipeline(
+        [Stage("boot", boot, 2), Stage("agent", act, 4), Stage("teardown", teardown, 2, always=True)],
+        on_error=lambda item, stage, exc: ...,
+    )
+    await pipeline.run(tasks, admit=acquire, release=release, retry=should_retry)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STAGE_NAMES = ("boot", "setup", "agent", "evaluate", "teardown")
+
+
+@dataclass
+class Stage(Generic[T]):
+    name: str
+    fn: Callable[[T], None]
+    concurrency: int
+    always: bool = False  # Run even if an earlier stage failed (cleanup stages)
+
+
+def parse_stage_limits(spec: str, default: int) -> Dict[str, int]:
+    """Parse "boot=2,agent=4" into a limit per stage; unspecified stages get `default`."""
+    limits = dict.fromkeys(STAGE_NAMES, default)
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.partition("=")
+        if name not in limits or not value.isdigit() or int(value) < 1:
+            raise ValueError(f"Invalid stage limit {part!r} (expected one of {', '.join(STAGE_NAMES)}=N)")
+        limits[name] = int(value)
+    return limits
+
+
+class StagePipeline(Generic[T]):
+    def __init__(self, stages: Sequence[Stage[T]], on_error: Callable[[T, str, BaseException], None]):
+        if not stages:
+            raise ValueError("StagePipeline needs at least one stage")
+        self.stages = list(stages)
+        self.on_error = on_error
+        self.queues: List[asyncio.Queue] = []
+
+    def depths(self) -> Dict[str, int]:
+        """Items waiting in front of each stage."""
+        return {stage.name: q.qsize() for stage, q in zip(self.stages, self.queues, strict=False)}
+
+    async def run(
+        self,
+        items: Sequence[T],
+        admit: Optional[Callable[[T], Awaitable[None]]] = None,
+        release: Optional[Callable[[T], Awaitable[None]]] = None,
+        retry: Optional[Callable[[T], bool]] = None,
+    ) -> None:
+        """Push every item through all stages; `admit`/`release` bracket an item's whole lifetime.
+
+        `retry` is called (on the stage threads) for every item that failed; True sends it through again.
+        """
+        if not items:
+            return
+        loop = asyncio.get_running_loop()
+        self.queues = [asyncio.Queue() for _ in self.stages]
+        threads = ThreadPoolExecutor(
+            max_workers=sum(stage.concurrency for stage in self.stages), thread_name_prefix="stage"
+        )
+        all_done = asyncio.Event()
+        remaining = len(items)
+
+        async def finish(item: T) -> None:
+            nonlocal remaining
+            if release:
+                await release(item)
+            remaining -= 1
+            if remaining == 0:
+                all_done.set()
+
+        async def worker(index: int, stage: Stage[T]) -> None:
+            queue = self.queues[index]
+            while True:
+                item, failed = await queue.get()
+                if not failed or stage.always:
+                    try:
+                        await loop.run_in_executor(threads, stage.fn, item)
+                    except Exception as exc:
+                        failed = True
+                        try:
+                            self.on_error(item, stage.name, exc)
+                        except Exception as handler_exc:
+                            logger.error("⚠️ on_error for stage %s raised: %s", stage.name, handler_exc)
+                if index + 1 < len(self.stages):
+                    self.queues[index + 1].put_nowait((item, failed))
+                elif failed and retry and await loop.run_in_executor(threads, retry, item):
+                    self.queues[0].put_nowait((item, False))
+                else:
+                    await finish(item)
+
+        async def feed() -> None:
+            for item in items:
+                if admit:
+                    await admit(item)
+                self.queues[0].put_nowait((item, False))
+
+        workers: List[asyncio.Task] = [
+            asyncio.create_task(worker(i, stage))
+            for i, stage in enumerate(self.stages)
+            for _ in range(stage.concurrency)
+        ]
+        feeder = asyncio.create_task(feed())
+        # A failing feeder would otherwise leave us waiting forever
+        feeder.add_done_callback(lambda t: t.cancelled() or t.exception() is None or all_done.set())
+        logger.info("🏭 Pipeline started: %s", ", ".join(f"{stage.name}×{stage.concurrency}" for stage in self.stages))
+        try:
+            await all_done.wait()
+            if feeder.done() and not feeder.cancelled() and feeder.exception():
+                raise feeder.exception()
+        finally:
+            for task in (feeder, *workers):
+                task.cancel()
+            await asyncio.gather(feeder, *workers, return_exceptions=True)
+            threads.shutdown(wait=True)
@@ -0,0 +1,225 @@
+"""WarmPool — keeps N sandbox VMs booted with their services healthy.
+
+Cold-booting a `SandboxExecutor` means creating the container, copying
+`data.img`, waiting for sshd and starting FastAPI + the kernel gateway. The
+pool does that work ahead of time on background threads, so a task only has
+to lease a ready executor and hand it back when it is done:
+
+    pool = WarmPool(factory=backend.create_executor, size=2, max_boots=len(tasks))
+    pool.start()
+    executor = pool.lease()
+    ...
+    pool.release(executor)          # teardown + background refill
+    pool.shutdown()
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from agent.executor import SandboxExecutor
+
+logger = logging.getLogger(__name__)
+
+ExecutorFactory = Callable[[str], "SandboxExecutor"]
+ExecutorTeardown = Callable[["SandboxExecutor"], None]
+
+
+class PoolExhaustedError(RuntimeError):
+    """Raised when no executor can be leased (boot budget spent or pool closed)."""
+
+
+class WarmPool:
+    """Thread-safe pool of pre-booted sandbox executors.
+
+    Args:
+        factory:            Cold-boots an executor for the given container name.
+        size:               Number of *idle* executors to keep ready.
+        max_boots:          Upper bound on boots over the pool's lifetime
+                            (usually the number of tasks, raised by
+                            `add_boots` for every retry), so the pool never
+                            boots VMs nobody will lease.
+        boot_workers:       Concurrent background boots (defaults to `size`).
+        max_boot_failures:  Consecutive boot failures before the pool gives up.
+        prefix:             Container name prefix for pooled VMs.
+        teardown:           Destroys an executor (defaults to `executor.cleanup()`).
+    """
+
+    def __init__(
+        self,
+        factory: ExecutorFactory,
+        size: int,
+        max_boots: Optional[int] = None,
+        boot_workers: Optional[int] = None,
+        max_boot_failures: int = 3,
+        prefix: str = "sandbox-pool",
+        teardown: Optional[ExecutorTeardown] = None,
+    ):
+        if size < 1:
+            raise ValueError("WarmPool size must be >= 1")
+        self.factory = factory
+        self.teardown = teardown or (lambda executor: executor.cleanup())
+        self.size = size
+        self.max_boots = max_boots
+        self.max_boot_failures = max_boot_failures
+        self.prefix = prefix
+
+        self._idle: "queue.Queue[Optional[SandboxExecutor]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._booting = 0
+        self._boots = 0
+        self._failures = 0
+        self._closed = False
+        self._leased: List["SandboxExecutor"] = []
+        self._boot_pool = ThreadPoolExecutor(max_workers=boot_workers or size, thread_name_prefix="warm-pool")
+
+    # ------------------------------------------------------------------
+    # Lifecycle ---------------------------------------------------------
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        """Kick off the initial boots in the background."""
+        logger.info("🔥 Warming %d sandbox VM(s)", self.size)
+        self._refill()
+
+    def shutdown(self) -> None:
+        """Stop refilling and tear down every idle executor."""
+        with self._lock:
+            self._closed = True
+        self._boot_pool.shutdown(wait=True)
+        while True:
+            try:
+                executor = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if executor is not None:
+                self._teardown(executor)
+        # Wake up any lease() still blocked on the queue
+        self._idle.put(None)
+        logger.info("🧊 Warm pool shut down")
+
+    # ------------------------------------------------------------------
+    # Lease / release ---------------------------------------------------
+    # ------------------------------------------------------------------
+    def lease(self, timeout: Optional[float] = None) -> "SandboxExecutor":
+        """Block until a healthy executor is available and hand it out."""
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise PoolExhaustedError("Warm pool is closed")
+                if self._exhausted():
+                    raise PoolExhaustedError("Warm pool has no executors left to lease")
+            try:
+                executor = self._idle.get(timeout=timeout)
+            except queue.Empty as e:
+                raise PoolExhaustedError(f"No warm executor became ready within {timeout}s") from e
+            if executor is None:  # wake-up sentinel from a failed boot or shutdown
+                # The sentinel counted as an idle VM when the failed boot tried to replace itself
+                self._refill()
+                continue
+
+            if not executor.is_healthy():
+                logger.warning("🩺 Discarding unhealthy pooled VM %s", executor.vm.cfg.container_name)
+                with self._lock:
+                    self._boots -= 1  # never served a task, give the boot back
+                self._teardown(executor)
+                self._refill()
+                continue
+
+            with self._lock:
+                self._leased.append(executor)
+            # A lease frees an idle slot → boot a replacement right away
+            self._refill()
+            logger.info("📤 Leased warm VM %s", executor.vm.cfg.container_name)
+            return executor
+
+    def release(self, executor: "SandboxExecutor", recycle: bool = False) -> None:
+        """Return a leased executor; recycle it into the pool or tear it down.
+
+        Recycling only restarts the kernel (see `SandboxExecutor.reset`), so the
+        next lease inherits the guest state this task left behind.
+        """
+        with self._lock:
+            if executor in self._leased:
+                self._leased.remove(executor)
+            closed = self._closed
+
+        if recycle and not closed:
+            try:
+                executor.reset()
+                if executor.is_healthy():
+                    logger.info("♻️ Recycled VM %s back into the pool", executor.vm.cfg.container_name)
+                    self._idle.put(executor)
+                    return
+            except Exception as e:
+                logger.warning("⚠️ Recycling %s failed: %s", executor.vm.cfg.container_name, e)
+
+        self._teardown(executor)
+
+    def add_boots(self, n: int = 1) -> None:
+        """Raise the boot budget, e.g. for a task retried after its VM was torn down."""
+        with self._lock:
+            if self.max_boots is not None:
+                self.max_boots += n
+        self._refill()
+
+    def stats(self) -> Dict[str, int]:
+        """VMs ready to lease, booting in the background and currently leased out."""
+        with self._lock:
+            return {"idle": self._idle.qsize(), "booting": self._booting, "leased": len(self._leased)}
+
+    # ------------------------------------------------------------------
+    # Internal helpers --------------------------------------------------
+    # ------------------------------------------------------------------
+    def _exhausted(self) -> bool:
+        """No idle executor, nothing booting and no boot budget left."""
+        budget_left = self.max_boots is None or self._boots < self.max_boots
+        gave_up = self._failures >= self.max_boot_failures
+        return self._idle.empty() and self._booting == 0 and (not budget_left or gave_up)
+
+    def _refill(self) -> None:
+        with self._lock:
+            if self._closed or self._failures >= self.max_boot_failures:
+                return
+            missing = self.size - self._idle.qsize() - self._booting
+            if self.max_boots is not None:
+                missing = min(missing, self.max_boots - self._boots)
+            for _ in range(max(missing, 0)):
+                self._booting += 1
+                self._boots += 1
+                self._boot_pool.submit(self._boot, f"{self.prefix}-{uuid.uuid4().hex[:8]}")
+
+    def _boot(self, container_name: str) -> None:
+        try:
+            logger.info("🚀 Booting pooled VM %s", container_name)
+            executor = self.factory(container_name)
+        except Exception as e:
+            logger.error("❌ Pooled VM %s failed to boot: %s", container_name, e)
+            with self._lock:
+                self._booting -= 1
+                self._boots -= 1  # a failed boot does not consume the budget
+                self._failures += 1
+            self._idle.put(None)
+            self._refill()
+            return
+
+        with self._lock:
+            self._booting -= 1
+            self._failures = 0
+            closed = self._closed
+        if closed:
+            self._teardown(executor)
+            return
+        logger.info("✅ Pooled VM %s ready", container_name)
+        self._idle.put(executor)
+
+    def _teardown(self, executor: "SandboxExecutor") -> None:
+        try:
+            self.teardown(executor)
+        except Exception as e:
+            logger.error("⚠️ Error tearing down pooled VM: %s", e)
@@ -0,0 +1,101 @@
+"""Reaper — tears sandbox VMs down in the background, off the task's slot.
+
+Stopping a QEMU container waits for its graceful stop timeout, then the
+container is removed and its disk directory deleted. None of that has to
+hold up the next task, so teardowns are queued to a small pool of their own:
+
+    reaper = Reaper(teardown=backend.destroy_executor, workers=2)
+    reaper.submit(executor, "sandbox-1a2b3c4d5e6f")   # returns at once
+    reaper.wait("sandbox-1a2b3c4d5e6f")               # before reusing the name / ports
+    reaper.shutdown()                                 # drains the queue
+
+`submit` only blocks once `max_pending` teardowns are queued, so a slow
+Docker daemon cannot pile up an unbounded number of dying VMs; admission
+control still sees the host's live free memory and disk while they go.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+from telemetry import span
+
+if TYPE_CHECKING:
+    from agent.executor import SandboxExecutor
+
+logger = logging.getLogger(__name__)
+
+ExecutorTeardown = Callable[["SandboxExecutor"], None]
+
+
+class Reaper:
+    """Bounded background pool of executor teardowns.
+
+    Args:
+        teardown:     Destroys an executor (e.g. `backend.destroy_executor`).
+        workers:      Concurrent teardowns.
+        max_pending:  Queued + running teardowns before `submit` blocks
+                      (defaults to twice `workers`).
+    """
+
+    def __init__(self, teardown: ExecutorTeardown, workers: int = 2, max_pending: Optional[int] = None):
+        if workers < 1:
+            raise ValueError("Reaper needs at least one worker")
+        self.teardown = teardown
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * workers)
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Future] = {}
+        self._reaped = 0
+        self._failed = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reaper")
+
+    def submit(self, executor: "SandboxExecutor", name: str) -> None:
+        """Queue `executor` (container `name`) for teardown."""
+        self._slots.acquire()
+        # Run in the caller's context, so the teardown's spans stay attributed to its task
+        context = contextvars.copy_context()
+        with self._lock:
+            future = self._pool.submit(context.run, self._reap, executor, name)
+            self._pending[name] = future
+        future.add_done_callback(lambda f: self._done(name, f))
+
+    def wait(self, name: str, timeout: Optional[float] = None) -> None:
+        """Block until a queued teardown of container `name` (if any) has finished."""
+        with self._lock:
+            future = self._pending.get(name)
+        if future is not None:
+            wait_futures([future], timeout=timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """Teardowns queued or running, finished and failed."""
+        with self._lock:
+            return {"pending": len(self._pending), "reaped": self._reaped, "failed": self._failed}
+
+    def shutdown(self) -> None:
+        """Finish every queued teardown."""
+        pending = self.stats()["pending"]
+        if pending:
+            logger.info("🪦 Waiting for %d VM teardown(s)", pending)
+        self._pool.shutdown(wait=True)
+
+    def _reap(self, executor: "SandboxExecutor", name: str) -> None:
+        with span("vm.reap", container=name):
+            self.teardown(executor)
+
+    def _done(self, name: str, future: Future) -> None:
+        self._slots.release()
+        error = future.exception()
+        with self._lock:
+            if self._pending.get(name) is future:
+                del self._pending[name]
+            if error is None:
+                self._reaped += 1
+            else:
+                self._failed += 1
+        if error is not None:
+            logger.error("⚠️ Background teardown of %s failed: %s", name, error)
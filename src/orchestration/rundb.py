@@ -0,0 +1,175 @@
+"""RunDatabase — persisted per-uid task durations for longest-job-first ordering.
+
+Every finished task appends a row (uid, tool, features, wall-clock, failure
+kind, attempts). When a new
+run is planned, each uid's expected duration is the mean of its recent runs;
+uids without history fall back to a feature estimate
+
+    tool_base + SECONDS_PER_ACTION * action_number + SECONDS_PER_CONFIG_STEP * n_config
+
+where `tool_base` is learned from other uids of the same tool when available
+and otherwise taken from `TOOL_BASE_SECONDS`.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from statistics import mean
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from orchestrator import TaskSpec
+
+# Rough boot + setup cost per tool (seconds) before any history exists
+TOOL_BASE_SECONDS: Dict[str, float] = {
+    "airbyte": 600.0,
+    "airflow": 540.0,
+    "dagster": 480.0,
+    "superset": 420.0,
+    "metabase": 420.0,
+    "snowflake": 300.0,
+    "bigquery": 300.0,
+    "servicenow": 300.0,
+    "dbt": 240.0,
+    "excel": 180.0,
+    "jupyter": 180.0,
+}
+DEFAULT_BASE_SECONDS = 300.0
+SECONDS_PER_ACTION = 45.0
+SECONDS_PER_CONFIG_STEP = 20.0
+HISTORY_WINDOW = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    uid           TEXT NOT NULL,
+    tool          TEXT NOT NULL,
+    action_number INTEGER NOT NULL,
+    n_config      INTEGER NOT NULL,
+    started       REAL NOT NULL,
+    duration      REAL NOT NULL,
+    status        TEXT NOT NULL,
+    failure       TEXT,
+    attempts      INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS runs_uid ON runs (uid);
+CREATE INDEX IF NOT EXISTS runs_tool ON runs (tool);
+"""
+
+# Columns added after the first release, for databases created before them
+_MIGRATIONS = {
+    "failure": "ALTER TABLE runs ADD COLUMN failure TEXT",
+    "attempts": "ALTER TABLE runs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 1",
+}
+
+
+def feature_estimate(spec: "TaskSpec", tool_base: Optional[float] = None) -> float:
+    """Expected seconds from the task JSON alone (no history), the same on every machine."""
+    if tool_base is None:
+        tool_base = TOOL_BASE_SECONDS.get(spec.tool, DEFAULT_BASE_SECONDS)
+    return tool_base + SECONDS_PER_ACTION * spec.steps + SECONDS_PER_CONFIG_STEP * len(spec.config)
+
+
+class RunDatabase:
+    """Small SQLite store of task durations, shared across runs."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        with self._conn:
+            for column, ddl in _MIGRATIONS.items():
+                if column not in columns:
+                    self._conn.execute(ddl)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def merge(self, other: Path) -> int:
+        """Copy the runs of another database (e.g. a shard's) that are not in this one yet."""
+        RunDatabase(other).close()  # Brings an older schema up to date
+        columns = "uid, tool, action_number, n_config, started, duration, status, failure, attempts"
+        with self._lock:
+            self._conn.execute("ATTACH DATABASE ? AS other", (str(other),))
+            try:
+                with self._conn:
+                    added = self._conn.execute(
+                        f"INSERT INTO runs ({columns}) SELECT {columns} FROM other.runs o"
+                        " WHERE NOT EXISTS (SELECT 1 FROM runs r WHERE r.uid = o.uid AND r.started = o.started)"
+                    ).rowcount
+            finally:
+                self._conn.execute("DETACH DATABASE other")
+        return added
+
+    def uids(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT DISTINCT uid FROM runs")]
+
+    # ------------------------------------------------------------------
+    # Writes ------------------------------------------------------------
+    # ------------------------------------------------------------------
+    def record(
+        self,
+        spec: "TaskSpec",
+        duration: float,
+        status: str,
+        started: Optional[float] = None,
+        failure: Optional[str] = None,
+        attempts: int = 1,
+    ) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO runs (uid, tool, action_number, n_config, started, duration, status, failure, attempts)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    spec.uid,
+                    spec.tool,
+                    spec.steps,
+                    len(spec.config),
+                    started if started is not None else time.time() - duration,
+                    duration,
+                    status,
+                    failure,
+                    attempts,
+                ),
+            )
+
+    # ------------------------------------------------------------------
+    # Estimates ---------------------------------------------------------
+    # ------------------------------------------------------------------
+    def history(self, uid: str, limit: int = HISTORY_WINDOW) -> List[float]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT duration FROM runs WHERE uid = ? ORDER BY started DESC LIMIT ?", (uid, limit)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def tool_base(self, tool: str) -> float:
+        """Mean duration of a tool's runs once the per-action/per-step share is removed."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT duration, action_number, n_config FROM runs WHERE tool = ?", (tool,)
+            ).fetchall()
+        if not rows:
+            return TOOL_BASE_SECONDS.get(tool, DEFAULT_BASE_SECONDS)
+        residuals = [d - SECONDS_PER_ACTION * a - SECONDS_PER_CONFIG_STEP * c for d, a, c in rows]
+        return max(mean(residuals), 0.0)
+
+    def estimate(self, spec: "TaskSpec") -> float:
+        """Feature-only estimate for a uid that has never run."""
+        return feature_estimate(spec, self.tool_base(spec.tool))
+
+    def expected_duration(self, spec: "TaskSpec") -> float:
+        history = self.history(spec.uid)
+        return mean(history) if history else self.estimate(spec)
+
+    def order_longest_first(self, tasks: List["TaskSpec"]) -> List["TaskSpec"]:
+        """Sort tasks by expected duration, longest first (stable for ties)."""
+        expected = {spec.uid: self.expected_duration(spec) for spec in tasks}
+        return sorted(tasks, key=lambda spec: expected[spec.uid], reverse=True)
@@ -0,0 +1,254 @@
+"""ResourceScheduler — admits tasks by free host RAM, CPU and disk.
+
+Each task declares a `VMProfile` (what its QEMU guest will consume). The
+scheduler keeps a running reservation of everything it admitted and only lets
+the next task in when its profile still fits into the host capacity *and*
+the live host numbers (MemAvailable, free disk) agree. Tasks that don't fit
+wait in FIFO order; every admission / queueing decision is logged.
+
+    scheduler = ResourceScheduler(HostCapacity.detect(disk_path), max_conc=8)
+    async with scheduler.admit(spec.uid, spec.profile):
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import os
+import re
+import shutil
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from sandbox.configs import VMConfig
+
+logger = logging.getLogger(__name__)
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def parse_size(value: str | int) -> int:
+    """Parse QEMU/Docker style sizes ("4G", "512M", "2048") into bytes."""
+    if isinstance(value, int):
+        return value
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)I?B?\s*", value.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_size(n: int) -> str:
+    return f"{n / 1024**3:.1f}G"
+
+
+def mem_available() -> int:
+    """Live MemAvailable of the host in bytes."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+
+
+# ────────────────────────────── Resources ──────────────────────────────
+@dataclass(frozen=True)
+class VMProfile:
+    """Host resources a single sandbox VM consumes."""
+
+    ram_bytes: int
+    cpu_cores: int
+    disk_bytes: int
+
+    @classmethod
+    def default(cls) -> "VMProfile":
+        """Profile of a VM booted with the VMConfig defaults (full `data.img` copy)."""
+        base_data = VMConfig.root_dir.resolve() / "vms" / "ubuntu-base" / "data.img"
+        return cls(
+            ram_bytes=parse_size(VMConfig.vm_ram),
+            cpu_cores=VMConfig.vm_cpu_cores,
+            disk_bytes=base_data.stat().st_size if base_data.exists() else 0,
+        )
+
+    @classmethod
+    def from_meta(cls, meta: dict) -> "VMProfile":
+        """Read the optional `"vm": {"ram": "8G", "cpu_cores": 2}` block of a task JSON."""
+        default = cls.default()
+        vm = meta.get("vm", {})
+        return cls(
+            ram_bytes=parse_size(vm["ram"]) if "ram" in vm else default.ram_bytes,
+            cpu_cores=int(vm.get("cpu_cores", default.cpu_cores)),
+            disk_bytes=parse_size(vm["disk"]) if "disk" in vm else default.disk_bytes,
+        )
+
+    def scaled(self, n: int) -> "VMProfile":
+        return VMProfile(self.ram_bytes * n, self.cpu_cores * n, self.disk_bytes * n)
+
+    def __str__(self) -> str:
+        return f"ram={format_size(self.ram_bytes)} cpu={self.cpu_cores} disk={format_size(self.disk_bytes)}"
+
+
+@dataclass
+class HostCapacity:
+    """Budget the scheduler may hand out to VMs."""
+
+    ram_bytes: int
+    cpu_cores: int
+    disk_bytes: int
+    disk_path: Path
+
+    @classmethod
+    def detect(
+        cls,
+        disk_path: Path,
+        ram_reserve: int = parse_size("2G"),
+        cpu_overcommit: float = 1.0,
+        disk_reserve: int = parse_size("10G"),
+    ) -> "HostCapacity":
+        """Size the budget from the host, keeping `*_reserve` for the host itself."""
+        disk_path.mkdir(parents=True, exist_ok=True)
+        ram_total = os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+        return cls(
+            ram_bytes=max(ram_total - ram_reserve, 0),
+            cpu_cores=int((os.cpu_count() or 1) * cpu_overcommit),
+            disk_bytes=max(shutil.disk_usage(disk_path).free - disk_reserve, 0),
+            disk_path=disk_path,
+        )
+
+    def reduce(self, profile: VMProfile) -> None:
+        """Permanently set aside resources (e.g. for VMs held by a warm pool)."""
+        self.ram_bytes = max(self.ram_bytes - profile.ram_bytes, 0)
+        self.cpu_cores = max(self.cpu_cores - profile.cpu_cores, 0)
+        self.disk_bytes = max(self.disk_bytes - profile.disk_bytes, 0)
+
+    def __str__(self) -> str:
+        return f"ram={format_size(self.ram_bytes)} cpu={self.cpu_cores} disk={format_size(self.disk_bytes)}"
+
+
+# ────────────────────────────── Scheduler ──────────────────────────────
+class ResourceScheduler:
+    """FIFO admission control against a `HostCapacity` budget.
+
+    Args:
+        capacity:       Total budget for admitted VMs.
+        max_conc:       Hard cap on concurrently admitted tasks (the old `-j`).
+        poll_interval:  How often queued tasks re-check live host numbers.
+    """
+
+    def __init__(self, capacity: HostCapacity, max_conc: Optional[int] = None, poll_interval: float = 5.0):
+        self.capacity = capacity
+        self.max_conc = max_conc
+        self.poll_interval = poll_interval
+        self.running = 0
+        self.reserved = VMProfile(0, 0, 0)
+        self._queue: deque[object] = deque()
+        self._cond: Optional[asyncio.Condition] = None
+        logger.info("🧮 Admission budget: %s (max %s concurrent)", capacity, max_conc or "∞")
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, uid: str, profile: VMProfile) -> AsyncIterator[None]:
+        await self.acquire(uid, profile)
+        try:
+            yield
+        finally:
+            await self.release(uid, profile)
+
+    async def acquire(self, uid: str, profile: VMProfile) -> None:
+        cond = self._condition()
+        ticket = object()
+        self._queue.append(ticket)
+        last_reason = None
+        async with cond:
+            try:
+                while True:
+                    at_head = self._queue[0] is ticket
+                    reason = self._blocker(profile) if at_head else "waiting for earlier tasks"
+                    if reason is None:
+                        break
+                    if at_head and reason != last_reason:
+                        logger.info("⏸ Queued %s (%s): %s", uid, profile, reason)
+                        last_reason = reason
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(cond.wait(), timeout=self.poll_interval)
+            except BaseException:
+                # Cancelled while queued → don't block everyone behind us
+                self._queue.remove(ticket)
+                cond.notify_all()
+                raise
+
+            self._queue.popleft()
+            self.running += 1
+            self.reserved = VMProfile(
+                self.reserved.ram_bytes + profile.ram_bytes,
+                self.reserved.cpu_cores + profile.cpu_cores,
+                self.reserved.disk_bytes + profile.disk_bytes,
+            )
+            logger.info(
+                "✅ Admitted %s (%s) → running=%d queued=%d reserved[%s] of [%s]",
+                uid,
+                profile,
+                self.running,
+                self.queued,
+                self.reserved,
+                self.capacity,
+            )
+            # The next waiter may fit as well
+            cond.notify_all()
+
+    async def release(self, uid: str, profile: VMProfile) -> None:
+        cond = self._condition()
+        async with cond:
+            self.running -= 1
+            self.reserved = VMProfile(
+                self.reserved.ram_bytes - profile.ram_bytes,
+                self.reserved.cpu_cores - profile.cpu_cores,
+                self.reserved.disk_bytes - profile.disk_bytes,
+            )
+            logger.info("📤 Released %s → running=%d queued=%d", uid, self.running, self.queued)
+            cond.notify_all()
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the running event loop
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    def _blocker(self, profile: VMProfile) -> Optional[str]:
+        """Why `profile` cannot be admitted right now, or None if it can."""
+        if self.max_conc is not None and self.running >= self.max_conc:
+            return f"concurrency cap {self.max_conc} reached"
+        if self.running == 0:
+            # Never deadlock: an oversized task runs alone
+            if not self._fits(profile):
+                logger.warning("⚠️ %s exceeds the whole budget [%s]; running it alone", profile, self.capacity)
+            return None
+        if self.reserved.ram_bytes + profile.ram_bytes > self.capacity.ram_bytes:
+            return f"RAM budget ({format_size(self.capacity.ram_bytes - self.reserved.ram_bytes)} left)"
+        if self.reserved.cpu_cores + profile.cpu_cores > self.capacity.cpu_cores:
+            return f"CPU budget ({self.capacity.cpu_cores - self.reserved.cpu_cores} cores left)"
+        if self.reserved.disk_bytes + profile.disk_bytes > self.capacity.disk_bytes:
+            return f"disk budget ({format_size(self.capacity.disk_bytes - self.reserved.disk_bytes)} left)"
+        available = mem_available()
+        if available < profile.ram_bytes:
+            return f"host MemAvailable {format_size(available)}"
+        free_disk = shutil.disk_usage(self.capacity.disk_path).free
+        if free_disk < profile.disk_bytes:
+            return f"host free disk {format_size(free_disk)}"
+        return None
+
+    def _fits(self, profile: VMProfile) -> bool:
+        return (
+            profile.ram_bytes <= self.capacity.ram_bytes
+            and profile.cpu_cores <= self.capacity.cpu_cores
+            and profile.disk_bytes <= self.capacity.disk_bytes
+        )
@@ -0,0 +1,77 @@
+"""Explicit "settled" condition that ends a task.
+
+A task is settled once
+    1. its evaluation artifacts under `spec.result` are flushed to disk, and
+    2. the optional guest-quiescence probe (a shell command run over the
+       task's SSH session) exits with status 0.
+
+The VM and the concurrency slot are released the moment both hold, instead
+of after a fixed sleep. If the probe never succeeds the task is released
+after `timeout` seconds anyway.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from agent.sandbox_agent import SandboxCodeAgent
+    from orchestrator import TaskSpec
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SettleConfig:
+    probe: Optional[str] = None  # Guest command that exits 0 once the guest is quiescent
+    timeout: float = 60.0  # Upper bound on waiting for the probe
+    interval: float = 2.0  # Delay between probe attempts
+
+
+def flush_artifacts(result_dir: Path) -> int:
+    """fsync every file under `result_dir`; returns the number of files flushed."""
+    if not result_dir.is_dir():
+        return 0
+    flushed = 0
+    for path in result_dir.rglob("*"):
+        if not path.is_file():
+            continue
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            flushed += 1
+        finally:
+            os.close(fd)
+    return flushed
+
+
+def guest_quiescent(agent: "SandboxCodeAgent", probe: str) -> bool:
+    try:
+        agent.ssh.exec_command(probe)
+        return True
+    except Exception as e:
+        logger.debug("⏳ Settle probe not satisfied: %s", e)
+        return False
+
+
+def wait_until_settled(spec: "TaskSpec", agent: "SandboxCodeAgent", cfg: SettleConfig) -> bool:
+    """Block until the task is settled; returns False when the probe timed out."""
+    start = time.monotonic()
+    flushed = flush_artifacts(spec.result)
+    logger.debug("💾 Flushed %d artifact(s) for %s", flushed, spec.uid)
+
+    if cfg.probe:
+        deadline = start + cfg.timeout
+        while not guest_quiescent(agent, cfg.probe):
+            if time.monotonic() >= deadline:
+                logger.warning("⌛ %s not quiescent after %.0fs, releasing anyway", spec.uid, cfg.timeout)
+                return False
+            time.sleep(cfg.interval)
+
+    logger.info("🏁 %s settled in %.1fs", spec.uid, time.monotonic() - start)
+    return True
@@ -0,0 +1,87 @@
+"""Setup fingerprints — which tasks can share a post-setup VM disk snapshot.
+
+A task's disk after setup is determined by the base image, the tool's
+`setup.sh` and its leading config steps. Only steps whose effect is purely
+on disk (`DISK_ONLY_STEPS`) may be folded into a snapshot; anything after
+the first step that starts processes has to run live.
+
+For every task we pick the longest disk-only config prefix that at least one
+other task of the run shares (falling back to setup.sh alone), and hash
+
+    base image (size, mtime) + setup.sh + prefix steps (+ size/mtime of files they copy)
+
+into `spec.setup_key = (fingerprint, prefix_len)`. Tasks without a setup
+script and without a shared prefix get no key.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import Counter
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from benchmark.catalog import benchmark_dir, step_kind
+from sandbox.configs import VMConfig
+
+if TYPE_CHECKING:
+    from orchestrator import TaskSpec
+
+# Config steps that only change files in the guest (safe to replay from a disk snapshot)
+DISK_ONLY_STEPS = {"copyfile_from_host_to_guest", "upload_file_to_vm"}
+
+
+def _file_stamp(path: Path) -> Optional[List[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns] if path.is_file() else None
+
+
+def _step_identity(step: Dict[str, Any], roots: Sequence[Path]) -> str:
+    """Step JSON plus a stamp of every local file it references, so edited inputs change the key."""
+    stamps = {}
+    for value in (step.get("parameters") or step.get("arguments") or {}).values():
+        if isinstance(value, str):
+            for root in roots:
+                stamp = _file_stamp(root / value)
+                if stamp:
+                    stamps[value] = stamp
+                    break
+    return json.dumps([step, stamps], sort_keys=True)
+
+
+def _disk_prefix(spec: "TaskSpec") -> List[Dict[str, Any]]:
+    prefix = []
+    for step in spec.config:
+        if step_kind(step) not in DISK_ONLY_STEPS:
+            break
+        prefix.append(step)
+    return prefix
+
+
+def plan_setup_snapshots(tasks: Sequence["TaskSpec"], base_image: Optional[Path] = None) -> None:
+    """Assign `spec.setup_key` to every task that can start from a shared setup snapshot."""
+    base_image = base_image or VMConfig.root_dir.resolve() / "vms" / "ubuntu-base" / "data.img"
+    base = hashlib.sha256(json.dumps(_file_stamp(base_image)).encode())
+    prefixes = {}
+    for spec in tasks:
+        # Relative paths in the benchmark JSON are anchored at the benchmark dir or the task folder
+        roots = (benchmark_dir(spec.tool_dir.parent), spec.folder)
+        setup = spec.tool_dir / "setup.sh"
+        head = base.copy()
+        head.update(spec.tool.encode())
+        head.update(setup.read_bytes() if setup.is_file() else b"")
+        keys = [head.copy()]
+        for step in _disk_prefix(spec):
+            head.update(_step_identity(step, roots).encode())
+            keys.append(head.copy())
+        prefixes[spec.uid] = (setup.is_file(), [k.hexdigest()[:16] for k in keys])
+
+    shared = Counter(key for _, keys in prefixes.values() for key in keys)
+    for spec in tasks:
+        has_setup, keys = prefixes[spec.uid]
+        length = max((n for n, key in enumerate(keys) if shared[key] > 1), default=0)
+        spec.setup_key = (keys[length], length) if (length or has_setup) else None
@@ -0,0 +1,96 @@
+"""Deterministic, cost-balanced sharding of a task set across machines or CI jobs.
+
+    orchestrator.py tasks.json examples --shard 2/4          # on the 2nd of 4 machines
+    python -m orchestration merge-shards results shard1/results shard2/results ...
+
+Every shard computes the same partition from the same selection: tasks are
+sorted by expected cost (longest first, uid breaks ties) and each one goes
+to the currently lightest shard (LPT), which keeps the shards' makespans
+close instead of just their task counts. Costs come from the task JSON
+(`action_number`, config steps, tool) by default; with history costs every
+shard must read the same run database, or the partitions won't line up.
+
+`merge_results` folds the shards' results roots back into one: outcome
+parts, run history and the per-task result folders.
+"""
+
+from __future__ import annotations
+
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from .rundb import RunDatabase
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse "i/n" (1-based shard index i of n shards)."""
+    index, _, count = value.partition("/")
+    if not (index.isdigit() and count.isdigit()) or not 1 <= int(index) <= int(count):
+        raise ValueError(f"Invalid shard {value!r}, expected I/N with 1 <= I <= N")
+    return int(index), int(count)
+
+
+def assign_shards(costs: Dict[str, float], count: int) -> List[List[str]]:
+    """Greedy longest-processing-time partition of uids into `count` shards."""
+    shards: List[List[str]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for uid in sorted(costs, key=lambda u: (-costs[u], u)):
+        lightest = min(range(count), key=lambda i: (loads[i], i))
+        shards[lightest].append(uid)
+        loads[lightest] += costs[uid]
+    return shards
+
+
+def shard_mapping(
+    mapping: Dict[str, List[str]], costs: Dict[str, float], index: int, count: int
+) -> Dict[str, List[str]]:
+    """The part of a tool → uids mapping that belongs to shard `index` of `count`."""
+    shards = assign_shards(costs, count)
+    loads = [sum(costs[u] for u in shard) for shard in shards]
+    mine = set(shards[index - 1])
+    logger.info(
+        "🧩 Shard %d/%d: %d of %d task(s), ~%.1fh of ~%.1fh (largest shard ~%.1fh)",
+        index,
+        count,
+        len(mine),
+        len(costs),
+        loads[index - 1] / 3600,
+        sum(loads) / 3600,
+        max(loads) / 3600,
+    )
+    return {tool: [u for u in uids if u in mine] for tool, uids in mapping.items() if any(u in mine for u in uids)}
+
+
+def merge_results(dest: Path, sources: Sequence[Path]) -> Dict[str, int]:
+    """Fold shard results roots into `dest`: outcome parts, run history and per-task folders."""
+    dest = Path(dest)
+    (dest / "outcomes").mkdir(parents=True, exist_ok=True)
+    run_db = RunDatabase(dest / "runs.sqlite")
+    merged = {"outcome_parts": 0, "runs": 0, "task_folders": 0}
+    try:
+        for source in map(Path, sources):
+            for part in sorted((source / "outcomes").glob("part-*.parquet")):
+                target = dest / "outcomes" / part.name
+                if not target.exists():
+                    shutil.copy2(part, target)
+                    merged["outcome_parts"] += 1
+            if not (source / "runs.sqlite").is_file():
+                continue
+            merged["runs"] += run_db.merge(source / "runs.sqlite")
+            shard_db = RunDatabase(source / "runs.sqlite")
+            try:
+                uids = shard_db.uids()
+            finally:
+                shard_db.close()
+            for uid in uids:
+                if (source / uid).is_dir():
+                    shutil.copytree(source / uid, dest / uid, dirs_exist_ok=True)
+                    merged["task_folders"] += 1
+    finally:
+        run_db.close()
+    logger.info("🧩 Merged %d shard(s) into %s: %s", len(sources), dest, merged)
+    return merged
@@ -4,54 +4,174 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import contextlib
+import copy
+import functools
 import importlib
 import json
+import logging
+import multiprocessing
 import os
+import queue
+import shutil
 import time
-from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 import yaml
-from smolagents import LiteLLMModel, LogLevel
+from smolagents import AgentLogger, LiteLLMModel, LogLevel
 
-from agent.build import observation_screenshot_callback, take_initial_screenshot
+from agent.build import observation_screenshot_callback, take_initial_screenshot, trace_step_callback
+from agent.executor import SandboxExecutor
 from agent.sandbox_agent import SandboxCodeAgent
+from agent.utils.llm_cache import CachedModel, ResponseCache
+from agent.utils.llm_metrics import MeteredModel
 from agent.utils.port_pool import PORT_MANAGER
+from agent.utils.rate_limit import RateLimitedModel, RateLimiter, RateLimits
+from benchmark.catalog import DEFAULT_CATALOG, TaskCatalog
 from benchmark.helpers import (
     CONFIG_DISPATCH,
     EVAL_DISPATCH,
     upload_and_execute_script,
 )
+from benchmark.plan import TaskPlan, compile_task, format_plan_report, plan_report
+from orchestration import (
+    DISK_ONLY_STEPS,
+    INFRA,
+    REPLAY,
+    Coordinator,
+    HostCapacity,
+    InfraError,
+    OutcomeStore,
+    QueueJournal,
+    Reaper,
+    ResourceScheduler,
+    RetryPolicy,
+    RunDatabase,
+    RunJournal,
+    SettleConfig,
+    Stage,
+    StagePipeline,
+    VMProfile,
+    WarmPool,
+    Worker,
+    classify,
+    feature_estimate,
+    outcome_row,
+    parse_shard,
+    parse_size,
+    parse_stage_limits,
+    plan_setup_snapshots,
+    shard_mapping,
+    wait_until_settled,
+)
+from sandbox import SnapshotStore, remove_orphans, remove_stale_container
 from sandbox.configs import SandboxVMConfig
+from simulation import ResourceSampler, SimBackend, SimLatencies, format_report, generate_examples, simulation_report
+from telemetry import METRICS, TRACER, span, start_metrics_server
+
+logger = logging.getLogger("orchestrator")
 
 # GLOBALS
 MODEL = LiteLLMModel(model_id="openai/o4-mini", api_key=os.getenv("OPENAI_API_KEY"))
 PROMPT_TEMPLATES = yaml.safe_load(importlib.resources.files("agent.prompts").joinpath("code_agent.yaml").read_text())
 
 
+AUTHORIZED_IMPORTS = ["pyautogui"]
+
+# Journal stages during which a task holds a VM (seen from the parent, also for isolated tasks)
+VM_STAGES = ("booting", "booted", "setup", "agent", "evaluate")
+
+
 # AGENT GENERATOR
-def build_agent(container_name: str) -> SandboxCodeAgent:
+def build_config(
+    container_name: str,
+    profile: Optional[VMProfile] = None,
+    source_data: Optional[Path] = None,
+    overlay_disk: bool = False,
+    memory_snapshot: bool = False,
+) -> SandboxVMConfig:
     ports = PORT_MANAGER.get_ports(container_name)
-    config = SandboxVMConfig(
+    profile = profile or VMProfile.default()
+    return SandboxVMConfig(
         container_name=container_name,
+        vm_ram=f"{profile.ram_bytes // 1024**2}M",
+        vm_cpu_cores=profile.cpu_cores,
         host_ssh_port=ports["ssh"],
         host_vnc_port=ports["vnc"],
         host_sandbox_server_port=ports["sandbox_server"],
         host_sandbox_jupyter_kernel_port=ports["jupyter"],
         host_services_dir=Path("sandbox/services/"),
+        source_data=source_data,
+        overlay_disk=overlay_disk,
+        memory_snapshot=memory_snapshot,
     )
+
+
+class DockerBackend:
+    """Real sandboxes: QEMU-in-Docker VMs driven through `SandboxExecutor`, and the global `MODEL`.
+
+    A backend boots and destroys executors for the orchestrator and supplies
+    the model and any extra evaluators; `simulation.SimBackend` implements the
+    same surface without Docker or an LLM. With `overlay_disks` every VM boots
+    from a thin qcow2 overlay on its source disk instead of a full copy; with
+    `memory_snapshots` VMs resume a saved booted guest instead of booting.
+    """
+
+    name = "docker"
+    evaluators: Dict = {}
+
+    def __init__(self, overlay_disks: bool = False, memory_snapshots: bool = False):
+        self.overlay_disks = overlay_disks
+        self.memory_snapshots = memory_snapshots
+
+    @property
+    def model(self):
+        return MODEL
+
+    def create_executor(
+        self, container_name: str, profile: Optional[VMProfile] = None, source_data: Optional[Path] = None
+    ) -> SandboxExecutor:
+        return SandboxExecutor(
+            additional_imports=AUTHORIZED_IMPORTS,
+            logger=AgentLogger(level=LogLevel.INFO),
+            config=build_config(container_name, profile, source_data, self.overlay_disks, self.memory_snapshots),
+        )
+
+    def destroy_executor(self, executor: SandboxExecutor) -> None:
+        container_name = executor.vm.cfg.container_name
+        executor.cleanup()
+        PORT_MANAGER.release(container_name)
+
+    def remove_stale(self, container_name: str) -> bool:
+        return remove_stale_container(container_name)
+
+    def collect_orphans(self) -> Dict[str, List[str]]:
+        removed = remove_orphans()
+        for container_name in removed["containers"]:
+            PORT_MANAGER.release(container_name)
+        return removed
+
+
+def build_agent(
+    container_name: str,
+    executor: Optional[SandboxExecutor] = None,
+    profile: Optional[VMProfile] = None,
+    source_data: Optional[Path] = None,
+    model=None,
+) -> SandboxCodeAgent:
     agent = SandboxCodeAgent(
         description="This agent runs in a sandboxed environment and can execute code.",
         tools=[],
-        model=MODEL,
+        model=model or MODEL,
         # add_base_tools=True,
-        additional_authorized_imports=["pyautogui"],
-        step_callbacks=[observation_screenshot_callback],
+        additional_authorized_imports=AUTHORIZED_IMPORTS,
+        step_callbacks=[trace_step_callback, observation_screenshot_callback],
         executor_type="sandbox",
-        executor_kwargs={
-            "config": config,
-        },
+        executor_kwargs={} if executor else {"config": build_config(container_name, profile, source_data)},
+        executor=executor,
         prompt_templates=PROMPT_TEMPLATES,
         verbosity_level=LogLevel.INFO,
     )
@@ -63,110 +183,931 @@ def build_agent(container_name: str) -> SandboxCodeAgent:
     return agent
 
 
+def _stage(name: str):
+    """Wrap a stage method of the Orchestrator in a timing span tagged with the task uid."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(self, spec):
+            with span(name, task=spec.key):
+                return fn(self, spec)
+
+        return wrapper
+
+    return decorator
+
+
 class TaskSpec:
-    def __init__(self, tool: str, uid: str, root: Path, results_root: Path):
+    def __init__(self, tool: str, uid: str, root: Path, results_root: Path, meta: Optional[Dict] = None):
         self.uid, self.tool = uid, tool
         self.tool_dir = root / tool
         self.folder = root / tool / uid
         self.result = results_root / uid  # <- result dir is now dynamic and clear
 
-        # Load Meta Data
-        meta = json.loads((self.folder / f"{uid}.json").read_text())
+        # Load Meta Data (from the catalog when the caller has it already)
+        if meta is None:
+            meta = json.loads((self.folder / f"{uid}.json").read_text())
         self.prompt = meta["instruction"]
         self.steps = meta.get("action_number", 6)
         self.container = f"sandbox-{uid[:12]}"
         self.config = meta.get("config", [])
-        self.evaluation = meta["evaluation"]
+        self.evaluation = meta.get("evaluation") or meta.get("evaluator") or {}
+        self.tags: List[str] = meta.get("tags", [])
+        self.plan: Optional[TaskPlan] = None  # Compiled by the Orchestrator against its handler tables
+        self.profile = VMProfile.from_meta(meta)
+        self.stage = "pending"
+        self.agent: Optional[SandboxCodeAgent] = None
+        self.started: Optional[float] = None
+        self.score: Optional[float] = None
         self.success = False
+        self.setup_key: Optional[Tuple[str, int]] = None  # (fingerprint, config steps covered)
+        self.from_snapshot = False
+        self.attempt = 1
+        self.failure: Optional[str] = None  # Failure kind (see orchestration.failures), None if clean
+        self.retry = False  # Set when an infra failure earned this task another attempt
+        self.samples = 1  # pass@k: agent attempts from one set-up VM
+        self.sample: Optional[int] = None  # Which of those attempts this spec is (None for the task itself)
+        self.source_disk: Optional[Path] = None  # Boot from this disk instead of the base image
+
+    @property
+    def key(self) -> str:
+        """Journal / trace identity: the uid, or uid#n for one sample of a pass@k task."""
+        return self.uid if self.sample is None else f"{self.uid}#{self.sample}"
+
+    @property
+    def demand(self) -> VMProfile:
+        """Resources to admit the task with (its samples run side by side)."""
+        return self.profile.scaled(self.samples)
+
+    def sibling(self, sample: int, source_disk: Path, setup_steps: int) -> "TaskSpec":
+        """One pass@k attempt: a fresh spec booting from the set-up disk, with its own container and results."""
+        sibling = copy.copy(self)
+        sibling.sample, sibling.source_disk = sample, source_disk
+        sibling.container = f"{self.container}-s{sample}"
+        sibling.result = self.result / f"sample-{sample}"
+        sibling.setup_key = (f"samples:{self.uid}", setup_steps)
+        sibling.stage, sibling.agent, sibling.started = "pending", None, None
+        sibling.score, sibling.success, sibling.failure, sibling.retry, sibling.attempt = None, False, None, False, 1
+        return sibling
+
+    @property
+    def status(self) -> str:
+        return "error" if self.stage == "failed" else ("success" if self.success else "failed")
 
 
 class Orchestrator:
-    def __init__(self, max_conc: int, mapping: Dict, examples_root: Path, results_root: Path = Path("results")):
-        self.tasks: List[TaskSpec] = [
-            TaskSpec(t, u, examples_root, results_root) for t, lst in mapping.items() for u in lst
-        ]
-        self.sem = asyncio.Semaphore(max_conc)
+    def __init__(
+        self,
+        max_conc: int,
+        mapping: Dict,
+        examples_root: Path,
+        results_root: Path = Path("results"),
+        warm_pool: int = 0,
+        recycle_vms: bool = False,
+        settle: Optional[SettleConfig] = None,
+        capacity: Optional[HostCapacity] = None,
+        run_db: Optional[RunDatabase] = None,
+        longest_first: bool = True,
+        journal: Optional[RunJournal] = None,
+        stage_limits: Optional[Dict[str, int]] = None,
+        worker: Optional[Worker] = None,
+        isolation: str = "thread",
+        catalog: Optional[TaskCatalog] = None,
+        snapshots: Optional[SnapshotStore] = None,
+        backend=None,
+        limiter: Optional[RateLimiter] = None,
+        llm_cache: Optional[ResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        outcomes: Optional[OutcomeStore] = None,
+        samples: int = 1,
+        reaper_workers: int = 0,
+    ):
+        self.examples_root, self.results_root = examples_root, results_root
+        self.backend = backend or DockerBackend()
+        self.limiter = limiter
+        self.llm_cache = llm_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.samples = samples
+        # Innermost, so `llm.call` spans time provider calls only (not cache hits or limiter queueing)
+        self.model = MeteredModel(self.backend.model)
+        if limiter:
+            self.model = RateLimitedModel(self.model, limiter)
+        if llm_cache:
+            # Outermost, so cache hits don't draw from the rate budget
+            self.model = CachedModel(self.model, llm_cache)
+        self.evaluators = {**EVAL_DISPATCH, **self.backend.evaluators}
+        self.catalog = catalog
+        self.tasks: List[TaskSpec] = [self.make_task(t, u) for t, lst in mapping.items() for u in lst]
+        if self.tasks:
+            self.tasks = select_runnable(self.tasks, results_root / "plan_report.json")
+        self.run_db = run_db or RunDatabase(results_root / "runs.sqlite")
+        self.outcomes = outcomes
+        self.worker = worker
+        # A worker streams its stage events to the coordinator's journal instead
+        self.journal = worker.journal if worker else journal or RunJournal(results_root / "journal.jsonl")
+        if longest_first:
+            # Slow tools go first so the tail of the run isn't single-threaded
+            self.tasks = self.run_db.order_longest_first(self.tasks)
+        capacity = capacity or HostCapacity.detect(SandboxVMConfig.root_dir.resolve() / "vms")
+        if warm_pool > 0:
+            # Idle pooled VMs live outside admission control, so set their share aside up front
+            capacity.reduce(VMProfile.default().scaled(warm_pool))
+        self.scheduler = ResourceScheduler(capacity, max_conc=max_conc)
         self.pool = ThreadPoolExecutor(max_workers=max_conc)
+        self.snapshots = snapshots
+        if snapshots:
+            plan_setup_snapshots(self.tasks)
+        self.stage_limits = stage_limits
+        self.isolation = isolation
+        self.recycle_vms = recycle_vms
+        if recycle_vms and warm_pool:
+            logger.warning("♻️ Recycling pooled VMs: guest disk state carries over between tasks")
+        self.settle = settle or SettleConfig()
+        # Tears VMs down in the background, so a task's slot is free as soon as its VM is handed back
+        self.reaper = Reaper(self.backend.destroy_executor, reaper_workers) if reaper_workers > 0 else None
+        self.warm_pool: Optional[WarmPool] = (
+            WarmPool(
+                factory=self.backend.create_executor,
+                teardown=self._destroy_executor,
+                size=warm_pool,
+                max_boots=None if worker else len(self.tasks),
+            )
+            if warm_pool > 0
+            else None
+        )
+        self._pipeline: Optional[StagePipeline] = None
 
     async def run_all(self):
+        if self.warm_pool:
+            self.warm_pool.start()
+        METRICS.add_collector(self._metric_samples)
+        try:
+            if self.worker:
+                await self.worker.run(self)
+            elif self.stage_limits:
+                await self._run_pipelined()
+            else:
+                await self._run_slots()
+        finally:
+            METRICS.remove_collector(self._metric_samples)
+            self.pool.shutdown(wait=True)
+            if self.warm_pool:
+                self.warm_pool.shutdown()
+            if self.reaper:
+                self.reaper.shutdown()
+            failures = Counter(t.failure for t in self.tasks if t.failure)
+            if failures:
+                retried = sum(t.attempt - 1 for t in self.tasks)
+                logger.info("📉 Failures by kind: %s (%d infra retries)", dict(failures), retried)
+
+    def make_task(self, tool: str, uid: str) -> TaskSpec:
+        meta = self.catalog.meta(uid) if self.catalog else None
+        spec = TaskSpec(tool, uid, self.examples_root, self.results_root, meta=meta)
+        spec.plan = compile_task(spec, CONFIG_DISPATCH, self.evaluators)
+        spec.samples = self.samples
+        return spec
+
+    async def _run_slots(self):
+        """One worker per admitted task, holding it from boot to teardown."""
         loop = asyncio.get_running_loop()
 
         async def _runner(task: TaskSpec):
-            async with self.sem:
-                await loop.run_in_executor(self.pool, self._run_one, task)
+            async with self.scheduler.admit(task.uid, task.demand):
+                self._transition(task, "admitted")
+                await loop.run_in_executor(self.pool, self._execute, task)
 
         await asyncio.gather(*(_runner(t) for t in self.tasks))
-        self.pool.shutdown(wait=True)
 
-    def _run_one(self, spec: TaskSpec):
-        agent = build_agent(spec.container)
+    async def _run_pipelined(self):
+        """Every stage gets its own queue and worker limit; admission brackets boot → teardown."""
+        limits = self.stage_limits
+
+        async def _admit(task: TaskSpec):
+            await self.scheduler.acquire(task.uid, task.profile)
+            self._transition(task, "admitted")
+
+        async def _release(task: TaskSpec):
+            await self.scheduler.release(task.uid, task.profile)
+
+        pipeline = self._pipeline = StagePipeline(
+            [
+                Stage("boot", self._boot, limits["boot"]),
+                Stage("setup", self._setup, limits["setup"]),
+                Stage("agent", self._act, limits["agent"]),
+                Stage("evaluate", self._score, limits["evaluate"]),
+                Stage("teardown", self._teardown, limits["teardown"], always=True),
+            ],
+            on_error=lambda task, stage, exc: self._fail(task, exc),
+        )
+        await pipeline.run(self.tasks, admit=_admit, release=_release, retry=self._retry)
 
+    def _acquire_agent(self, spec: TaskSpec) -> SandboxCodeAgent:
+        """Lease a warm VM when a pool is configured, otherwise cold-boot one for this task."""
+        if self.warm_pool:
+            executor = self.warm_pool.lease()
+        else:
+            source = spec.source_disk
+            if source is None and self.snapshots and spec.setup_key:
+                source = self.snapshots.lookup(spec.setup_key[0])
+            spec.from_snapshot = source is not None
+            executor = self.backend.create_executor(spec.container, spec.profile, source)
         try:
-            setup_script = spec.tool_dir / "setup.sh"
-            if setup_script.is_file():
-                agent.logger.log(f"🛠 Running setup.sh for {spec.uid}", level=LogLevel.INFO)
-                upload_and_execute_script(agent, setup_script)
+            return build_agent(spec.container, executor=executor, model=self.model)
+        except Exception:
+            self._release_executor(executor)
+            raise
+
+    def _release_agent(self, agent: SandboxCodeAgent, recycle: bool = True):
+        self._release_executor(agent.python_executor, recycle)
+
+    def _release_executor(self, executor: SandboxExecutor, recycle: bool = True):
+        if self.warm_pool:
+            self.warm_pool.release(executor, recycle=self.recycle_vms and recycle)
+        else:
+            self._destroy_executor(executor)
+
+    def _destroy_executor(self, executor: SandboxExecutor):
+        if self.reaper:
+            self.reaper.submit(executor, executor.vm.cfg.container_name)
+        else:
+            self.backend.destroy_executor(executor)
+
+    def _transition(self, spec: TaskSpec, stage: str, **data):
+        """Single place where a task changes stage (journaled so a crashed run can resume)."""
+        spec.stage = stage
+        self.journal.record(spec.key, stage, **data)
+        METRICS.observe_transition(stage, data)
+
+    def _metric_samples(self):
+        """Point-in-time gauges for the metrics endpoint (called from its HTTP thread)."""
+        tasks = list(self.tasks)
+        for stage, n in Counter(t.stage for t in tasks).items():
+            yield "orchestrator_tasks", {"stage": stage}, n
+        yield "orchestrator_queue_depth", {"queue": "admission"}, self.scheduler.queued
+        if self._pipeline:
+            for stage, n in self._pipeline.depths().items():
+                yield "orchestrator_queue_depth", {"queue": stage}, n
+        yield "orchestrator_running_tasks", {}, self.scheduler.running
+        # A task holds its VM from boot until teardown hands it back
+        vms = sum(t.agent is not None or t.stage in VM_STAGES for t in tasks)
+        yield "orchestrator_vms", {"state": "task"}, vms
+        if self.warm_pool:
+            pool = self.warm_pool.stats()
+            yield "orchestrator_vms", {"state": "pool_idle"}, pool["idle"]
+            yield "orchestrator_vms", {"state": "pool_booting"}, pool["booting"]
+        if self.reaper:
+            yield "orchestrator_vms", {"state": "reaping"}, self.reaper.stats()["pending"]
+        if self.limiter:
+            limiter = self.limiter.stats()
+            yield "orchestrator_llm_window", {}, limiter["window"]
+            yield "orchestrator_llm_queue_wait_seconds", {"stat": "mean"}, limiter["queue_wait_mean"]
+            yield "orchestrator_llm_queue_wait_seconds", {"stat": "max"}, limiter["queue_wait_max"]
+        if self.llm_cache:
+            cache = self.llm_cache.stats()
+            for key in ("hits", "misses", "evictions"):
+                yield "orchestrator_llm_cache", {"stat": key}, cache[key]
+
+    def _fail(self, spec: TaskSpec, exc: BaseException):
+        spec.failure = classify(exc, spec.stage)
+        spec.retry = self.retry_policy.take(spec)
+        logger.error("🔥 %s failure in task %s (%s): %s", spec.failure.capitalize(), spec.key, spec.stage, exc)
+        self._transition(spec, "failed", error=str(exc), failure=spec.failure, attempt=spec.attempt)
+
+    def _retry(self, spec: TaskSpec) -> bool:
+        """Reset a task that failed on infrastructure for another attempt on a fresh VM; False if it is final."""
+        if not spec.retry:
+            return False
+        if not self.warm_pool:
+            if self.reaper:
+                # The next attempt reuses the container name and its ports
+                self.reaper.wait(spec.container)
+            try:
+                self.backend.remove_stale(spec.container)  # In case teardown couldn't remove it
+            except Exception as e:
+                logger.warning("⚠️ Could not clear %s before retrying %s: %s", spec.container, spec.uid, e)
+        else:
+            # The failed VM was torn down rather than recycled, so the next attempt needs a boot of its own
+            self.warm_pool.add_boots()
+        spec.attempt += 1
+        spec.failure, spec.retry = None, False
+        spec.started, spec.score, spec.success, spec.from_snapshot = None, None, False, False
+        logger.warning("🔁 Retrying %s on a fresh VM (attempt %d)", spec.key, spec.attempt)
+        self._transition(spec, "retrying", attempt=spec.attempt)
+        return True
+
+    def _execute(self, spec: TaskSpec):
+        """Run one task end to end, in this process or in a child process of its own."""
+        while True:
+            if self.isolation == "process":
+                self._run_isolated(spec)
+            elif spec.samples > 1 and spec.sample is None:
+                self._run_samples(spec)
             else:
-                agent.logger.log(f"⚠️ No setup.sh found at {setup_script}", level=LogLevel.ERROR)
+                self._run_one(spec)
+            if not self._retry(spec):
+                return
 
-            # 📤 CONFIG STEPS
-            for step in spec.config:
-                func = CONFIG_DISPATCH.get(step["func"])
-                if not func:
-                    agent.logger.log(f"⚠️ Unknown step function: {step['func']}", level=LogLevel.ERROR)
-                    continue
+    def _run_isolated(self, spec: TaskSpec):
+        """Run `_run_one` in a fresh process; its stage events are replayed into our journal.
 
+        Each task gets its own single-worker process pool, so a child that crashes
+        (segfault, OOM kill) only fails its own task.
+        """
+        ctx = multiprocessing.get_context("spawn")
+        events = ctx.Queue()
+        with ProcessPoolExecutor(1, mp_context=ctx, initializer=_init_child, initargs=(events,)) as proc:
+            # Everything the child's Orchestrator needs that isn't derived from the task itself
+            options = {
+                "examples_root": self.examples_root,
+                "results_root": self.results_root,
+                "settle": self.settle,
+                "snapshots": self.snapshots,
+                "backend": self.backend,
+                "limiter": self.limiter,
+                "llm_cache": self.llm_cache,
+            }
+            future = proc.submit(_run_in_child, spec.tool, spec.uid, spec.setup_key, options)
+            while True:
                 try:
-                    kwargs = step.get("arguments", {})
-                    func(task=spec, agent=agent, **kwargs)
+                    event = events.get(timeout=1.0)
+                except queue.Empty:
+                    if future.done() and future.exception() is not None:
+                        break  # Child died before sending its sentinel
+                    continue
+                if event is None:
+                    break
+                _, stage, data = event
+                self._transition(spec, stage, **data)
+            try:
+                spec.started, spec.score, spec.success, spec.failure, spans = future.result()
+                TRACER.extend(spans)
+                # The child only classifies; whether to retry is decided here, against the run's budget
+                spec.retry = spec.stage == "failed" and self.retry_policy.take(spec)
+            except Exception as crash:
+                self._fail(spec, crash)
+                # The child never reached teardown → its VM is still around
+                try:
+                    self.backend.remove_stale(spec.container)
                 except Exception as e:
-                    agent.logger.log(f"⚠️ Step {step['func']} in {spec.uid} failed: {e}", level=LogLevel.ERROR)
+                    logger.warning("⚠️ Could not clear %s after its process crashed: %s", spec.container, e)
+        self._record(spec)
+
+    def _run_one(self, spec: TaskSpec):
+        """Run all stages of one task back to back in the calling thread."""
+        try:
+            for stage in (self._boot, self._setup, self._act, self._score):
+                stage(spec)
+        except Exception as fatal:
+            self._fail(spec, fatal)
+        finally:
+            self._teardown(spec)
 
-            # 🧠 Agent run
+    def _run_samples(self, spec: TaskSpec):
+        """pass@k: boot and set up one VM, then run every sample concurrently on a copy of its disk."""
+        source = None
+        try:
+            self._boot(spec)
+            source, setup_steps = self._prepare_samples(spec)
+        except Exception as fatal:
+            self._fail(spec, fatal)
+        finally:
+            self._release_task(spec)  # The samples only need its disk
+        if source is None:
+            self._record(spec)
+            return
+
+        siblings = [spec.sibling(n, source, setup_steps) for n in range(1, spec.samples + 1)]
+        try:
+            with ThreadPoolExecutor(len(siblings), thread_name_prefix=f"samples-{spec.uid[:8]}") as pool:
+                list(pool.map(self._execute, siblings))
+        finally:
+            shutil.rmtree(source.parent, ignore_errors=True)
+
+        scores = [s.score for s in siblings]
+        spec.score = max((score for score in scores if score is not None), default=None)
+        spec.success = any(s.success for s in siblings)
+        # A task failed as a whole only if every sample did
+        failures = [s.failure for s in siblings]
+        spec.failure = failures[0] if all(failures) else None
+        self._transition(spec, "done", score=spec.score, success=spec.success, failure=spec.failure, scores=scores)
+        self._record(spec)
+
+    @_stage("setup")
+    def _prepare_samples(self, spec: TaskSpec) -> Tuple[Path, int]:
+        """setup.sh and the disk-only config prefix on the task's VM, then a crash-consistent copy of its disk."""
+        self._transition(spec, "setup", snapshot=spec.setup_key[0] if spec.from_snapshot else None)
+        self._run_setup_script(spec)
+        # Steps that start processes don't survive a reboot from the copy, so every sample runs them itself
+        steps = len(spec.plan.config)
+        prefix = next((n for n, step in enumerate(spec.plan.config) if step.name not in DISK_ONLY_STEPS), steps)
+        skip = spec.setup_key[1] if spec.from_snapshot else 0
+        self._configure(spec, skip, max(prefix, skip))
+        vm = spec.agent.python_executor.vm
+        with span("setup.snapshot"):
+            source = vm.snapshot_disk(vm.cfg.host_container_dir.parent / f"{spec.container}-samples" / "data.img")
+        return source, max(prefix, skip)
+
+    # ------------------------------------------------------------------
+    # Stages ------------------------------------------------------------
+    # ------------------------------------------------------------------
+    @_stage("boot")
+    def _boot(self, spec: TaskSpec):
+        spec.started = time.time()
+        self._transition(spec, "booting", container=None if self.warm_pool else spec.container)
+        spec.agent = self._acquire_agent(spec)
+        self._transition(spec, "booted", container=spec.agent.python_executor.vm.cfg.container_name)
+
+    @_stage("setup")
+    def _setup(self, spec: TaskSpec):
+        self._transition(spec, "setup", snapshot=spec.setup_key[0] if spec.from_snapshot else None)
+        self._run_setup_script(spec)
+        self._maybe_snapshot(spec, steps_done=0)
+
+        # 📤 CONFIG STEPS (a setup snapshot already contains its disk-only prefix)
+        skip = spec.setup_key[1] if spec.from_snapshot else 0
+        self._configure(spec, skip, len(spec.plan.config))
+
+    def _run_setup_script(self, spec: TaskSpec):
+        # setup.sh runs even on a snapshot: it relaunches the tool's processes, its installs are no-ops by then
+        agent = spec.agent
+        setup_script = spec.tool_dir / "setup.sh"
+        if setup_script.is_file():
+            agent.logger.log(f"🛠 Running setup.sh for {spec.uid}", level=LogLevel.INFO)
+            with span("config.setup_sh"):
+                upload_and_execute_script(agent, setup_script)
+        else:
+            agent.logger.log(f"⚠️ No setup.sh found at {setup_script}", level=LogLevel.ERROR)
+
+    def _configure(self, spec: TaskSpec, start: int, stop: int):
+        """Run config steps [start, stop) of the task's plan; a failing step is logged, not fatal."""
+        agent = spec.agent
+        for n, step in enumerate(spec.plan.config[start:stop], start=start + 1):
             try:
-                result = agent.run(spec.prompt, max_steps=spec.steps, stream=False)
-                agent.logger.log(result)
-            except Exception as exc:
-                agent.logger.log(f"❌ {spec.uid} failed during execution: {exc}", level=LogLevel.ERROR)
+                with span(f"config.{step.name}"):
+                    step.func(task=spec, agent=agent, **step.arguments)
+            except Exception as e:
+                agent.logger.log(f"⚠️ Step {step.name} in {spec.uid} failed: {e}", level=LogLevel.ERROR)
+            self._maybe_snapshot(spec, steps_done=n)
 
-            self._evaluate(spec, agent)
+    def _maybe_snapshot(self, spec: TaskSpec, steps_done: int):
+        """Save the disk once setup.sh and the task's shared config prefix have run (first task per fingerprint)."""
+        if not self.snapshots or not spec.setup_key or spec.from_snapshot or steps_done != spec.setup_key[1]:
+            return
+        try:
+            with span("setup.snapshot"):
+                self.snapshots.save(spec.setup_key[0], spec.agent.python_executor.vm)
+        except Exception as e:
+            logger.warning("⚠️ Could not snapshot setup of %s: %s", spec.uid, e)
 
-            time.sleep(280)
+    @_stage("agent")
+    def _act(self, spec: TaskSpec):
+        # 🧠 Agent run
+        agent = spec.agent
+        self._transition(spec, "agent")
+        try:
+            result = agent.run(spec.prompt, max_steps=spec.steps, stream=False)
+            agent.logger.log(result)
+        except Exception as exc:
+            agent.logger.log(f"❌ {spec.uid} failed during execution: {exc}", level=LogLevel.ERROR)
+            failure = classify(exc, "agent")
+            if failure in (INFRA, REPLAY):
+                raise  # A broken sandbox or a diverged replay says nothing about the agent
+            spec.failure = failure  # Final: the VM state the agent left behind is still evaluated
+        # Code errors inside a step are fed back to the agent, so a dead kernel only shows up here
+        if not agent.python_executor.is_healthy():
+            raise InfraError(f"Sandbox of {spec.uid} became unhealthy during the agent run")
 
-        except Exception as fatal:
-            agent.logger.log(f"🔥 Unhandled error during task {spec.uid}: {fatal}", level=LogLevel.ERROR)
-        finally:
-            agent.logger.log.log("🧹 Cleaning up sandbox environment...", level=LogLevel.DEBUG)
+    @_stage("evaluate")
+    def _score(self, spec: TaskSpec):
+        self._transition(spec, "evaluate")
+        self._evaluate(spec, spec.agent)
+
+        # Release the VM and slot as soon as the task is settled
+        with span("evaluate.settle"):
+            wait_until_settled(spec, spec.agent, self.settle)
+        self._transition(spec, "done", score=spec.score, success=spec.success, failure=spec.failure)
+
+    def _teardown(self, spec: TaskSpec):
+        self._release_task(spec)
+        self._record(spec)  # After the teardown span, so the row has its duration
+
+    @_stage("teardown")
+    def _release_task(self, spec: TaskSpec):
+        agent, spec.agent = spec.agent, None
+        if agent is not None:
+            agent.logger.log("🧹 Cleaning up sandbox environment...", level=LogLevel.DEBUG)
             try:
-                agent.cleanup()
+                # A VM that failed on infrastructure is not handed to the next task
+                self._release_agent(agent, recycle=spec.failure != INFRA)
             except Exception as cleanup_err:
                 agent.logger.log(f"⚠️ Error during cleanup: {cleanup_err}", level=LogLevel.ERROR)
 
-    def _evaluate(self, spec: TaskSpec, agent: SandboxCodeAgent):
-        spec.result.mkdir(parents=True, exist_ok=True)
-        eval_spec = spec.evaluation
-        func = EVAL_DISPATCH.get(eval_spec["func"])
-        if not func:
-            print(f"⚠️ Unknown evaluation function: {eval_spec['func']}")
+    def _record(self, spec: TaskSpec):
+        # Only the final attempt of a task counts towards its duration history
+        if spec.started is None or spec.retry:
             return
+        duration = time.time() - spec.started
+        if spec.sample is None:
+            self.run_db.record(spec, duration, spec.status, spec.started, spec.failure, spec.attempt)
+        # A pass@k task gets one outcome row per sample
+        if self.outcomes and (spec.sample is not None or spec.samples == 1):
+            self.outcomes.record(outcome_row(spec, TRACER.events(task=spec.key), duration))
 
+    def _evaluate(self, spec: TaskSpec, agent: SandboxCodeAgent) -> Optional[float]:
+        spec.result.mkdir(parents=True, exist_ok=True)
+        plan = spec.plan
         try:
-            func(task=spec, agent=agent, **eval_spec.get("arguments", {}))
+            for step in plan.postconfig:
+                with span(f"postconfig.{step.name}"):
+                    step.func(task=spec, agent=agent, **step.arguments)
+            scores = []
+            for step in plan.evaluators:
+                with span(f"evaluate.{step.name}"):
+                    scores.append(step.func(task=spec, agent=agent, **step.arguments))
+            spec.score = plan.combine(scores)
+            spec.success = bool(spec.score)
         except Exception as e:
+            failure = classify(e, "evaluate")
+            if failure == INFRA:
+                raise  # A score read from a broken sandbox is meaningless
+            spec.failure = spec.failure or failure
             print(f"❌ Evaluation for {spec.uid} failed: {e}")
+        return spec.score
+
+
+def select_runnable(tasks: List[TaskSpec], report_path: Path) -> List[TaskSpec]:
+    """Drop tasks whose plan did not compile, before any VM is booted for them; writes the plan report."""
+    report = plan_report([spec.plan for spec in tasks])
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2))
+    if report["unsupported"]:
+        logger.warning("🧾 %s\nSkipping unsupported task(s), details in %s", format_plan_report(report), report_path)
+    return [spec for spec in tasks if spec.plan.ok]
+
+
+# ----------------------------------------------------------------------
+# Process isolation ----------------------------------------------------
+# ----------------------------------------------------------------------
+_CHILD_EVENTS = None
+
+
+def _init_child(events):
+    global _CHILD_EVENTS
+    _CHILD_EVENTS = events
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+
+def _run_in_child(tool: str, uid: str, setup_key: Optional[Tuple[str, int]], options: Dict):
+    """Entry point of an isolated task; returns (started, score, success, failure, spans) to the parent."""
+    journal = QueueJournal(_CHILD_EVENTS)
+    try:
+        # Admission, retries and the duration history stay with the parent
+        orch = Orchestrator(
+            1,
+            {},
+            run_db=RunDatabase(Path(":memory:")),
+            journal=journal,
+            retry_policy=RetryPolicy(max_attempts=1),
+            **options,
+        )
+        spec = orch.make_task(tool, uid)
+        spec.setup_key = setup_key
+        orch._run_one(spec)
+        orch.pool.shutdown()
+        return spec.started, spec.score, spec.success, spec.failure, TRACER.take()
+    finally:
+        journal.close()
+
+
+def write_trace(path: Path) -> None:
+    """Dump the run's spans for chrome://tracing / ui.perfetto.dev and log the per-task summary."""
+    TRACER.write(path)
+    summary = TRACER.summary()
+    path.with_suffix(".summary.txt").write_text(summary + "\n")
+    logger.info("⏱ Trace written to %s\n%s", path, summary)
 
 
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("task_file", type=Path)
+    ap.add_argument(
+        "task_file", type=Path, nargs="?", help="tool → uids mapping (optional with catalog filters or --worker)"
+    )
     ap.add_argument("examples_root", type=Path)
-    ap.add_argument("-j", "--concurrency", type=int, default=2)
+    ap.add_argument("-j", "--concurrency", type=int, default=2, help="hard cap on concurrently running tasks")
+    ap.add_argument("--warm-pool", type=int, default=0, help="keep N pre-booted sandbox VMs ready (0 = cold boot)")
+    ap.add_argument(
+        "--recycle-vms",
+        action="store_true",
+        help="hand pooled VMs back to the pool instead of tearing down; only the kernel is restarted, so guest "
+        "files, processes and packages leak into the next task",
+    )
+    ap.add_argument("--settle-probe", default=None, help="guest command that exits 0 once the VM is quiescent")
+    ap.add_argument("--settle-timeout", type=float, default=60.0, help="max seconds to wait for --settle-probe")
+    ap.add_argument("--ram-reserve", default="2G", help="host RAM kept out of the VM admission budget")
+    ap.add_argument("--disk-reserve", default="10G", help="host disk kept out of the VM admission budget")
+    ap.add_argument("--cpu-overcommit", type=float, default=1.0, help="vCPUs admitted per host core")
+    ap.add_argument("--run-db", type=Path, default=None, help="task duration history (default <results>/runs.sqlite)")
+    ap.add_argument("--mapping-order", action="store_true", help="run tasks in mapping order, not longest-first")
+    ap.add_argument(
+        "--plan-only", action="store_true", help="compile the task plans, write <results>/plan_report.json and exit"
+    )
+    ap.add_argument(
+        "--pipeline",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="STAGE=N,...",
+        help="pipelined engine with per-stage worker limits (boot, setup, agent, evaluate, teardown; default -j)",
+    )
+    ap.add_argument("--outcomes", type=Path, default=None, help="Parquet task outcomes (default <results>/outcomes/)")
+    ap.add_argument(
+        "--journal", type=Path, default=None, help="append-only run journal (default <results>/journal.jsonl)"
+    )
+    ap.add_argument("--fresh", action="store_true", help="start a new journal instead of resuming the last run")
+    ap.add_argument(
+        "--trace", type=Path, default=None, help="Chrome/Perfetto trace of the run (default <results>/trace.json)"
+    )
+    ap.add_argument("--metrics-port", type=int, default=None, help="serve live Prometheus metrics on 127.0.0.1:PORT")
+    ap.add_argument(
+        "--setup-snapshots",
+        metavar="BUDGET",
+        default=None,
+        help="snapshot VM disks after setup and share them between tasks, keeping at most BUDGET (e.g. 60G)",
+    )
+    ap.add_argument(
+        "--overlay-disks",
+        action="store_true",
+        help="boot VMs from thin qcow2 overlays on the base disk (or setup snapshot) instead of full copies",
+    )
+    ap.add_argument(
+        "--memory-snapshots",
+        action="store_true",
+        help="save the first booted VM's RAM + disk per VM profile and resume later VMs from it instead of booting",
+    )
+    ap.add_argument(
+        "--reaper-workers",
+        type=int,
+        default=2,
+        help="tear VMs down in the background on N threads, freeing task slots at once (0 = inside the slot)",
+    )
+    ap.add_argument(
+        "--no-orphan-gc",
+        action="store_true",
+        help="don't remove containers and disk dirs left behind by crashed runs at start",
+    )
+    ap.add_argument(
+        "--samples", type=int, default=1, metavar="K", help="pass@k: K agent attempts per task from one set-up VM"
+    )
+    ap.add_argument(
+        "--infra-retries", type=int, default=2, help="extra attempts of a task that failed on infrastructure"
+    )
+    ap.add_argument("--retry-budget", type=int, default=None, help="cap on infra retries over the whole run")
+    ap.add_argument(
+        "--isolation",
+        choices=("thread", "process"),
+        default="thread",
+        help="run each task in a thread of this process or in a child process of its own",
+    )
+    select = ap.add_argument_group("task selection (catalog query, combined with task_file if given)")
+    select.add_argument("--catalog", type=Path, default=None, help=f"indexed task catalog (default {DEFAULT_CATALOG})")
+    select.add_argument("--tool", help="only tasks of this tool")
+    select.add_argument("--tag", action="append", default=[], help="only tasks with this tag (repeatable)")
+    select.add_argument("--exclude-tag", action="append", default=[], help="skip tasks with this tag (repeatable)")
+    select.add_argument("--evaluator", help="only tasks evaluated with this function")
+    select.add_argument("--config-type", help="only tasks with a config step of this type")
+    select.add_argument("--shard", metavar="I/N", help="run only the I-th of N cost-balanced shards of the selection")
+    select.add_argument(
+        "--shard-cost",
+        choices=("features", "history"),
+        default="features",
+        help="balance shards by task features (same everywhere) or by the run DB's durations (must be shared)",
+    )
+    sim = ap.add_argument_group("simulation (load-test the orchestrator without Docker or an LLM)")
+    sim.add_argument(
+        "--backend",
+        choices=("docker", "sim"),
+        default="docker",
+        help="sim: fake VMs and a scripted model, results under results/sim",
+    )
+    sim.add_argument("--sim-tasks", type=int, default=0, help="generate N synthetic tasks into examples_root")
+    sim.add_argument("--sim-speed", type=float, default=1.0, help="divide every simulated latency by this factor")
+    sim.add_argument("--sim-seed", type=int, default=0, help="seed for task generation and simulated latencies")
+    sim.add_argument("--sim-provider-rpm", type=int, default=None, help="simulated provider 429s above N requests/min")
+    sim.add_argument("--sim-boot-failures", type=float, default=0.0, help="share of simulated VM boots that fail")
+    sim.add_argument("--sim-kernel-drops", type=float, default=0.0, help="share of code actions that drop the kernel")
+    llm = ap.add_argument_group("LLM rate limiting (shared by all agents and processes using the same state file)")
+    llm.add_argument("--llm-rpm", type=float, default=None, help="requests per minute budget")
+    llm.add_argument("--llm-tpm", type=float, default=None, help="tokens per minute budget")
+    llm.add_argument("--llm-concurrency", type=int, default=None, help="ceiling of the adaptive in-flight window")
+    llm.add_argument(
+        "--llm-slow-latency", type=float, default=None, help="completions slower than this shrink the window"
+    )
+    llm.add_argument(
+        "--llm-limit-state", type=Path, default=None, help="shared limiter state (default <results>/llm_limit.json)"
+    )
+    llm.add_argument("--llm-cache", type=Path, default=None, metavar="DIR", help="cache model responses by prompt hash")
+    llm.add_argument("--llm-cache-size", default="2G", help="LRU size bound of --llm-cache")
+    llm.add_argument("--llm-replay", action="store_true", help="serve only from --llm-cache; a miss fails the task")
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--coordinator", metavar="HOST:PORT", help="serve the task queue to remote workers")
+    mode.add_argument("--worker", metavar="HOST:PORT", help="pull tasks from a coordinator and run them here")
     args = ap.parse_args()
+    filters = {
+        "tool": args.tool,
+        "tags": args.tag,
+        "exclude_tags": args.exclude_tag,
+        "evaluator": args.evaluator,
+        "config_type": args.config_type,
+    }
+    if args.task_file is None and not args.worker and not any(filters.values()) and not args.sim_tasks:
+        ap.error("give a task_file and/or catalog filters (--tool, --tag, ...) unless running as --worker")
+    if args.llm_replay and not args.llm_cache:
+        ap.error("--llm-replay requires --llm-cache")
+    if args.sim_tasks and args.backend != "sim":
+        ap.error("--sim-tasks requires --backend sim")
+    if args.worker and args.plan_only:
+        ap.error("--plan-only needs the task set, which a --worker does not have")
+    if args.worker and args.shard:
+        ap.error("--shard selects from the task set, which a --worker does not have")
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        ap.error(str(e))
+    if args.worker and args.pipeline is not None:
+        ap.error("--pipeline is not supported in --worker mode")
+    if args.samples > 1 and (args.pipeline is not None or args.warm_pool or args.isolation == "process"):
+        ap.error("--samples runs in the default engine only (no --pipeline, --warm-pool or --isolation process)")
+    if args.isolation == "process" and (args.pipeline is not None or args.warm_pool):
+        ap.error("--isolation process cannot be combined with --pipeline or --warm-pool")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    docker_backend = DockerBackend(overlay_disks=args.overlay_disks, memory_snapshots=args.memory_snapshots)
+    if args.backend == "sim":
+        results_root = Path("results/sim")
+        backend = SimBackend(
+            results_root,
+            latencies=SimLatencies(boot_failure_rate=args.sim_boot_failures, kernel_drop_rate=args.sim_kernel_drops),
+            speed=args.sim_speed,
+            seed=args.sim_seed,
+            provider_rpm=args.sim_provider_rpm,
+        )
+        generated = generate_examples(args.examples_root, args.sim_tasks, seed=args.sim_seed) if args.sim_tasks else {}
+    else:
+        results_root, backend, generated = Path("results"), None, {}
+    catalog = TaskCatalog(
+        args.catalog or (results_root / DEFAULT_CATALOG.name if backend else DEFAULT_CATALOG),
+        args.examples_root.resolve(),
+    )
+    catalog.refresh()
+    snapshots = (
+        SnapshotStore(
+            parse_size(args.setup_snapshots), root=backend.root / "vms" / "snapshots" / "setup" if backend else None
+        )
+        if args.setup_snapshots
+        else None
+    )
+
+    limiter = None
+    if args.llm_rpm or args.llm_tpm or args.llm_concurrency:
+        limits = RateLimits(
+            requests_per_minute=args.llm_rpm,
+            tokens_per_minute=args.llm_tpm,
+            max_concurrency=args.llm_concurrency or args.concurrency,
+            slow_latency=args.llm_slow_latency,
+        )
+        limiter = RateLimiter(limits, args.llm_limit_state or results_root / "llm_limit.json")
+    llm_cache = (
+        ResponseCache(args.llm_cache, parse_size(args.llm_cache_size), replay_only=args.llm_replay)
+        if args.llm_cache
+        else None
+    )
+    if args.metrics_port is not None and not args.plan_only:
+        start_metrics_server(args.metrics_port)
 
-    # Load Task File
-    mapping = json.loads(args.task_file.read_text())
-    orch = Orchestrator(args.concurrency, mapping, args.examples_root.resolve())
-    asyncio.run(orch.run_all())
+    if args.worker:
+        # Tasks come from the coordinator, which also owns the journal and duration history
+        worker = Worker(args.worker, args.concurrency)
+        mapping, journal, run_db, outcomes = {}, None, RunDatabase(Path(":memory:")), None
+    else:
+        worker, run_db = None, RunDatabase(args.run_db or results_root / "runs.sqlite")
+        outcomes = OutcomeStore(args.outcomes or results_root / "outcomes")
+        mapping = json.loads(args.task_file.read_text()) if args.task_file else None
+        if mapping is None and not any(filters.values()):
+            mapping = generated
+        if any(filters.values()):
+            selected = catalog.mapping(**filters)
+            if mapping is not None:
+                selected = {tool: [u for u in mapping.get(tool, []) if u in uids] for tool, uids in selected.items()}
+            mapping = {tool: uids for tool, uids in selected.items() if uids}
+            logger.info("🔎 Selected %d task(s) from the catalog", sum(map(len, mapping.values())))
+        if shard:
+            # Before resuming, so every shard partitions the same selection
+            root = args.examples_root.resolve()
+            metas = catalog.metas(u for lst in mapping.values() for u in lst)
+            specs = [TaskSpec(t, u, root, results_root, meta=metas.get(u)) for t, lst in mapping.items() for u in lst]
+            cost = run_db.expected_duration if args.shard_cost == "history" else feature_estimate
+            mapping = shard_mapping(mapping, {spec.uid: cost(spec) for spec in specs}, *shard)
+        journal = RunJournal(args.journal or results_root / "journal.jsonl")
+        if args.plan_only:
+            pass  # Compile everything selected, whatever the journal says
+        elif args.fresh:
+            logger.info("🗂 Previous journal moved to %s", journal.rotate())
+        else:
+            # Resume: skip finished uids and clear containers of tasks cut off by a crash
+            # (in coordinator mode those containers live on the worker hosts)
+            if not args.coordinator:
+                for uid, container in journal.unfinished().items():
+                    if (backend or docker_backend).remove_stale(container):
+                        logger.info("🧹 Removed half-finished container %s (%s)", container, uid)
+            completed = journal.completed()
+            if completed:
+                logger.info("⏭ Resuming: skipping %d completed task(s)", len(completed))
+                mapping = {tool: [u for u in uids if u not in completed] for tool, uids in mapping.items()}
+
+    if args.coordinator or args.plan_only:
+        root = args.examples_root.resolve()
+        metas = catalog.metas(u for lst in mapping.values() for u in lst)
+        tasks = [TaskSpec(t, u, root, results_root, meta=metas.get(u)) for t, lst in mapping.items() for u in lst]
+        evaluators = {**EVAL_DISPATCH, **(backend or docker_backend).evaluators}
+        for spec in tasks:
+            spec.plan = compile_task(spec, CONFIG_DISPATCH, evaluators)
+        tasks = select_runnable(tasks, results_root / "plan_report.json")
+        if args.plan_only:
+            logger.info("🧾 Plan report written to %s", results_root / "plan_report.json")
+            return
+        if not args.mapping_order:
+            tasks = run_db.order_longest_first(tasks)
+        if snapshots:
+            plan_setup_snapshots(tasks)
+        try:
+            asyncio.run(Coordinator(tasks, journal, run_db, args.coordinator, outcomes).serve())
+        finally:
+            outcomes.close()
+            write_trace(args.trace or results_root / "trace.json")
+        return
+
+    if not args.no_orphan_gc:
+        # Before measuring the host, so the space of dead runs counts as free
+        (backend or docker_backend).collect_orphans()
+    capacity = HostCapacity.detect(
+        backend.root / "vms" if backend else SandboxVMConfig.root_dir.resolve() / "vms",
+        ram_reserve=parse_size(args.ram_reserve),
+        cpu_overcommit=args.cpu_overcommit,
+        disk_reserve=parse_size(args.disk_reserve),
+    )
+    if snapshots:
+        # Setup snapshots live outside admission control, like warm-pool VMs
+        capacity.reduce(VMProfile(0, 0, snapshots.budget_bytes))
+    orch = Orchestrator(
+        args.concurrency,
+        mapping,
+        args.examples_root.resolve(),
+        results_root=results_root,
+        warm_pool=args.warm_pool,
+        recycle_vms=args.recycle_vms,
+        settle=SettleConfig(probe=args.settle_probe, timeout=args.settle_timeout),
+        capacity=capacity,
+        run_db=run_db,
+        longest_first=not args.mapping_order,
+        journal=journal,
+        stage_limits=parse_stage_limits(args.pipeline, args.concurrency) if args.pipeline is not None else None,
+        worker=worker,
+        isolation=args.isolation,
+        catalog=catalog,
+        snapshots=snapshots,
+        backend=backend or docker_backend,
+        limiter=limiter,
+        llm_cache=llm_cache,
+        retry_policy=RetryPolicy(max_attempts=args.infra_retries + 1, budget=args.retry_budget),
+        outcomes=outcomes,
+        samples=args.samples,
+        reaper_workers=args.reaper_workers,
+    )
+    try:
+        with ResourceSampler() if backend else contextlib.nullcontext() as sampler:
+            asyncio.run(orch.run_all())
+    finally:
+        if outcomes:
+            outcomes.close()
+        # A worker's spans travel to the coordinator with its results
+        if not args.worker:
+            write_trace(args.trace or results_root / "trace.json")
+        if limiter:
+            logger.info("🚦 LLM limiter: %s", json.dumps(limiter.stats()))
+        if llm_cache:
+            logger.info("💾 LLM cache: %s", json.dumps(llm_cache.stats()))
+    if sampler and not args.worker:
+        report = simulation_report(sampler, TRACER.events(), args.concurrency, args.sim_speed)
+        if limiter:
+            report["llm_limiter"] = limiter.stats()
+        if llm_cache:
+            report["llm_cache"] = llm_cache.stats()
+        report["failures"] = dict(Counter(t.failure for t in orch.tasks if t.failure))
+        report["infra_retries"] = sum(t.attempt - 1 for t in orch.tasks)
+        report_path = results_root / "simulation_report.json"
+        report_path.write_text(json.dumps(report, indent=2))
+        logger.info("🧪 Simulation report written to %s\n%s", report_path, format_report(report))
 
 
 if __name__ == "__main__":
@@ -2,9 +2,12 @@
 
 from . import errors
 from .configs import SandboxVMConfig, VMConfig
+from .disks import backing_chain, clone_file, create_overlay, is_qcow2
+from .memory import MemorySnapshot
 from .sandbox import SandboxClient, SandboxVMManager
+from .snapshots import SnapshotStore
 from .ssh import SSHClient, SSHConfig
-from .virtualmachine import VMManager
+from .virtualmachine import VMManager, orphan_snapshot_dirs, remove_orphans, remove_stale_container
 
 __all__ = [
     "errors",
@@ -13,6 +16,15 @@ __all__ = [
     "SandboxVMConfig",
     "SandboxVMManager",
     "SandboxClient",
+    "SnapshotStore",
+    "MemorySnapshot",
+    "backing_chain",
+    "clone_file",
+    "create_overlay",
+    "is_qcow2",
     "VMConfig",
     "VMManager",
+    "orphan_snapshot_dirs",
+    "remove_orphans",
+    "remove_stale_container",
 ]
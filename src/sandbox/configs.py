@@ -40,6 +40,9 @@ class VMConfig:
 
     # ──────────────── Paths and Directories ────────────────
     root_dir: Path = Path("docker")  # Root directory for all VM resources
+    source_data: Optional[Path] = None  # Disk image to start from instead of the base data.img (e.g. a setup snapshot)
+    overlay_disk: bool = False  # Thin qcow2 overlay on source_data / base data.img instead of a full copy
+    memory_snapshot: bool = False  # Resume a saved booted guest (RAM + disk) instead of booting; first boot saves it
     guest_shared_dir: Path = Path("/shared")  # Shared directory path in guest
 
     # ──────────────── Other Settings ────────────────
@@ -59,6 +62,7 @@ class VMConfig:
         self.vms_dir = self.root_dir / "vms"
         self.vm_base_dir = self.vms_dir / "ubuntu-base"
         self.snapshots_dir = self.vms_dir / "snapshots"
+        self.memory_dir = self.vms_dir / "memory"
         self.base_data = self.vm_base_dir / "data.img"
 
         # Set up container paths
@@ -0,0 +1,188 @@
+"""VM disk images: thin qcow2 overlays on top of a read-only base, and fast clones.
+
+    create_overlay(base_data, container_dir / "data.img")   # milliseconds, a few hundred KB
+    backing_chain(container_dir / "data.img")               # [base_data]
+    clone_file(base_data, container_dir / "data.img")       # "reflink" | "sparse" | "copy"
+
+An overlay only stores the clusters the guest writes; reads of everything
+else fall through to its backing file. The backing path is recorded
+absolute, so the container has to see every file of the chain at the same
+path (see `VMManager.create_container`). A disk's format is taken from its
+header, not its file name: overlays and snapshots of them are still called
+`data.img`.
+
+`qemu-img` is used from the host when installed, otherwise from the VM
+container image (which ships it), at the cost of one short-lived container.
+
+Where a full copy is needed, `clone_file` asks the filesystem for a reflink
+(XFS, btrfs: shared extents, no data copied) and otherwise copies only the
+allocated ranges of the source, so the holes of a sparse image stay holes.
+"""
+
+from __future__ import annotations
+
+import errno
+import fcntl
+import logging
+import os
+import shutil
+import struct
+import subprocess
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from docker.client import DockerClient
+from docker.types import Mount
+
+import docker
+from telemetry import span
+
+from .errors import VMCreationError
+
+logger = logging.getLogger(__name__)
+
+FICLONE = 0x40049409  # linux/fs.h: _IOW(0x94, 9, int)
+COPY_CHUNK = 64 * 1024**2
+QCOW2_MAGIC = b"QFI\xfb"
+# magic, version, backing_file_offset, backing_file_size
+_QCOW2_HEADER = struct.Struct(">4sIQI")
+
+
+def is_qcow2(path: Path) -> bool:
+    with open(path, "rb") as f:
+        return f.read(4) == QCOW2_MAGIC
+
+
+def backing_file(path: Path) -> Optional[Path]:
+    """The file a qcow2 image is layered on, or None (raw image / no backing file)."""
+    with open(path, "rb") as f:
+        header = f.read(_QCOW2_HEADER.size)
+        if len(header) < _QCOW2_HEADER.size:
+            return None
+        magic, _, offset, size = _QCOW2_HEADER.unpack(header)
+        if magic != QCOW2_MAGIC or not offset:
+            return None
+        f.seek(offset)
+        name = f.read(size).decode()
+    # Relative backing names are relative to the overlay's directory
+    return Path(path).parent / name
+
+
+def backing_chain(path: Path) -> List[Path]:
+    """Every image `path` reads through, nearest first."""
+    chain: List[Path] = []
+    current = backing_file(path)
+    while current is not None:
+        if current in chain:
+            raise VMCreationError(f"Backing chain of {path} loops at {current}")
+        chain.append(current)
+        current = backing_file(current) if current.is_file() else None
+    return chain
+
+
+@span("vm.create_overlay")
+def create_overlay(
+    backing: Path,
+    overlay: Path,
+    docker_client: Optional[DockerClient] = None,
+    image: str = "qemux/qemu",
+) -> Path:
+    """Create a qcow2 `overlay` backed by `backing` (raw or qcow2), replacing any existing file."""
+    backing, overlay = Path(backing).resolve(), Path(overlay).resolve()
+    overlay.parent.mkdir(parents=True, exist_ok=True)
+    overlay.unlink(missing_ok=True)
+    fmt = "qcow2" if is_qcow2(backing) else "raw"
+    args = ["create", "-q", "-f", "qcow2", "-F", fmt, "-b", str(backing), str(overlay)]
+    try:
+        if shutil.which("qemu-img"):
+            subprocess.run(["qemu-img", *args], check=True, capture_output=True, text=True)
+        else:
+            client = docker_client or docker.from_env()
+            client.containers.run(
+                image,
+                entrypoint=["qemu-img"],
+                command=args,
+                mounts=[
+                    Mount(target=str(backing.parent), source=str(backing.parent), type="bind", read_only=True),
+                    Mount(target=str(overlay.parent), source=str(overlay.parent), type="bind"),
+                ],
+                remove=True,
+            )
+    except subprocess.CalledProcessError as e:
+        raise VMCreationError(f"qemu-img could not create {overlay}: {e.stderr.strip()}") from e
+    except docker.errors.DockerException as e:
+        raise VMCreationError(f"qemu-img (in {image}) could not create {overlay}: {e}") from e
+    logger.debug("🪶 Overlay %s on %s (%s)", overlay, backing, fmt)
+    return overlay
+
+
+def clone_file(src: Path, dest: Path) -> str:
+    """Copy `src` to `dest` as cheaply as the filesystem allows; returns the strategy used.
+
+    "reflink" shares the source's extents, "sparse" copies only its data
+    ranges and "copy" (no SEEK_DATA support) copies every byte.
+    """
+    src, dest = Path(src), Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    with span("vm.clone_disk") as info, open(src, "rb") as fin, open(dest, "wb") as fout:
+        size = os.fstat(fin.fileno()).st_size
+        try:
+            fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+            strategy = "reflink"
+        except OSError:
+            strategy = _sparse_copy(fin.fileno(), fout.fileno(), size)
+        info.update(strategy=strategy, bytes=size)
+    shutil.copymode(src, dest)
+    logger.info("🧬 Cloned %s to %s (%s, %.2fs)", src, dest, strategy, time.perf_counter() - t0)
+    return strategy
+
+
+def _data_ranges(fd: int, size: int) -> List[Tuple[int, int]]:
+    """(offset, length) of every allocated range of `fd`."""
+    ranges, pos = [], 0
+    while pos < size:
+        try:
+            start = os.lseek(fd, pos, os.SEEK_DATA)
+        except OSError as e:
+            if e.errno == errno.ENXIO:  # Only a hole left
+                break
+            raise
+        end = os.lseek(fd, start, os.SEEK_HOLE)
+        ranges.append((start, end - start))
+        pos = end
+    return ranges
+
+
+def _sparse_copy(fin: int, fout: int, size: int) -> str:
+    os.ftruncate(fout, size)  # Unwritten ranges of the destination stay holes
+    if hasattr(os, "SEEK_DATA"):
+        ranges, strategy = _data_ranges(fin, size), "sparse"
+    else:
+        ranges, strategy = [(0, size)], "copy"
+    for offset, length in ranges:
+        _copy_range(fin, fout, offset, length)
+    return strategy
+
+
+def _copy_range(fin: int, fout: int, offset: int, length: int) -> None:
+    end = offset + length
+    try:
+        if not hasattr(os, "copy_file_range"):
+            raise OSError(errno.ENOSYS, "copy_file_range is not available")
+        # In-kernel copy (may itself share extents, e.g. on NFS 4.2)
+        while offset < end:
+            copied = os.copy_file_range(fin, fout, min(end - offset, COPY_CHUNK), offset, offset)
+            if not copied:
+                break
+            offset += copied
+    except OSError as e:
+        if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+            raise
+    while offset < end:
+        chunk = os.pread(fin, min(end - offset, COPY_CHUNK), offset)
+        if not chunk:
+            break
+        os.pwrite(fout, chunk, offset)
+        offset += len(chunk)
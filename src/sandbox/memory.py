@@ -0,0 +1,106 @@
+"""Booted-memory snapshots: a guest's RAM and device state saved with its disk.
+
+    docker/vms/memory/4096M-4-1c9e0d2a7b41/
+        data.img        the disk at the moment of the save
+        state.bin       QEMU migration stream (RAM + device state, zero pages skipped)
+        snapshot.json   the VM settings the state belongs to
+
+The first VM that cold-boots with `VMConfig.memory_snapshot` set freezes
+itself once sshd answers and saves this; later VMs with the same settings
+start QEMU with `-incoming` on the saved state and resume where it left
+off, so they skip the guest's boot (kernel, GDM, sshd) entirely.
+
+A state is only valid for the exact QEMU setup it was taken with, so the
+directory name hashes the image, RAM, CPU count and base disk: a new
+`data.img` or another VM profile simply gets a directory of its own.
+Snapshots are taken before the shared folder is mounted (QEMU refuses to
+migrate a guest with a 9p export in use), so the sandbox services are
+started after a restore as after a boot.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
+
+if TYPE_CHECKING:
+    from .configs import VMConfig
+
+logger = logging.getLogger(__name__)
+
+MONITOR_PORT = 7100  # qemux/qemu's HMP monitor, reachable inside the container
+# Guest NIC address pinned for every VM that saves or restores a state, so the
+# restored device state matches the new container's network setup
+MAC_ADDRESS = "02:AD:5B:0C:00:01"
+
+
+@dataclass
+class MemorySnapshot:
+    root: Path
+
+    @classmethod
+    def for_config(cls, cfg: "VMConfig") -> "MemorySnapshot":
+        digest = hashlib.sha1(json.dumps(cls.settings(cfg), sort_keys=True).encode()).hexdigest()[:12]
+        return cls(cfg.memory_dir / f"{cfg.vm_ram}-{cfg.vm_cpu_cores}-{digest}")
+
+    @staticmethod
+    def settings(cfg: "VMConfig") -> Dict[str, Any]:
+        """Everything the saved state depends on."""
+        return {
+            "image": cfg.container_image,
+            "ram": cfg.vm_ram,
+            "cpu_cores": cfg.vm_cpu_cores,
+            "base_data": str(cfg.base_data),
+            "base_mtime_ns": cfg.base_data.stat().st_mtime_ns,
+        }
+
+    @property
+    def disk(self) -> Path:
+        return self.root / "data.img"
+
+    @property
+    def state(self) -> Path:
+        return self.root / "state.bin"
+
+    @property
+    def manifest(self) -> Path:
+        return self.root / "snapshot.json"
+
+    def exists(self) -> bool:
+        # The manifest is written last and the directory renamed into place, so this implies a complete snapshot
+        return self.manifest.is_file()
+
+    @contextlib.contextmanager
+    def saving(self, cfg: "VMConfig") -> Iterator[Optional[Path]]:
+        """Yield a scratch directory to save into, or None if the snapshot exists or another VM is saving it.
+
+        The directory becomes the snapshot when the block exits cleanly.
+        """
+        self.root.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.root.parent / f".{self.root.name}.lock", "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield None
+                return
+            if self.exists():
+                yield None
+                return
+            tmp = self.root.with_name(self.root.name + ".tmp")
+            shutil.rmtree(tmp, ignore_errors=True)
+            tmp.mkdir()
+            try:
+                yield tmp
+                (tmp / self.manifest.name).write_text(json.dumps(self.settings(cfg), indent=2))
+                shutil.rmtree(self.root, ignore_errors=True)  # An incomplete leftover
+                tmp.rename(self.root)
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+        logger.info("🧠 Memory snapshot saved to %s", self.root)
@@ -0,0 +1,182 @@
+"""Readiness probing for booting sandbox VMs.
+
+A booting VM passes these phases in order, each probed as cheaply as possible:
+
+    container   the container is running (or was started / restarted)
+    qemu        QEMU started booting the guest (container log marker)
+    tcp         the forwarded sshd port accepts a TCP connection
+    banner      the guest's sshd sends its "SSH-" banner; Docker's port forward
+                accepts connections before the guest listens, so tcp alone
+                proves little
+    ssh         an SSH login runs `echo ready`
+    fastapi     the sandbox server answers /health   (SandboxVMManager)
+    jupyter     the kernel gateway answers /api       (SandboxVMManager)
+
+Probes are retried with capped exponential backoff and jitter, so a guest is
+noticed soon after it gets ready and many booting VMs don't poll in lockstep.
+A `LogWatcher` follows the container's log stream: a boot marker wakes the
+waiting probe at once, and a container that exits fails the wait straight
+away instead of at its timeout.
+
+`Readiness` keeps the time-to-ready of every phase, measured from the start
+of the boot. Each is recorded as a `vm.ready` span (arg `phase`), which
+`telemetry.metrics` exports as a histogram.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from telemetry import TRACER
+
+from .errors import VMCreationError
+
+logger = logging.getLogger(__name__)
+
+# Container log line → phase it marks
+BOOT_MARKERS: Dict[str, str] = {"Booting": "qemu"}
+
+
+@dataclass
+class Backoff:
+    """Capped exponential delays, each randomised by ± `jitter` (a fraction of the delay)."""
+
+    initial: float = 0.25
+    maximum: float = 2.0
+    factor: float = 2.0
+    jitter: float = 0.25
+
+    def delays(self) -> Iterator[float]:
+        delay = self.initial
+        while True:
+            yield delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+            delay = min(delay * self.factor, self.maximum)
+
+
+def tcp_open(host: str, port: int, timeout: float = 1.0) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def ssh_banner(host: str, port: int, timeout: float = 2.0) -> bool:
+    """True once an sshd answers on host:port with its identification string."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as sock:
+            sock.settimeout(timeout)
+            return sock.recv(64).startswith(b"SSH-")
+    except OSError:
+        return False
+
+
+class Readiness:
+    """Time-to-ready per phase of one VM boot; finished once `final` is ready."""
+
+    def __init__(self, name: str, final: str):
+        self.name = name
+        self.final = final
+        self.phases: Dict[str, float] = {}
+        self.failure: Optional[str] = None
+        self._wake = threading.Event()
+        self._watcher: Optional[LogWatcher] = None
+        self.started, self._t0 = time.time(), time.monotonic()
+
+    def watch(self, container: Any) -> None:
+        """Follow `container`'s logs for boot markers and its exit until the boot is finished."""
+        self._watcher = LogWatcher(container, self)
+        self._watcher.start()
+
+    def mark(self, phase: str) -> None:
+        if phase in self.phases:
+            return
+        elapsed = time.monotonic() - self._t0
+        self.phases[phase] = elapsed
+        TRACER.add("vm.ready", self.started, elapsed, phase=phase)
+        self._wake.set()
+        if phase == self.final:
+            logger.info("⏱ %s ready: %s", self.name, self.summary())
+            self.close()
+
+    def fail(self, reason: str) -> None:
+        self.failure = reason
+        self._wake.set()
+
+    def wait(self, phase: str, probe: Callable[[], bool], deadline: float, backoff: Optional[Backoff] = None) -> None:
+        """Retry `probe` with backoff until it succeeds, then mark `phase` ready.
+
+        `deadline` is a `time.monotonic()` value; raises TimeoutError when it
+        passes and VMCreationError if the container exits first.
+        """
+        self._wake.clear()  # A wake-up meant for an earlier phase must not cut this one's first sleep
+        for delay in (backoff or Backoff()).delays():
+            if self.failure:
+                raise VMCreationError(f"{self.name}: {self.failure} while waiting for {phase}")
+            try:
+                if probe():
+                    self.mark(phase)
+                    return
+            except Exception as e:
+                logger.debug("⏳ %s: %s probe failed: %s", self.name, phase, e)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"{self.name}: {phase} not ready after {time.monotonic() - self._t0:.0f}s")
+            # A log marker or the container's exit cuts the sleep short
+            self._wake.wait(min(delay, remaining))
+            self._wake.clear()
+
+    def summary(self) -> str:
+        return ", ".join(f"{phase} {seconds:.1f}s" for phase, seconds in self.phases.items())
+
+    def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+
+class LogWatcher:
+    """Follows a container's log stream on a daemon thread, marking boot phases and noticing its exit."""
+
+    def __init__(self, container: Any, readiness: Readiness, markers: Optional[Dict[str, str]] = None):
+        self.container = container
+        self.readiness = readiness
+        self.markers = dict(BOOT_MARKERS if markers is None else markers)
+        self._stream = None
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._follow, name=f"logs-{readiness.name}", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._stream is not None:
+            self._stream.close()  # Unblocks the reader
+
+    def _follow(self) -> None:
+        try:
+            # Only this boot's lines: an attached or restarted container has older ones
+            self._stream = self.container.logs(stream=True, follow=True, since=self.readiness.started)
+            pending = ""
+            for chunk in self._stream:
+                pending += chunk.decode(errors="replace")
+                *lines, pending = pending.split("\n")
+                for line in lines:
+                    for marker, phase in list(self.markers.items()):
+                        if marker in line:
+                            self.readiness.mark(phase)
+                            del self.markers[marker]
+            if not self._stopped.is_set():
+                self.container.reload()
+                if self.container.status in ("exited", "dead"):
+                    self.readiness.fail(f"container exited ({self.container.attrs['State'].get('ExitCode')})")
+        except Exception as e:
+            if not self._stopped.is_set():
+                logger.debug("🪵 Stopped following logs of %s: %s", self.readiness.name, e)
@@ -19,8 +19,11 @@ from typing import Optional
 import requests
 from smolagents import AgentLogger, LogLevel
 
+from telemetry import span
+
 from .configs import SandboxVMConfig
 from .errors import RemoteCommandError, VMOperationError
+from .readiness import Backoff
 from .virtualmachine import VMManager  # our updated persistent‑session base
 
 
@@ -46,6 +49,8 @@ class SandboxClient:
 class SandboxVMManager(VMManager):
     """Specialized VMManager that wires FastAPI + Jupyter kernels inside the guest."""
 
+    READY_PHASE = "jupyter"
+
     def __init__(
         self,
         config: SandboxVMConfig,
@@ -125,13 +130,14 @@ class SandboxVMManager(VMManager):
         self.ssh.exec_command(f"mount -t 9p -o trans=virtio {tag} {mount_point}", as_root=True)
         self.logger.log(f"✅ Mounted {tag} → {mount_point}", level=LogLevel.INFO)
 
-    def _wait_for_services(self, timeout: float = 120.0, interval: float = 10):
+    @span("vm.wait_for_services")
+    def _wait_for_services(self, timeout: float = 120.0):
         self.logger.log_rule("🔎 Services Check")
         fastapi_url = f"http://{self.cfg.host_sandbox_server_host}:{self.cfg.host_sandbox_server_port}/health"
         jupyter_url = (
             f"http://{self.cfg.host_sandbox_jupyter_kernel_host}:{self.cfg.host_sandbox_jupyter_kernel_port}/api"
         )
-        deadline = time.time() + timeout
+        deadline = time.monotonic() + timeout
 
         def healthy(name: str, url: str) -> bool:
             try:
@@ -144,11 +150,13 @@ class SandboxVMManager(VMManager):
                 self.logger.log(f"⏳ {name} not ready: {e}", level=LogLevel.DEBUG)
             return False
 
-        while time.time() < deadline:
-            if healthy("FastAPI", fastapi_url) and healthy("Jupyter KG", jupyter_url):
-                return
-            time.sleep(interval)
-        raise VMOperationError(f"❌ Services not reachable within {timeout:.0f}s")
+        # start.sh needs a few seconds, so don't start polling at the SSH pace
+        backoff = Backoff(initial=1.0)
+        try:
+            self.readiness.wait("fastapi", lambda: healthy("FastAPI", fastapi_url), deadline, backoff)
+            self.readiness.wait("jupyter", lambda: healthy("Jupyter KG", jupyter_url), deadline, backoff)
+        except TimeoutError as e:
+            raise VMOperationError(f"❌ Services not reachable within {timeout:.0f}s") from e
 
     def _prepare_shared_mount(self):
         mount = f"/mnt/{self.cfg.container_name}"
@@ -182,6 +190,7 @@ class SandboxVMManager(VMManager):
     # ------------------------------------------------------------------
     # Public VM bootstrap ----------------------------------------------
     # ------------------------------------------------------------------
+    @span("vm.start_agent_vm")
     def start_agent_vm(self):
         """High-level bootstrap for the sandbox services."""
         # Superclass start() ensures container + SSH session ready.
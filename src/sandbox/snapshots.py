@@ -0,0 +1,120 @@
+"""SnapshotStore — post-setup VM disks keyed by a setup fingerprint.
+
+Layout under `VMConfig.snapshots_dir`:
+
+    snapshots/
+        setup/
+            <fingerprint>/data.img      # disk right after setup.sh + shared config prefix
+        sandbox-xxxx/data.img           # per-container working copies (not managed here)
+        sandbox-xxxx-samples/data.img   # pass@k source disk of a task (removed after its samples)
+
+A snapshot is written to a hidden temp dir and renamed into place, so
+concurrent writers (several tasks or workers with the same fingerprint)
+never expose a half-copied image. The directory mtime is bumped on every
+hit; when the store grows beyond its byte budget the least recently used
+snapshots are evicted. A snapshot that a live container overlay still reads
+through (its `data.img` is in the overlay's backing chain) is never evicted.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Set, Tuple
+
+from .configs import VMConfig
+from .disks import backing_chain
+from .errors import VMCreationError
+
+if TYPE_CHECKING:
+    from .virtualmachine import VMManager
+
+logger = logging.getLogger(__name__)
+
+SETUP_SNAPSHOTS_DIRNAME = "setup"
+
+
+def disk_usage(path: Path) -> int:
+    """Bytes actually allocated for a file (sparse images count only written blocks)."""
+    return path.stat().st_blocks * 512
+
+
+class SnapshotStore:
+    def __init__(self, budget_bytes: int, root: Optional[Path] = None):
+        self.root = root or VMConfig.root_dir.resolve() / "vms" / "snapshots" / SETUP_SNAPSHOTS_DIRNAME
+        self.budget_bytes = budget_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def image(self, fingerprint: str) -> Path:
+        return self.root / fingerprint / "data.img"
+
+    def lookup(self, fingerprint: str) -> Optional[Path]:
+        """Path of the snapshot for `fingerprint`, marking it as recently used, or None."""
+        image = self.image(fingerprint)
+        if not image.is_file():
+            return None
+        os.utime(image.parent)
+        return image
+
+    def save(self, fingerprint: str, vm: "VMManager") -> Optional[Path]:
+        """Snapshot `vm`'s disk under `fingerprint` unless another task already did."""
+        if self.image(fingerprint).is_file():
+            return self.lookup(fingerprint)
+        tmp = self.root / f".{fingerprint}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            vm.snapshot_disk(tmp / "data.img")
+            tmp.rename(self.root / fingerprint)
+        except OSError:
+            # Lost the race against a concurrent writer → theirs is as good as ours
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not self.image(fingerprint).is_file():
+                raise
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        logger.info("📸 Saved setup snapshot %s", fingerprint)
+        self.enforce_budget(keep=fingerprint)
+        return self.lookup(fingerprint)
+
+    def entries(self) -> List[Tuple[Path, int, float]]:
+        """(dir, allocated bytes, last used) of every published snapshot, least recently used first."""
+        found = []
+        for d in self.root.iterdir():
+            image = d / "data.img"
+            if d.name.startswith(".") or not image.is_file():
+                continue
+            found.append((d, disk_usage(image), d.stat().st_mtime))
+        return sorted(found, key=lambda e: e[2])
+
+    def referenced(self) -> Set[Path]:
+        """Snapshot dirs that a container disk next to the store reads through as a backing file."""
+        used = set()
+        for disk in self.root.parent.glob("*/data.img"):
+            try:
+                chain = backing_chain(disk)
+            except (OSError, ValueError, VMCreationError):
+                continue  # Container torn down (or disk rewritten) while we were reading it
+            used.update(image.resolve().parent for image in chain if image.name == "data.img")
+        return used
+
+    def enforce_budget(self, keep: Optional[str] = None) -> None:
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        in_use = self.referenced()
+        # Evict the one we just wrote only if it alone blows the budget
+        for d, size, last_used in sorted(entries, key=lambda e: e[0].name == keep):
+            if total <= self.budget_bytes:
+                break
+            if d.resolve() in in_use:
+                continue  # Backing a live overlay → deleting it would corrupt that VM's disk
+            if d.name == keep and size <= self.budget_bytes:
+                continue  # Over budget only because of snapshots still in use
+            shutil.rmtree(d, ignore_errors=True)
+            total -= size
+            logger.info(
+                "🗑 Evicted setup snapshot %s (%.1fG, unused for %.0fs)", d.name, size / 1024**3, time.time() - last_used
+            )
@@ -12,6 +12,8 @@ from typing import Any, Dict, List, Optional
 import paramiko
 from smolagents import AgentLogger, LogLevel
 
+from telemetry import span
+
 from .errors import RemoteCommandError, SSHError, VMOperationError
 
 
@@ -27,7 +29,7 @@ class SSHConfig:
     key_filename: Optional[str] = None
     connect_timeout: int = 30
     command_timeout: int = 60
-    initial_delay: int = 15
+    initial_delay: int = 0  # Fixed wait before connecting; VMManager probes sshd readiness instead
     banner_timeout: int = 10
     keepalive: int = 10
 
@@ -185,7 +187,8 @@ class SSHClient:
 
         self.logger.log(f"SFTP put: {local_path} → {remote_path}", level=LogLevel.DEBUG)
         try:
-            sftp.put(str(local_path), remote_path)
+            with span("ssh.put") as args:
+                args["bytes"] = sftp.put(str(local_path), remote_path).st_size
         except IOError as exc:
             raise VMOperationError(f"Failed to upload {local_path}: {exc}") from exc
 
@@ -238,7 +241,9 @@ class SSHClient:
             raise VMOperationError(f"Local file exists: {local_path}")
         self.logger.log(f"SFTP get: {remote_path} → {local_path}", level=LogLevel.DEBUG)
         try:
-            sftp.get(remote_path, str(local_path))
+            with span("ssh.get") as args:
+                sftp.get(remote_path, str(local_path))
+                args["bytes"] = local_path.stat().st_size
         except IOError as exc:
             raise VMOperationError(f"Failed to fetch {remote_path}: {exc}") from exc
 
@@ -267,7 +272,9 @@ class SSHClient:
             l_file = local_dir / rel
             l_file.parent.mkdir(parents=True, exist_ok=True)
             self.logger.log(f"SFTP get: {r_file} → {l_file}", level=LogLevel.DEBUG)
-            sftp.get(r_file, str(l_file))
+            with span("ssh.get") as args:
+                sftp.get(r_file, str(l_file))
+                args["bytes"] = l_file.stat().st_size
 
         files = list(_walk(remote_dir))
         if workers > 1 and len(files) > 1:
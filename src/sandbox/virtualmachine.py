@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import logging
+import os
 import shutil
+import socket
 import time
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 
 from gguf import Union  # type: ignore – assumed external stub
 from smolagents import AgentLogger, LogLevel
@@ -12,10 +16,20 @@ from docker.client import DockerClient
 from docker.errors import NotFound
 from docker.types import Mount
 
+from telemetry import span
+
 from .configs import SandboxVMConfig, VMConfig
-from .errors import VMCreationError
+from .disks import backing_chain, clone_file, create_overlay, is_qcow2
+from .errors import VMCreationError, VMOperationError
+from .memory import MAC_ADDRESS, MONITOR_PORT, MemorySnapshot
+from .readiness import Readiness, ssh_banner, tcp_open
 from .ssh import SSHClient, SSHConfig
 
+logger = logging.getLogger(__name__)
+
+# "<host>:<pid>" of the process that created a container, so leftovers of dead runs can be told apart
+OWNER_LABEL = "sandbox.owner"
+
 
 # ────────────────────────────── VMManager ──────────────────────────────
 class VMManager:
@@ -28,6 +42,9 @@ class VMManager:
         vm.close()
     """
 
+    # Boot phase after which the VM counts as ready (see sandbox.readiness)
+    READY_PHASE = "ssh"
+
     # ------------------------------------------------------------------
     # Construction ------------------------------------------------------
     # ------------------------------------------------------------------
@@ -45,6 +62,10 @@ class VMManager:
         # Prepare an *unconnected* SSHClient; we'll connect in start()
         self.ssh = SSHClient(ssh_cfg or SSHConfig(port=self.cfg.host_ssh_port), logger=self.logger)
         self.container: Union[docker.models.containers.Container, None] = None
+        # Booted-memory snapshot this VM restores from or saves (not for VMs starting from another disk)
+        self._memory = MemorySnapshot.for_config(config) if config.memory_snapshot and not config.source_data else None
+        self._restored = False
+        self.readiness: Optional[Readiness] = None
 
         self._validate_config()
         self._attach_to_existing_container_if_running()
@@ -52,6 +73,7 @@ class VMManager:
     # ------------------------------------------------------------------
     # Public lifecycle --------------------------------------------------
     # ------------------------------------------------------------------
+    @span("vm.start")
     def start(
         self,
         wait_for_ssh: bool = True,
@@ -64,7 +86,9 @@ class VMManager:
             restart_if_running:  If True, call `docker restart` even when the
                                 container is already running.
         """
-        if self.container is None:
+        self.readiness = Readiness(self.cfg.container_name, final=self.READY_PHASE)
+        created = self.container is None
+        if created:
             # nothing exists → create fresh
             self.create_container()
 
@@ -91,12 +115,22 @@ class VMManager:
                     level=LogLevel.INFO,
                 )
                 self.container.start()
+        self.readiness.mark("container")
+        self.readiness.watch(self.container)
 
         # ------------------------------------------------------------------
         if wait_for_ssh:
             self._wait_for_ssh_ready()
             self.ssh.connect()
             self.logger.log("🔗 SSH session established and cached", level=LogLevel.INFO)
+            if self._restored:
+                # The guest clock stood still while the state was on disk
+                self.ssh.exec_command(f"date -u -s @{time.time():.0f}", as_root=True)
+            elif created and self._memory is not None:
+                try:
+                    self.save_memory_snapshot()
+                except (VMOperationError, OSError, docker.errors.DockerException) as e:
+                    self.logger.log(f"⚠️ Could not save memory snapshot: {e}", level=LogLevel.INFO)
 
     def close(self, delete_storage: bool = True) -> None:
         self.cleanup(delete_storage=delete_storage)
@@ -141,20 +175,17 @@ class VMManager:
     # ------------------------------------------------------------------
     # SSH readiness -----------------------------------------------------
     # ------------------------------------------------------------------
-    def _wait_for_ssh_ready(self, timeout: float = 300, interval: float = 5.0):
+    @span("vm.wait_for_ssh")
+    def _wait_for_ssh_ready(self, timeout: float = 300):
+        """Port open → sshd banner → login, each probed with backoff (see sandbox.readiness)."""
         self.logger.log_rule("🔐 SSH Initialization")
         host, port = self.ssh.cfg.hostname, self.ssh.cfg.port
         self.logger.log(f"🔍 Waiting for sshd on {host}:{port}…", level=LogLevel.INFO)
-        deadline = time.time() + timeout
-        while time.time() < deadline:
-            try:
-                if self.ssh.exec_command("echo ready")["stdout"].strip() == "ready":
-                    self.logger.log("✅ sshd is ready", level=LogLevel.INFO)
-                    return
-            except Exception as exc:
-                self.logger.log(f"⏳ ssh probe failed: {exc}", level=LogLevel.DEBUG)
-            time.sleep(interval)
-        raise TimeoutError(f"sshd not reachable within {timeout}s")
+        deadline = time.monotonic() + timeout
+        self.readiness.wait("tcp", lambda: tcp_open(host, port), deadline)
+        self.readiness.wait("banner", lambda: ssh_banner(host, port), deadline)
+        self.readiness.wait("ssh", lambda: self.ssh.exec_command("echo ready")["stdout"].strip() == "ready", deadline)
+        self.logger.log("✅ sshd is ready", level=LogLevel.INFO)
 
     # ------------------------------------------------------------------
     # Docker / QEMU orchestration --------------------------------------
@@ -168,18 +199,55 @@ class VMManager:
 
     def copy_vm_base_data_file(self):
         self.cfg.host_container_dir.mkdir(parents=True, exist_ok=True)
-        self.logger.log(f"📦 Copying VM base file to {self.cfg.host_container_data}", level=LogLevel.INFO)
-        shutil.copy(self.cfg.base_data, self.cfg.host_container_data)
-        self.logger.log("✅ Copied VM base file", level=LogLevel.INFO)
+        source = self.cfg.source_data or (self._memory.disk if self._restored else self.cfg.base_data)
+        if self.cfg.overlay_disk:
+            self.logger.log(f"🪶 Creating overlay disk on {source}", level=LogLevel.INFO)
+            create_overlay(source, self.cfg.host_container_data, self.docker, self.cfg.container_image)
+            return
+        self.logger.log(f"📦 Copying VM disk {source} to {self.cfg.host_container_data}", level=LogLevel.INFO)
+        strategy = clone_file(source, self.cfg.host_container_data)
+        self.logger.log(f"✅ Copied VM base file ({strategy})", level=LogLevel.INFO)
+
+    def _disk_mounts(self) -> list:
+        """The container's boot disk, plus its read-only backing files at their host paths (qcow2 overlays)."""
+        data = self.cfg.host_container_data
+        if not is_qcow2(data):
+            return [Mount(target="/boot.img", source=str(data), type="bind")]  # Uses the data.img
+        chain = [Mount(target=str(p), source=str(p), type="bind", read_only=True) for p in backing_chain(data)]
+        return [Mount(target="/boot.qcow2", source=str(data), type="bind"), *chain]
+
+    def _memory_mounts(self) -> list:
+        """Where QEMU writes a state to save (the container dir) and reads one to restore, at host paths."""
+        if self._memory is None:
+            return []
+        mounts = [Mount(target=str(self.cfg.host_container_dir), source=str(self.cfg.host_container_dir), type="bind")]
+        if self._restored:
+            mounts.append(
+                Mount(target=str(self._memory.root), source=str(self._memory.root), type="bind", read_only=True)
+            )
+        return mounts
 
+    def _memory_env(self) -> dict:
+        if self._memory is None:
+            return {}
+        env = {"MAC": MAC_ADDRESS}
+        if self._restored:
+            env["ARGUMENTS"] = f"-incoming file:{self._memory.state}"
+        return env
+
+    @span("vm.create_container")
     def create_container(self):
         self.logger.log("📦 Creating VM container", level=LogLevel.INFO)
         self._ensure_image()
+        self._restored = self._memory is not None and self._memory.exists()
+        if self._restored:
+            self.logger.log(f"🧠 Restoring booted VM from {self._memory.root}", level=LogLevel.INFO)
         self.copy_vm_base_data_file()
 
         # We only have to bind the storage and shared directories
         mounts = [
-            Mount(target="/boot.img", source=str(self.cfg.host_container_data), type="bind"),  # Uses the data.img
+            *self._disk_mounts(),
+            *self._memory_mounts(),
             # Mount(target="/storage", source=str(self.cfg.host_container_dir), type="bind"),
             Mount(
                 target=str(self.cfg.guest_shared_dir), source=str(self.cfg.host_container_shared_dir), type="bind"
@@ -190,6 +258,7 @@ class VMManager:
             "RAM_SIZE": self.cfg.vm_ram,
             "CPU_CORES": str(self.cfg.vm_cpu_cores),
             "DEBUG": "Y" if self.cfg.enable_debug else "N",
+            **self._memory_env(),
             **self.cfg.extra_env,
         }
 
@@ -199,6 +268,7 @@ class VMManager:
             environment=env,
             mounts=mounts,
             ports=ports,
+            labels={OWNER_LABEL: f"{socket.gethostname()}:{os.getpid()}"},
             devices=["/dev/kvm", "/dev/net/tun"],
             cap_add=["NET_ADMIN"],
             detach=True,
@@ -206,10 +276,68 @@ class VMManager:
         )
         self.logger.log("✅ Container started", level=LogLevel.INFO)
 
+    @span("vm.snapshot_disk")
+    def snapshot_disk(self, dest: Path) -> Path:
+        """Crash-consistent copy of the guest disk: flush guest caches, freeze the VM, copy, resume.
+
+        With an overlay disk only the overlay is copied; the copy reads through the same backing files.
+        """
+        self.ssh.exec_command("sync", as_root=True)
+        self.container.pause()
+        try:
+            clone_file(self.cfg.host_container_data, dest)
+        finally:
+            self.container.unpause()
+        self.logger.log(f"📸 Disk snapshot written to {dest}", level=LogLevel.INFO)
+        return dest
+
+    @span("vm.save_memory")
+    def save_memory_snapshot(self) -> Optional[Path]:
+        """Freeze the booted guest, save its RAM/device state and disk as this config's memory snapshot, resume.
+
+        Returns None if the snapshot already exists or another VM is saving it.
+        """
+        snapshot = MemorySnapshot.for_config(self.cfg)
+        with snapshot.saving(self.cfg) as tmp:
+            if tmp is None:
+                return None
+            self.logger.log("🧠 Saving booted VM state", level=LogLevel.INFO)
+            self.ssh.exec_command("sync", as_root=True)
+            state = self.cfg.host_container_dir / snapshot.state.name
+            self._monitor("stop")
+            try:
+                self._monitor(f"migrate file:{state}")
+                self._wait_for_migration()
+                # Still stopped, so the disk matches the saved RAM
+                clone_file(self.cfg.host_container_data, tmp / snapshot.disk.name)
+            finally:
+                self._monitor("cont")
+            shutil.move(state, tmp / snapshot.state.name)
+        return snapshot.root
+
+    def _monitor(self, command: str, wait: float = 1.0) -> str:
+        """Run an HMP command on the QEMU monitor inside the container and return its output."""
+        script = f'exec 3<>/dev/tcp/127.0.0.1/{MONITOR_PORT} && echo "$1" >&3 && timeout {wait} cat <&3'
+        result = self.container.exec_run(["bash", "-c", script, "monitor", command])
+        return result.output.decode(errors="replace")
+
+    def _wait_for_migration(self, timeout: float = 300, interval: float = 1.0) -> None:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            status = self._monitor("info migrate")
+            if "Migration status: completed" in status:
+                return
+            if "Migration status: failed" in status or "Migration status: cancelled" in status:
+                raise VMOperationError(f"Saving the VM state failed:\n{status}")
+            time.sleep(interval)
+        raise VMOperationError(f"Saving the VM state took longer than {timeout}s")
+
     # ------------------------------------------------------------------
     # Cleanup -----------------------------------------------------------
     # ------------------------------------------------------------------
     def cleanup(self, delete_storage: bool = True):
+        if self.readiness is not None:
+            self.readiness.close()
         if self.container:
             self.container.stop()
             self.container.remove(force=True)
@@ -218,3 +346,95 @@ class VMManager:
         if delete_storage:
             shutil.rmtree(self.cfg.host_container_dir, ignore_errors=True)
         self.ssh.close()
+
+
+# ────────────────────────────── Stale containers ──────────────────────────────
+def remove_stale_container(
+    container_name: str,
+    docker_client: Optional[DockerClient] = None,
+    root_dir: Path = VMConfig.root_dir,
+) -> bool:
+    """Force-remove a container left behind by a crashed run, plus its snapshot dir.
+
+    Returns True if a container was found and removed.
+    """
+    client = docker_client or docker.from_env()
+    removed = False
+    try:
+        client.containers.get(container_name).remove(force=True)
+        removed = True
+    except NotFound:
+        pass
+    shutil.rmtree(root_dir.resolve() / "vms" / "snapshots" / container_name, ignore_errors=True)
+    return removed
+
+
+# ────────────────────────────── Orphans ──────────────────────────────
+def _owner_gone(owner: str) -> bool:
+    """True if `owner` ("<host>:<pid>") is a process on this host that no longer runs."""
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass  # Alive, someone else's
+    return False
+
+
+def orphan_snapshot_dirs(snapshots_dir: Path, live: Iterable[str], min_age: float = 600) -> List[Path]:
+    """Per-container disk dirs (`sandbox-*`, incl. pass@k `*-samples`) that no live container uses.
+
+    Only `sandbox-*` names are candidates, so setup snapshots never are; dirs
+    touched within `min_age` seconds are skipped, since a booting VM creates
+    its dir before its container.
+    """
+    live = set(live)
+    cutoff = time.time() - min_age
+    orphans = []
+    for path in sorted(Path(snapshots_dir).glob("sandbox-*")):
+        if not path.is_dir() or path.stat().st_mtime > cutoff:
+            continue
+        base = path.name.removesuffix("-samples")
+        # A samples dir is in use while any of its sample containers (`<base>-s<n>`) lives
+        if not any(name == base or name.startswith(f"{base}-") for name in live):
+            orphans.append(path)
+    return orphans
+
+
+def remove_orphans(
+    docker_client: Optional[DockerClient] = None,
+    root_dir: Path = VMConfig.root_dir,
+    min_age: float = 600,
+) -> Dict[str, List[str]]:
+    """Remove `sandbox-*` containers whose creating process on this host is gone, then unused disk dirs.
+
+    Unlabelled containers (created before owners were recorded) are left alone.
+    """
+    client = docker_client or docker.from_env()
+    removed: Dict[str, List[str]] = {"containers": [], "dirs": []}
+    live = []
+    for container in client.containers.list(all=True, filters={"name": "sandbox-"}):
+        if not container.name.startswith("sandbox-"):
+            continue
+        owner = container.labels.get(OWNER_LABEL)
+        if owner and _owner_gone(owner):
+            try:
+                container.remove(force=True)
+                removed["containers"].append(container.name)
+                continue
+            except NotFound:
+                continue
+        live.append(container.name)
+    for path in orphan_snapshot_dirs(root_dir.resolve() / "vms" / "snapshots", live, min_age):
+        shutil.rmtree(path, ignore_errors=True)
+        removed["dirs"].append(path.name)
+    if removed["containers"] or removed["dirs"]:
+        logger.info(
+            "🪦 Removed %d orphaned container(s) and %d disk dir(s) of dead runs",
+            len(removed["containers"]),
+            len(removed["dirs"]),
+        )
+    return removed
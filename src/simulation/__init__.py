@@ -0,0 +1,30 @@
+"""Simulation backend: drive the orchestrator without Docker, QEMU or an LLM.
+
+    python orchestrator.py examples_sim --backend sim --sim-tasks 2000 -j 64 --sim-speed 100
+
+generates a synthetic examples tree, runs it against `SimBackend` (local
+processes + canned latencies) with a `ScriptedModel`, and writes
+`results/sim/simulation_report.json` with scheduling overhead, thread usage
+and memory growth.
+"""
+
+from .backend import SimBackend, SimClock, SimExecutor, SimLatencies, SimVMConfig, simulated_evaluator
+from .model import ScriptedModel, SimRateLimitError
+from .report import ResourceSampler, format_report, simulation_report
+from .tasks import SIM_TOOLS, generate_examples
+
+__all__ = [
+    "ResourceSampler",
+    "SIM_TOOLS",
+    "ScriptedModel",
+    "SimBackend",
+    "SimClock",
+    "SimExecutor",
+    "SimLatencies",
+    "SimRateLimitError",
+    "SimVMConfig",
+    "format_report",
+    "generate_examples",
+    "simulated_evaluator",
+    "simulation_report",
+]
@@ -0,0 +1,359 @@
+"""SimBackend — sandboxes without Docker, QEMU or a network.
+
+Implements the surface the orchestrator and the benchmark helpers use from
+`SandboxExecutor` / `SandboxVMManager` / `SSHClient` / `SandboxClient`:
+
+    executor.vm.cfg.{container_name, host_container_shared_dir, ...}
+    executor.vm.ssh.{exec_command, put_file, put_directory, get_file}
+    executor.vm.sandbox_client.{health, take_screenshot}
+    executor.vm.snapshot_disk(dest)
+    executor.run_code_raise_errors / attach_logger / is_healthy / reset / cleanup
+
+Every "VM" is one idle local process (so process and fd counts behave like
+the real thing) and every remote operation sleeps for a canned latency
+instead. Each sleep is recorded as a `sim.<kind>` span of the current task,
+which is how the report tells injected latency apart from the
+orchestrator's own overhead.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+from smolagents import AgentLogger, LogLevel
+from smolagents.remote_executors import RemotePythonExecutor
+from smolagents.tools import Tool
+from websocket import WebSocketConnectionClosedException
+
+from sandbox.disks import clone_file
+from sandbox.errors import VMCreationError, VMOperationError
+from sandbox.virtualmachine import orphan_snapshot_dirs
+from telemetry import TRACER, span
+
+from .model import ScriptedModel
+
+if TYPE_CHECKING:
+    from agent.sandbox_agent import SandboxCodeAgent
+    from orchestration import VMProfile
+    from orchestrator import TaskSpec
+
+SCREENSHOT_SIZE = (1280, 800)
+
+
+@dataclass
+class SimLatencies:
+    """Median latency in seconds of every simulated operation (real-run ballpark figures)."""
+
+    boot: float = 60.0  # container start + data.img copy + QEMU boot + sshd up
+    services: float = 15.0  # FastAPI server and Jupyter kernel gateway reachable
+    ssh: float = 0.3  # one exec_command round trip
+    transfer: float = 0.5  # one SFTP put / get
+    code: float = 2.0  # one code action in the guest kernel
+    screenshot: float = 0.4
+    llm: float = 6.0  # one model completion
+    teardown: float = 4.0  # container stop + remove
+    jitter: float = 0.3  # sigma of the log-normal spread around each median
+    boot_failure_rate: float = 0.0  # share of boots that fail like a broken container would
+    kernel_drop_rate: float = 0.0  # share of code actions that lose the kernel websocket for good
+
+
+class SimClock:
+    """Draws latencies, sleeps them (divided by `speed`) and records them as spans."""
+
+    def __init__(self, latencies: SimLatencies, speed: float = 1.0, seed: int = 0):
+        self.latencies = latencies
+        self.speed = speed
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Shipped to isolated task processes; each gets its own lock and stream
+        return {"latencies": self.latencies, "speed": self.speed, "seed": self.seed}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+        # Every task process would otherwise replay the same draws, e.g. fail each retry of a task alike
+        self._rng = random.Random(f"{self.seed}:{os.getpid()}")
+
+    def chance(self, p: float) -> bool:
+        with self._lock:
+            return self._rng.random() < p
+
+    def wait(self, kind: str) -> float:
+        """Sleep for one `kind` operation; returns the (scaled) seconds slept."""
+        with self._lock:
+            seconds = getattr(self.latencies, kind) * self._rng.lognormvariate(0.0, self.latencies.jitter) / self.speed
+        start = time.time()
+        time.sleep(seconds)
+        # The span holds the injected latency, not the measured sleep, so oversleeping counts as overhead
+        TRACER.add(f"sim.{kind}", start, seconds)
+        return seconds
+
+
+_SCREENSHOT: Optional[bytes] = None
+
+
+def _screenshot_png() -> bytes:
+    global _SCREENSHOT
+    if _SCREENSHOT is None:
+        buf = io.BytesIO()
+        Image.new("RGB", SCREENSHOT_SIZE, (48, 10, 36)).save(buf, format="PNG")
+        _SCREENSHOT = buf.getvalue()
+    return _SCREENSHOT
+
+
+# ────────────────────────────── Config ──────────────────────────────
+@dataclass
+class SimVMConfig:
+    """The subset of `SandboxVMConfig` that tasks and helpers read, rooted in a scratch dir."""
+
+    container_name: str
+    root_dir: Path
+    source_data: Optional[Path] = None
+    sandbox_task_setup_log: str = "task-setup.log"
+
+    def __post_init__(self):
+        self.root_dir = Path(self.root_dir).resolve()
+        self.host_container_shared_dir = self.root_dir / "shared" / self.container_name
+        self.host_container_dir = self.root_dir / "vms" / "snapshots" / self.container_name
+        self.host_container_data = self.host_container_dir / "data.img"
+        for p in (self.host_container_dir, self.host_container_shared_dir):
+            p.mkdir(parents=True, exist_ok=True)
+
+
+# ────────────────────────────── Guest stand-ins ──────────────────────────────
+class SimSSH:
+    def __init__(self, vm: "SimVM"):
+        self.vm = vm
+        self.logger = vm.logger
+
+    def exec_command(
+        self,
+        cmd: str,
+        cwd: str | None = None,
+        env: Dict[str, str] | None = None,
+        *,
+        as_root: bool = False,
+        block: bool = True,
+    ) -> Dict[str, Any] | None:
+        self.logger.log(f"✨ sim ssh $ {cmd}", level=LogLevel.DEBUG)
+        self.vm.clock.wait("ssh")
+        return {"status": 0, "stdout": "", "stderr": ""} if block else None
+
+    def put_file(self, local, remote, *, mkdir_parents: bool = True, overwrite: bool = True) -> None:
+        local_path = Path(local).expanduser().resolve()
+        if not local_path.is_file():
+            raise VMOperationError(f"Local file not found: {local_path}")
+        with span("ssh.put", bytes=local_path.stat().st_size):
+            self.vm.clock.wait("transfer")
+
+    def put_directory(self, local_dir, remote_dir, *, exclude: Optional[List] = None, workers: int = 1) -> None:
+        local_dir = Path(local_dir).expanduser().resolve()
+        if not local_dir.is_dir():
+            raise VMOperationError(f"Local directory not found: {local_dir}")
+        size = sum(f.stat().st_size for f in local_dir.rglob("*") if f.is_file())
+        with span("ssh.put", bytes=size):
+            self.vm.clock.wait("transfer")
+
+    def get_file(self, remote, local, *, overwrite: bool = True) -> None:
+        local_path = Path(local).expanduser().resolve()
+        local_path.parent.mkdir(parents=True, exist_ok=True)
+        if local_path.exists() and not overwrite:
+            raise VMOperationError(f"Local file exists: {local_path}")
+        with span("ssh.get", bytes=0):
+            self.vm.clock.wait("transfer")
+        local_path.write_text("")
+
+
+class SimClient:
+    def __init__(self, vm: "SimVM"):
+        self.vm = vm
+
+    def health(self):
+        return {"status": "ok"}
+
+    def take_screenshot(self, method: str = "pyautogui"):
+        self.vm.clock.wait("screenshot")
+        # Written like the guest server does, into the shared dir the host reads from
+        tmp = self.vm.cfg.host_container_shared_dir / ".screenshot.png"
+        tmp.write_bytes(_screenshot_png())
+        tmp.replace(self.vm.cfg.host_container_shared_dir / "screenshot.png")
+        return {"screenshot_path": "screenshot.png", "mouse_position": [0, 0]}
+
+    def start_recording(self):
+        return {"status": "recording"}
+
+    def stop_recording(self):
+        return {"status": "stopped"}
+
+
+class SimVM:
+    """Stands in for `SandboxVMManager`: a `cat` process waiting on its stdin plays the QEMU container."""
+
+    def __init__(self, config: SimVMConfig, clock: SimClock, logger: AgentLogger):
+        self.cfg = config
+        self.clock = clock
+        self.logger = logger
+        self.ssh = SimSSH(self)
+        self.sandbox_client = SimClient(self)
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self) -> None:
+        if self.clock.chance(self.clock.latencies.boot_failure_rate):
+            self.clock.wait("boot")
+            raise VMCreationError(f"Simulated boot failure of {self.cfg.container_name}")
+        if self.cfg.source_data:
+            clone_file(self.cfg.source_data, self.cfg.host_container_data)
+        else:
+            self.cfg.host_container_data.write_bytes(b"\0" * 4096)
+        self.process = subprocess.Popen(["cat"], stdin=subprocess.PIPE, stdout=subprocess.DEVNULL)
+        self.clock.wait("boot")
+        self.clock.wait("services")
+        self.logger.log(f"✅ Simulated VM {self.cfg.container_name} ready", level=LogLevel.INFO)
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def snapshot_disk(self, dest: Path) -> Path:
+        self.ssh.exec_command("sync", as_root=True)
+        clone_file(self.cfg.host_container_data, dest)
+        return dest
+
+    def cleanup(self) -> None:
+        if self.process is not None:
+            self.clock.wait("teardown")
+            self.process.stdin.close()
+            self.process.wait(timeout=10)
+            self.process = None
+        shutil.rmtree(self.cfg.host_container_dir, ignore_errors=True)
+        shutil.rmtree(self.cfg.host_container_shared_dir, ignore_errors=True)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.cleanup()
+        return False
+
+
+# ────────────────────────────── Executor ──────────────────────────────
+class SimExecutor(RemotePythonExecutor):
+    """`SandboxExecutor` look-alike whose kernel only sleeps."""
+
+    def __init__(self, additional_imports: List[str], logger: AgentLogger, config: SimVMConfig, clock: SimClock):
+        super().__init__(additional_imports, logger)
+        self._exited = False
+        self._dropped = False
+        self.vm = SimVM(config, clock, logger)
+        try:
+            self.vm.start()
+            self.installed_packages = self.install_packages(additional_imports)
+        except Exception:
+            self.cleanup()
+            raise
+
+    def send_tools(self, tools: Dict[str, Tool]):
+        self.vm.clock.wait("code")
+
+    def install_packages(self, additional_imports: List[str]):
+        self.vm.clock.wait("code")
+        return additional_imports + ["smolagents", "pyautogui"]
+
+    def run_code_raise_errors(self, code_action: str, return_final_answer: bool = False) -> Tuple[Any, str]:
+        self.vm.clock.wait("code")
+        if self._dropped or self.vm.clock.chance(self.vm.clock.latencies.kernel_drop_rate):
+            self._dropped = True
+            raise WebSocketConnectionClosedException("Simulated kernel websocket drop")
+        match = self.final_answer_pattern.search(code_action) if return_final_answer else None
+        if match:
+            try:
+                return ast.literal_eval(match.group(1)), ""
+            except (ValueError, SyntaxError):
+                return match.group(1), ""
+        return None, f"Simulated run of {len(code_action.splitlines())} line(s)\n"
+
+    def attach_logger(self, logger: AgentLogger):
+        self.logger = logger
+        self.vm.logger = logger
+        self.vm.ssh.logger = logger
+
+    def is_healthy(self) -> bool:
+        return not self._exited and not self._dropped and self.vm.is_running()
+
+    def reset(self):
+        self.vm.clock.wait("code")
+
+    def cleanup(self):
+        if self._exited:
+            return
+        self.vm.cleanup()
+        self._exited = True
+
+    def delete(self):
+        self.cleanup()
+
+
+# ────────────────────────────── Backend ──────────────────────────────
+def simulated_evaluator(task: "TaskSpec", agent: "SandboxCodeAgent", success_rate: float = 0.5) -> float:
+    """Evaluation stand-in: one download, then a pass/fail that is stable per task uid."""
+    agent.ssh.get_file("/home/user/result.txt", task.result / "result.txt")
+    bucket = int(hashlib.sha256(task.uid.encode()).hexdigest()[:8], 16) / 0xFFFFFFFF
+    score = 1.0 if bucket < success_rate else 0.0
+    (task.result / "score.json").write_text(json.dumps({"score": score}))
+    return score
+
+
+class SimBackend:
+    """Orchestrator backend that boots `SimExecutor`s and answers with a `ScriptedModel`."""
+
+    name = "sim"
+
+    def __init__(
+        self,
+        root: Path,
+        latencies: Optional[SimLatencies] = None,
+        speed: float = 1.0,
+        seed: int = 0,
+        final_answer_rate: float = 0.3,
+        provider_rpm: Optional[int] = None,
+    ):
+        self.root = Path(root)
+        self.clock = SimClock(latencies or SimLatencies(), speed=speed, seed=seed)
+        self.model = ScriptedModel(self.clock, final_answer_rate=final_answer_rate, provider_rpm=provider_rpm)
+        self.evaluators = {"simulated": simulated_evaluator}
+
+    def create_executor(
+        self, container_name: str, profile: Optional["VMProfile"] = None, source_data: Optional[Path] = None
+    ) -> SimExecutor:
+        return SimExecutor(
+            additional_imports=[],
+            logger=AgentLogger(level=LogLevel.INFO),
+            config=SimVMConfig(container_name, self.root, source_data=source_data),
+            clock=self.clock,
+        )
+
+    def destroy_executor(self, executor: SimExecutor) -> None:
+        executor.cleanup()
+
+    def remove_stale(self, container_name: str) -> bool:
+        shutil.rmtree(self.root / "vms" / "snapshots" / container_name, ignore_errors=True)
+        shutil.rmtree(self.root / "shared" / container_name, ignore_errors=True)
+        return False
+
+    def collect_orphans(self, min_age: float = 600) -> Dict[str, List[str]]:
+        """Disk dirs of earlier runs (a simulated VM's process dies with its run)."""
+        dirs = [p.name for p in orphan_snapshot_dirs(self.root / "vms" / "snapshots", (), min_age)]
+        for name in dirs:
+            self.remove_stale(name)
+        return {"containers": [], "dirs": dirs}
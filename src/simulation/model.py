@@ -0,0 +1,103 @@
+"""ScriptedModel — a `Model` that answers with canned code actions.
+
+Each completion sleeps for a simulated LLM latency and returns a short code
+action; with probability `final_answer_rate` the action is a
+`final_answer(...)` call, so runs have a realistic spread of step counts
+(tasks that never draw one run into `max_steps`, like real ones do).
+
+With `provider_rpm` set, calls beyond that many per (simulated) minute fail
+with a 429 like a provider's rate limit would.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
+
+from smolagents.models import ChatMessage, MessageRole, Model
+
+if TYPE_CHECKING:
+    from .backend import SimClock
+
+_STEP = """Thought: Simulated step {step}, inspecting the environment.
+Code:
+```py
+print("simulated step {step}")
+```"""
+
+_FINAL = """Thought: Simulated step {step}, the task looks done.
+Code:
+```py
+final_answer("simulated")
+```"""
+
+
+def _text_length(messages: List[Dict[str, Any]]) -> int:
+    length = 0
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, str):
+            length += len(content)
+        elif isinstance(content, list):
+            length += sum(len(part.get("text", "")) for part in content if isinstance(part, dict))
+    return length
+
+
+class SimRateLimitError(Exception):
+    status_code = 429
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        # Shaped like the provider response litellm attaches to its RateLimitError
+        self.response = SimpleNamespace(headers={"retry-after": f"{retry_after:.3f}"})
+
+
+class ScriptedModel(Model):
+    def __init__(self, clock: "SimClock", final_answer_rate: float = 0.3, provider_rpm: Optional[int] = None, **kwargs):
+        super().__init__(model_id="simulated", **kwargs)
+        self.clock = clock
+        self.final_answer_rate = final_answer_rate
+        self.provider_rpm = provider_rpm
+        self._recent: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {k: v for k, v in self.__dict__.items() if k not in ("_lock", "_recent")}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state, _recent=deque(), _lock=threading.Lock())
+
+    def _admit(self) -> None:
+        """Sliding one-minute window of the simulated provider's request quota."""
+        now, window = time.monotonic(), 60 / self.clock.speed
+        with self._lock:
+            while self._recent and self._recent[0] <= now - window:
+                self._recent.popleft()
+            if len(self._recent) >= self.provider_rpm:
+                raise SimRateLimitError(
+                    f"Simulated provider limit of {self.provider_rpm} requests/min",
+                    retry_after=self._recent[0] + window - now,
+                )
+            self._recent.append(now)
+
+    def generate(
+        self,
+        messages: List[Dict[str, Any]],
+        stop_sequences: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, str]] = None,
+        tools_to_call_from: Optional[List[Any]] = None,
+        **kwargs,
+    ) -> ChatMessage:
+        step = 1 + sum(1 for m in messages if m.get("role") == MessageRole.ASSISTANT)
+        if self.provider_rpm:
+            self._admit()
+        self.clock.wait("llm")
+        template = _FINAL if self.clock.chance(self.final_answer_rate) else _STEP
+        content = template.format(step=step)
+        # ~4 characters per token, enough for the agent's token accounting
+        self.last_input_token_count = _text_length(messages) // 4
+        self.last_output_token_count = len(content) // 4
+        return ChatMessage(role=MessageRole.ASSISTANT, content=content)
@@ -0,0 +1,169 @@
+"""Load-test report of a simulated run.
+
+`ResourceSampler` polls thread count, RSS and child processes while the
+orchestrator runs; `simulation_report` combines those samples with the
+run's trace spans:
+
+    injected   sum of the task's `sim.*` spans (latency the backend faked)
+    busy       sum of the task's orchestrator stage spans (boot … teardown)
+    overhead   busy − injected, i.e. time the orchestrator itself spent
+
+and compares the makespan against the ideal `max(Σ injected / j, max injected)`,
+where a pass@k task's injected time is its setup plus its slowest sample.
+
+The per-task figures count each pass@k sample (task key "uid#n") on its own;
+`tasks` counts distinct uids and `task_samples` the samples.
+"""
+
+from __future__ import annotations
+
+import os
+import resource
+import threading
+import time
+from collections import defaultdict
+from statistics import mean, quantiles
+from typing import Any, Dict, List, Optional
+
+from telemetry import TASK_STAGES
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        # No procfs (macOS): peak RSS is the best we have, in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _child_processes() -> int:
+    try:
+        with open(f"/proc/{os.getpid()}/task/{os.getpid()}/children") as f:
+            return len(f.read().split())
+    except OSError:
+        return 0
+
+
+class ResourceSampler:
+    """Background thread recording (t, threads, rss, children) every `interval` seconds."""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.samples: List[Dict[str, float]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sim-sampler", daemon=True)
+        self._t0 = time.perf_counter()
+
+    def _sample(self) -> None:
+        self.samples.append(
+            {
+                "t": round(time.perf_counter() - self._t0, 3),
+                "threads": threading.active_count(),
+                "rss_mb": round(_rss_bytes() / 1024**2, 1),
+                "children": _child_processes(),
+            }
+        )
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "ResourceSampler":
+        self._sample()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    @property
+    def elapsed(self) -> float:
+        return self.samples[-1]["t"] if self.samples else 0.0
+
+
+def _stats(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    p95 = quantiles(values, n=20)[-1] if len(values) > 1 else values[0]
+    return {"mean": round(mean(values), 3), "p95": round(p95, 3), "max": round(max(values), 3)}
+
+
+def simulation_report(
+    sampler: ResourceSampler, events: List[Dict[str, Any]], concurrency: int, speed: float
+) -> Dict[str, Any]:
+    injected: Dict[Optional[str], float] = defaultdict(float)
+    busy: Dict[str, float] = defaultdict(float)
+    by_kind: Dict[str, float] = defaultdict(float)
+    for e in events:
+        task, seconds = e["args"].get("task"), e["dur"] / 1e6
+        if e["name"].startswith("sim."):
+            by_kind[e["name"][4:]] += seconds
+            injected[task] += seconds  # None: work outside any task, e.g. warm-pool boots
+        elif task and e["name"] in TASK_STAGES:
+            busy[task] += seconds
+
+    runs = sorted(busy)  # Task keys: a uid, or "uid#n" for one sample of a pass@k task
+    tasks = {run.split("#", 1)[0] for run in runs}
+    task_samples = sum("#" in run for run in runs)
+    wall = sampler.elapsed
+    # A pass@k task holds its slot from setup through its slowest sample (the samples run side by side)
+    slowest: Dict[str, float] = defaultdict(float)
+    for run in runs:
+        if "#" in run:
+            uid = run.split("#", 1)[0]
+            slowest[uid] = max(slowest[uid], injected[run])
+    held = [injected[t] + slowest[t] for t in tasks]
+    ideal = max((sum(held) + injected.get(None, 0.0)) / max(concurrency, 1), max(held, default=0.0))
+    samples = sampler.samples
+    rss = [s["rss_mb"] for s in samples]
+    threads = [s["threads"] for s in samples]
+    return {
+        "tasks": len(tasks),
+        "task_samples": task_samples,
+        "concurrency": concurrency,
+        "speed": speed,
+        "wall_seconds": round(wall, 3),
+        "ideal_seconds": round(ideal, 3),
+        "scheduling_overhead_seconds": round(wall - ideal, 3),
+        "scheduling_overhead_pct": round(100 * (wall - ideal) / wall, 1) if wall else 0.0,
+        "per_task_seconds": {
+            "busy": _stats([busy[r] for r in runs]),
+            "injected": _stats([injected[r] for r in runs]),
+            "overhead": _stats([busy[r] - injected[r] for r in runs]),
+        },
+        "injected_by_kind": {k: round(v, 3) for k, v in sorted(by_kind.items(), key=lambda kv: -kv[1])},
+        "threads": {"start": threads[0], "peak": max(threads), "end": threads[-1]} if threads else {},
+        "rss_mb": {
+            "start": rss[0],
+            "peak": max(rss),
+            "end": rss[-1],
+            "growth_per_1000_tasks": round((rss[-1] - rss[0]) * 1000 / len(tasks), 1) if tasks else 0.0,
+        }
+        if rss
+        else {},
+        "samples": samples,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    overhead = report["per_task_seconds"].get("overhead", {})
+    return "\n".join(
+        [
+            f"tasks {report['tasks']}"
+            + (f" ({report['task_samples']} samples)" if report.get("task_samples") else "")
+            + f"  -j {report['concurrency']}  speed ×{report['speed']}",
+            f"makespan {report['wall_seconds']:.1f}s vs ideal {report['ideal_seconds']:.1f}s "
+            f"→ scheduling overhead {report['scheduling_overhead_seconds']:.1f}s ({report['scheduling_overhead_pct']}%)",
+            f"per-task overhead mean {overhead.get('mean', 0):.3f}s  p95 {overhead.get('p95', 0):.3f}s  "
+            f"max {overhead.get('max', 0):.3f}s",
+            f"threads start {report['threads'].get('start')}  peak {report['threads'].get('peak')}  "
+            f"end {report['threads'].get('end')}",
+            f"rss start {report['rss_mb'].get('start')}M  peak {report['rss_mb'].get('peak')}M  "
+            f"end {report['rss_mb'].get('end')}M  ({report['rss_mb'].get('growth_per_1000_tasks')}M / 1000 tasks)",
+        ]
+    )
@@ -0,0 +1,54 @@
+"""Synthetic examples trees for load-testing the orchestrator.
+
+Writes `<root>/<tool>/<uid>/<uid>.json` task files in the benchmark layout,
+each with a file-upload config step and the `simulated` evaluator. The
+`vm` block asks for a tiny profile so admission is bounded by `-j` rather
+than by the host's RAM and disk.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import uuid
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+SIM_TOOLS = ("sim-cli", "sim-gui", "sim-notebook")
+# Only one tool gets a setup.sh, like jupyter in the real benchmark
+SIM_SETUP_TOOLS = ("sim-notebook",)
+
+
+def generate_examples(root: Path, count: int, seed: int = 0, tools: Sequence[str] = SIM_TOOLS) -> Dict[str, List[str]]:
+    """Write `count` synthetic tasks spread over `tools`; returns the tool → uids mapping."""
+    rng = random.Random(seed)
+    mapping: Dict[str, List[str]] = {}
+    for tool in tools:
+        (root / tool).mkdir(parents=True, exist_ok=True)
+        if tool in SIM_SETUP_TOOLS:
+            (root / tool / "setup.sh").write_text("#!/bin/bash\necho simulated setup\n")
+
+    for i in range(count):
+        tool = tools[i % len(tools)]
+        uid = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        folder = root / tool / uid
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / "input.txt").write_text(f"synthetic input {i}\n")
+        meta = {
+            "id": uid,
+            "snapshot": tool,
+            "instruction": f"Synthetic task {i} for {tool}.",
+            "action_number": rng.randint(3, 12),
+            "tags": ["synthetic", tool],
+            "vm": {"ram": "16M", "cpu_cores": 0, "disk": "1M"},
+            "config": [
+                {
+                    "func": "upload_file_to_vm",
+                    "arguments": {"local_path": "input.txt", "remote_path": "/home/user/input.txt"},
+                }
+            ],
+            "evaluation": {"func": "simulated", "arguments": {"success_rate": 0.5}},
+        }
+        (folder / f"{uid}.json").write_text(json.dumps(meta, indent=2))
+        mapping.setdefault(tool, []).append(uid)
+    return mapping
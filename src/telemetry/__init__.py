@@ -0,0 +1,15 @@
+# telemetry/__init__.py
+
+from .metrics import METRICS, Metrics, start_metrics_server
+from .tracing import TASK_STAGES, TRACER, Tracer, current_task, span
+
+__all__ = [
+    "METRICS",
+    "Metrics",
+    "start_metrics_server",
+    "TASK_STAGES",
+    "TRACER",
+    "Tracer",
+    "current_task",
+    "span",
+]
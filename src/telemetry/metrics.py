@@ -0,0 +1,218 @@
+"""Live run metrics in the Prometheus text format.
+
+    start_metrics_server(9108)      # → http://127.0.0.1:9108/metrics
+
+Most series are derived from what the run records anyway, so they also cover
+task processes and remote workers whose spans are merged into `TRACER`:
+
+    orchestrator_span_seconds{span}          histogram of every trace span (boot, vm.wait_for_services,
+                                             agent.step, llm.call, evaluate, ...)
+    orchestrator_llm_calls_total{outcome}    one per `llm.call` span (ok / rate_limited / error)
+    orchestrator_llm_tokens_total{direction} input / output tokens of those calls
+    orchestrator_ssh_bytes_total{direction}  bytes moved by `ssh.put` / `ssh.get` spans
+    orchestrator_vm_ready_seconds{phase}     time-to-ready of VM boot phases (`vm.ready` spans)
+    orchestrator_task_events_total{stage}    journaled stage transitions
+    orchestrator_task_failures_total{kind}   failures by class (see orchestration.failures)
+
+Point-in-time gauges (queue depths, running VMs, limiter / cache state) come
+from collectors registered by the orchestrator and are evaluated per scrape.
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .tracing import TRACER
+
+logger = logging.getLogger(__name__)
+
+# Seconds; wide enough for SSH round trips (sub-second) and VM boots (minutes)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+Labels = Tuple[Tuple[str, str], ...]
+Sample = Tuple[str, Dict[str, Any], float]  # (metric name, labels, value)
+
+_HELP = {
+    "orchestrator_span_seconds": ("histogram", "Duration of trace spans by span name"),
+    "orchestrator_llm_calls_total": ("counter", "LLM provider calls by outcome"),
+    "orchestrator_llm_tokens_total": ("counter", "LLM tokens by direction"),
+    "orchestrator_ssh_bytes_total": ("counter", "Bytes transferred over SFTP by direction"),
+    "orchestrator_vm_ready_seconds": ("histogram", "Seconds from the start of a VM boot until each phase was ready"),
+    "orchestrator_task_events_total": ("counter", "Task stage transitions by stage"),
+    "orchestrator_task_failures_total": ("counter", "Task failures by class"),
+    # Gauges of the orchestrator / coordinator collectors
+    "orchestrator_tasks": ("gauge", "Tasks of this run by current stage"),
+    "orchestrator_queue_depth": ("gauge", "Tasks waiting for admission or in front of a pipeline stage"),
+    "orchestrator_running_tasks": ("gauge", "Admitted tasks currently running"),
+    "orchestrator_busy_workers": ("gauge", "Workers with at least one task in flight"),
+    "orchestrator_vms": ("gauge", "Sandbox VMs held by tasks or kept by the warm pool"),
+    "orchestrator_llm_window": ("gauge", "Adaptive in-flight window of the LLM rate limiter"),
+    "orchestrator_llm_queue_wait_seconds": ("gauge", "Time LLM calls waited for the rate limiter"),
+    "orchestrator_llm_cache": ("gauge", "LLM response cache lookups and evictions"),
+}
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt(labels: Iterable[Tuple[str, str]]) -> str:
+    pairs = [f'{k}="{v}"'.replace("\n", " ") for k, v in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe registry of counters and histograms, plus per-scrape collectors."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+        self._help: Dict[str, Tuple[str, str]] = dict(_HELP)
+
+    def describe(self, name: str, kind: str, help: str) -> None:
+        self._help[name] = (kind, help)
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram(buckets)
+            hist.observe(value)
+
+    def add_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """Register a callable yielding (name, labels, value) gauge samples at scrape time."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    # ------------------------------------------------------------------
+    # Feeds -------------------------------------------------------------
+    # ------------------------------------------------------------------
+    def observe_span(self, event: Dict[str, Any]) -> None:
+        name, args, seconds = event["name"], event["args"], event["dur"] / 1e6
+        self.observe("orchestrator_span_seconds", seconds, span=name)
+        if name == "llm.call":
+            self.inc("orchestrator_llm_calls_total", outcome=args.get("outcome", "ok"))
+            for direction in ("input", "output"):
+                if args.get(f"{direction}_tokens"):
+                    self.inc("orchestrator_llm_tokens_total", args[f"{direction}_tokens"], direction=direction)
+        elif name in ("ssh.put", "ssh.get") and args.get("bytes"):
+            self.inc("orchestrator_ssh_bytes_total", args["bytes"], direction="up" if name == "ssh.put" else "down")
+        elif name == "vm.ready":
+            self.observe("orchestrator_vm_ready_seconds", seconds, phase=args.get("phase"))
+
+    def observe_transition(self, stage: str, data: Dict[str, Any]) -> None:
+        self.inc("orchestrator_task_events_total", stage=stage)
+        if data.get("failure"):
+            self.inc("orchestrator_task_failures_total", kind=data["failure"])
+
+    # ------------------------------------------------------------------
+    # Exposition --------------------------------------------------------
+    # ------------------------------------------------------------------
+    def _header(self, lines: List[str], name: str, default_kind: str) -> None:
+        kind, help = self._help.get(name, (default_kind, name))
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+
+    def render(self) -> str:
+        with self._lock:
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            histograms = {
+                n: {k: (h.buckets, list(h.counts), h.sum, h.count) for k, h in s.items()}
+                for n, s in self._histograms.items()
+            }
+            collectors = list(self._collectors)
+
+        gauges: Dict[str, List[Tuple[Labels, float]]] = {}
+        for collector in collectors:
+            try:
+                for name, labels, value in collector():
+                    gauges.setdefault(name, []).append((_labels(labels), value))
+            except Exception as e:
+                logger.warning("⚠️ Metrics collector %r failed: %s", collector, e)
+
+        lines: List[str] = []
+        for name in sorted(gauges):
+            self._header(lines, name, "gauge")
+            lines += [f"{name}{_fmt(labels)} {value:g}" for labels, value in gauges[name]]
+        for name in sorted(counters):
+            self._header(lines, name, "counter")
+            lines += [f"{name}{_fmt(labels)} {value:g}" for labels, value in sorted(counters[name].items())]
+        for name in sorted(histograms):
+            self._header(lines, name, "histogram")
+            for labels, (buckets, counts, total, count) in sorted(histograms[name].items()):
+                cumulative = 0
+                for bound, n in zip(buckets, counts, strict=True):
+                    cumulative += n
+                    lines.append(f"{name}_bucket{_fmt(labels + (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{name}_bucket{_fmt(labels + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_fmt(labels)} {total:g}")
+                lines.append(f"{name}_count{_fmt(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+TRACER.subscribe(METRICS.observe_span)
+
+
+# ────────────────────────────── HTTP endpoint ──────────────────────────────
+class _Handler(BaseHTTPRequestHandler):
+    registry: Metrics = METRICS
+
+    def do_GET(self):  # noqa: N802
+        if self.path.split("?", 1)[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_args):  # Scrapes would drown the run's own logs
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1", registry: Optional[Metrics] = None) -> ThreadingHTTPServer:
+    """Serve `registry` (default `METRICS`) on http://host:port/metrics from a daemon thread."""
+    handler = type("MetricsHandler", (_Handler,), {"registry": registry or METRICS})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info("📈 Metrics on http://%s:%d/metrics", host, server.server_address[1])
+    return server
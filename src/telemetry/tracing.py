@@ -0,0 +1,167 @@
+"""Timing spans for the benchmark runner, exported in Chrome trace format.
+
+Spans are recorded into the process-wide `TRACER` and can be used as a context
+manager or as a decorator:
+
+    with span("config.upload_file_to_vm", task=spec.uid):
+        ...
+
+    @span("vm.start")
+    def start(self): ...
+
+Passing `task=` tags the span and everything nested in it (same thread) with
+that uid. `TRACER.write(path)` produces a JSON file that loads in
+chrome://tracing or https://ui.perfetto.dev; `TRACER.summary()` renders the
+per-task table of where the wall-clock went.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from statistics import mean
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+# Top-level orchestrator stages, in the order they show up in the summary
+TASK_STAGES = ("boot", "setup", "agent", "evaluate", "teardown")
+
+_current_task: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("trace_task", default=None)
+
+
+class Tracer:
+    """Thread-safe collector of complete ("X") trace events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._threads: Dict[tuple, str] = {}
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Call `listener(event)` for every span recorded or merged from now on."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _notify(self, events: Iterable[Dict[str, Any]]) -> None:
+        # Outside the lock: listeners may take their own locks (metrics registry)
+        for listener in self._listeners:
+            for event in events:
+                listener(event)
+
+    @contextlib.contextmanager
+    def span(self, name: str, task: Optional[str] = None, **args: Any) -> Iterator[Dict[str, Any]]:
+        token = _current_task.set(task) if task else None
+        start, t0 = time.time(), time.perf_counter()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self.add(name, start, time.perf_counter() - t0, **args)
+            if token is not None:
+                _current_task.reset(token)
+
+    def add(self, name: str, start: float, duration: float, **args: Any) -> None:
+        """Record a span that has already finished (wall-clock start, duration in seconds)."""
+        task = args.pop("task", None) or _current_task.get()
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": name.split(".", 1)[0],
+            "ph": "X",
+            "ts": start * 1e6,
+            "dur": duration * 1e6,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": {"task": task, **args} if task else args,
+        }
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault((event["pid"], event["tid"]), thread.name)
+        self._notify((event,))
+
+    def events(self, task: Optional[str] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [e for e in self._events if task is None or e["args"].get("task") == task]
+
+    # ------------------------------------------------------------------
+    # Moving events between processes -----------------------------------
+    # ------------------------------------------------------------------
+    def take(self, task: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Remove and return the events of one task (or all of them)."""
+        with self._lock:
+            taken, kept = [], []
+            for e in self._events:
+                (taken if task is None or e["args"].get("task") == task else kept).append(e)
+            self._events = kept
+        return taken
+
+    def extend(self, events: List[Dict[str, Any]]) -> None:
+        """Merge events recorded elsewhere (child process, remote worker)."""
+        with self._lock:
+            self._events.extend(events)
+        self._notify(events)
+
+    # ------------------------------------------------------------------
+    # Export ------------------------------------------------------------
+    # ------------------------------------------------------------------
+    def write(self, path: Path) -> Path:
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+        # Name the lanes of threads we know; merged events from elsewhere keep their numeric tid
+        meta = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for (pid, tid), name in threads.items()
+        ]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": meta + events, "displayTimeUnit": "ms"}))
+        return path
+
+    def summary(self) -> str:
+        """Per-task seconds spent in each orchestrator stage, plus the slowest span kinds."""
+        with self._lock:
+            events = list(self._events)
+
+        per_task: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        per_name: Dict[str, List[float]] = defaultdict(list)
+        for e in events:
+            seconds = e["dur"] / 1e6
+            per_name[e["name"]].append(seconds)
+            task = e["args"].get("task")
+            if task and e["name"] in TASK_STAGES:
+                per_task[task][e["name"]] += seconds
+
+        header = f"{'task':<40}" + "".join(f"{s:>10}" for s in TASK_STAGES) + f"{'total':>10}"
+        lines = [header, "─" * len(header)]
+        for task, stages in sorted(per_task.items(), key=lambda kv: -sum(kv[1].values())):
+            cells = "".join(f"{stages.get(s, 0.0):>10.1f}" for s in TASK_STAGES)
+            lines.append(f"{task:<40}{cells}{sum(stages.values()):>10.1f}")
+
+        lines += ["", f"{'span':<40}{'count':>8}{'mean':>10}{'max':>10}{'total':>10}", "─" * 78]
+        for name, durations in sorted(per_name.items(), key=lambda kv: -sum(kv[1]))[:25]:
+            lines.append(
+                f"{name:<40}{len(durations):>8}{mean(durations):>10.1f}{max(durations):>10.1f}{sum(durations):>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+TRACER = Tracer()
+
+
+def current_task() -> Optional[str]:
+    """uid of the task the calling thread is working on (innermost `span(..., task=uid)`)."""
+    return _current_task.get()
+
+
+def span(name: str, task: Optional[str] = None, **args: Any):
+    """Time a block or function into the global `TRACER`."""
+    return TRACER.span(name, task=task, **args)
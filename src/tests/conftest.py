@@ -0,0 +1,4 @@
+import os
+
+# Importing the orchestrator pulls in litellm, which otherwise fetches its model cost map over the network
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
@@ -0,0 +1,50 @@
+import json
+import os
+
+from benchmark.catalog import TaskCatalog
+
+
+def _write_task(root, tool, uid, **meta):
+    path = root / tool / uid / f"{uid}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"instruction": f"do {uid}", **meta}))
+    return path
+
+
+def _catalog(tmp_path):
+    examples = tmp_path / "examples"
+    _write_task(examples, "dbt", "t1", tags=["cli"], evaluator={"func": "compare_csv"})
+    _write_task(examples, "dbt", "t2", tags=["cli", "gui"], evaluator={"func": ["compare_csv", "check_file"]})
+    _write_task(examples, "excel", "t3", tags=["gui"], config=[{"type": "upload_file_to_vm"}])
+    catalog = TaskCatalog(tmp_path / "catalog.sqlite", examples)
+    assert catalog.refresh() == 3
+    return catalog, examples
+
+
+def test_refresh_only_reparses_changed_files(tmp_path):
+    catalog, examples = _catalog(tmp_path)
+    assert catalog.refresh() == 0
+
+    path = _write_task(examples, "dbt", "t1", tags=["cli", "slow"], action_number=9)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))  # Same second on coarse clocks
+    assert catalog.refresh() == 1
+    assert catalog.meta("t1")["action_number"] == 9
+    assert catalog.select(tags=["slow"]) == [("dbt", "t1")]
+
+    (examples / "excel" / "t3" / "t3.json").unlink()
+    assert catalog.refresh() == 0
+    assert catalog.meta("t3") is None
+    assert catalog.select(tags=["gui"]) == [("dbt", "t2")]
+    catalog.close()
+
+
+def test_select_filters(tmp_path):
+    catalog, _ = _catalog(tmp_path)
+    assert catalog.select(tags=["cli"]) == [("dbt", "t1"), ("dbt", "t2")]
+    assert catalog.select(tags=["cli"], exclude_tags=["gui"]) == [("dbt", "t1")]
+    assert catalog.select(exclude_tags=["cli"]) == [("excel", "t3")]
+    assert catalog.select(evaluator="check_file") == [("dbt", "t2")]
+    assert catalog.select(config_type="upload_file_to_vm") == [("excel", "t3")]
+    assert catalog.mapping(tags=["gui"]) == {"dbt": ["t2"], "excel": ["t3"]}
+    catalog.close()
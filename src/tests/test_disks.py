@@ -0,0 +1,134 @@
+import errno
+import fcntl
+import os
+import subprocess
+
+import pytest
+
+from sandbox import disks
+from sandbox.errors import VMCreationError
+
+MB = 1024**2
+
+
+@pytest.fixture
+def sparse_disk(tmp_path):
+    """A 64M file with two 1M data ranges and holes everywhere else."""
+    path = tmp_path / "data.img"
+    with open(path, "wb") as f:
+        f.truncate(64 * MB)
+        for offset, byte in ((0, b"a"), (40 * MB, b"b")):
+            f.seek(offset)
+            f.write(byte * MB)
+    return path
+
+
+def _no_reflink(monkeypatch):
+    def ioctl(*args):
+        raise OSError(errno.EOPNOTSUPP, "no reflinks here")
+
+    monkeypatch.setattr(fcntl, "ioctl", ioctl)
+
+
+def _assert_sparse_clone(src, dest):
+    assert dest.read_bytes() == src.read_bytes()
+    if os.stat(src).st_blocks * 512 < 8 * MB:  # The filesystem keeps holes
+        assert os.stat(dest).st_blocks * 512 < 8 * MB
+
+
+def test_sparse_fallback_keeps_holes(monkeypatch, sparse_disk, tmp_path):
+    _no_reflink(monkeypatch)
+    dest = tmp_path / "clone" / "data.img"
+    assert disks.clone_file(sparse_disk, dest) == "sparse"
+    _assert_sparse_clone(sparse_disk, dest)
+
+
+def test_sparse_fallback_without_copy_file_range(monkeypatch, sparse_disk, tmp_path):
+    _no_reflink(monkeypatch)
+
+    def copy_file_range(*args):
+        raise OSError(errno.EXDEV, "cross-device")
+
+    monkeypatch.setattr(os, "copy_file_range", copy_file_range)
+    dest = tmp_path / "clone.img"
+    assert disks.clone_file(sparse_disk, dest) == "sparse"
+    _assert_sparse_clone(sparse_disk, dest)
+
+
+def test_data_ranges(sparse_disk):
+    fd = os.open(sparse_disk, os.O_RDONLY)
+    try:
+        ranges = disks._data_ranges(fd, 64 * MB)
+    finally:
+        os.close(fd)
+    # Filesystems may round ranges out to their block size, but must cover both and skip the middle
+    assert ranges[0][0] == 0 and ranges[-1][0] + ranges[-1][1] >= 41 * MB
+    assert sum(length for _, length in ranges) < 64 * MB
+
+
+def _qcow2(path, backing=None):
+    """Just the qcow2 header fields `disks` reads: magic, version and the backing file name."""
+    name = str(backing).encode() if backing else b""
+    offset = disks._QCOW2_HEADER.size if backing else 0
+    path.write_bytes(disks._QCOW2_HEADER.pack(disks.QCOW2_MAGIC, 3, offset, len(name)) + name)
+    return path
+
+
+def test_backing_chain(sparse_disk, tmp_path):
+    assert not disks.is_qcow2(sparse_disk)
+    setup = _qcow2(tmp_path / "setup.qcow2", sparse_disk)
+    (tmp_path / "sandbox-1").mkdir()
+    overlay = _qcow2(tmp_path / "sandbox-1" / "data.img", "../setup.qcow2")  # Relative to the overlay's dir
+    assert disks.is_qcow2(overlay)
+    assert disks.backing_chain(overlay) == [tmp_path / "sandbox-1" / "../setup.qcow2", sparse_disk]
+    assert disks.backing_chain(setup) == [sparse_disk]
+    assert disks.backing_chain(_qcow2(tmp_path / "standalone.qcow2")) == []
+
+
+def test_backing_chain_loop(tmp_path):
+    _qcow2(tmp_path / "a.qcow2", tmp_path / "b.qcow2")
+    _qcow2(tmp_path / "b.qcow2", tmp_path / "a.qcow2")
+    with pytest.raises(VMCreationError, match="loops"):
+        disks.backing_chain(tmp_path / "a.qcow2")
+
+
+def test_create_overlay_with_host_qemu_img(monkeypatch, sparse_disk, tmp_path):
+    calls = []
+
+    def run(args, **kwargs):
+        calls.append(args)
+        if len(calls) > 1:
+            raise subprocess.CalledProcessError(1, args, stderr="Could not open backing file\n")
+
+    monkeypatch.setattr(disks.shutil, "which", lambda name: "/usr/bin/qemu-img")
+    monkeypatch.setattr(disks.subprocess, "run", run)
+    overlay = tmp_path / "sandbox-1" / "data.img"
+    overlay.parent.mkdir()
+    overlay.write_bytes(b"stale")
+    assert disks.create_overlay(sparse_disk, overlay) == overlay
+    assert not overlay.exists()  # Replaced (here by nothing, qemu-img is faked)
+    assert calls[0][-5:] == ["-F", "raw", "-b", str(sparse_disk), str(overlay)]
+
+    with pytest.raises(VMCreationError, match="Could not open backing file"):
+        disks.create_overlay(_qcow2(tmp_path / "setup.qcow2", sparse_disk), overlay)
+    assert calls[1][calls[1].index("-F") + 1] == "qcow2"
+
+
+def test_create_overlay_in_container(monkeypatch, sparse_disk, tmp_path):
+    runs = []
+
+    class Containers:
+        def run(self, image, **kwargs):
+            runs.append((image, kwargs))
+
+    monkeypatch.setattr(disks.shutil, "which", lambda name: None)
+    overlay = tmp_path / "sandbox-1" / "data.img"
+    client = type("Client", (), {"containers": Containers()})()
+    disks.create_overlay(sparse_disk, overlay, client, image="qemu-test")
+    image, kwargs = runs[0]
+    assert image == "qemu-test" and kwargs["entrypoint"] == ["qemu-img"] and kwargs["remove"]
+    # qemu-img in the container sees the backing file and the overlay at their host paths
+    assert [(m["Target"], m["Source"], m["ReadOnly"]) for m in kwargs["mounts"]] == [
+        (str(tmp_path), str(tmp_path), True),
+        (str(overlay.parent), str(overlay.parent), False),
+    ]
@@ -0,0 +1,23 @@
+import pytest
+
+from orchestration.failures import AGENT, INFRA, SETUP, InfraError, classify
+from sandbox.errors import RemoteCommandError
+
+
+@pytest.mark.parametrize(
+    ("stage", "kind"),
+    [("admitted", INFRA), ("booting", INFRA), ("booted", INFRA), ("setup", SETUP), ("agent", AGENT)],
+)
+def test_remote_command_error_follows_stage(stage, kind):
+    assert classify(RemoteCommandError("mount -t 9p", 32, "mount failed"), stage) == kind
+
+
+def test_infra_cause_wins_over_stage():
+    try:
+        try:
+            raise ConnectionResetError("peer reset")
+        except ConnectionResetError as e:
+            raise RuntimeError("setup step failed") from e
+    except RuntimeError as e:
+        assert classify(e, "setup") == INFRA
+    assert classify(InfraError("unhealthy"), "agent") == INFRA
@@ -0,0 +1,54 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import orchestrator
+from orchestration import HostCapacity
+from orchestration.failures import INFRA
+from simulation import SimBackend, generate_examples
+
+GB = 1024**3
+
+
+class CrashingPool:
+    """Stands in for the task's process pool: the child dies before reporting anything."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool("child was killed"))
+        return future
+
+
+class StuckBackend(SimBackend):
+    def remove_stale(self, container_name):
+        raise RuntimeError(f"docker daemon not answering for {container_name}")
+
+
+def test_crashed_child_keeps_its_failure_when_cleanup_fails(monkeypatch, tmp_path):
+    examples = tmp_path / "examples"
+    mapping = generate_examples(examples, 1)
+    monkeypatch.setattr(orchestrator, "ProcessPoolExecutor", CrashingPool)
+    orch = orchestrator.Orchestrator(
+        1,
+        mapping,
+        examples,
+        results_root=tmp_path / "results",
+        capacity=HostCapacity(ram_bytes=64 * GB, cpu_cores=64, disk_bytes=64 * GB, disk_path=Path(tmp_path)),
+        backend=StuckBackend(tmp_path / "sim", speed=1000),
+        isolation="process",
+    )
+    spec = orch.tasks[0]
+    orch._run_isolated(spec)
+
+    assert spec.stage == "failed"
+    assert spec.failure == INFRA
+    assert spec.retry
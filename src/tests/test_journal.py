@@ -0,0 +1,47 @@
+from orchestration.journal import RunJournal
+
+
+def test_unfinished_after_a_crash(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = RunJournal(path)
+    journal.record("a" * 16, "booted", container="sandbox-custom")
+    journal.record("a" * 16, "done")
+    journal.record("b" * 16, "failed", error="boom")
+    journal.record("c" * 16, "booted", container="sandbox-cccc")
+    journal.record("c" * 16, "agent")
+    journal.record("d" * 16, "admitted")
+    journal.close()
+    with open(path, "a") as f:
+        f.write('{"ts": 1, "uid": "eeee", "sta')  # Torn by the crash
+
+    journal = RunJournal(path)
+    journal.record("f" * 16, "retrying")
+    assert journal.completed() == {"a" * 16, "b" * 16}
+    # Last known container, or the name the task would have got
+    assert journal.unfinished() == {
+        "c" * 16: "sandbox-cccc",
+        "d" * 16: "sandbox-dddddddddddd",
+        "f" * 16: "sandbox-ffffffffffff",
+    }
+    journal.close()
+
+
+def test_infra_final_failure_is_resumed(tmp_path):
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    journal.record("a" * 16, "failed", failure="infra", attempt=1, container="sandbox-a")
+    journal.record("a" * 16, "retrying", attempt=2)
+    journal.record("a" * 16, "done")
+    journal.record("b" * 16, "failed", failure="agent", attempt=1)
+    journal.record("c" * 16, "booted", container="sandbox-cccc")
+    journal.record("c" * 16, "failed", failure="infra", attempt=3)  # Out of retries when the run ended
+    assert journal.completed() == {"a" * 16, "b" * 16}
+    assert journal.unfinished() == {"c" * 16: "sandbox-cccc"}
+    journal.close()
+
+
+def test_rotate_starts_empty(tmp_path):
+    journal = RunJournal(tmp_path / "journal.jsonl")
+    journal.record("uid", "admitted")
+    backup = journal.rotate()
+    assert backup.exists() and journal.unfinished() == {}
+    journal.close()
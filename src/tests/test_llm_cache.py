@@ -0,0 +1,31 @@
+import json
+import os
+
+from agent.utils.llm_cache import ResponseCache
+
+ENTRY = {"message": {"role": "assistant", "content": "x" * 80}, "input_tokens": 1, "output_tokens": 1}
+ENTRY_BYTES = len(json.dumps(ENTRY))
+
+
+def _put(cache, key, mtime):
+    cache.put(key, ENTRY)
+    os.utime(cache._path(key), (mtime, mtime))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path, budget_bytes=int(ENTRY_BYTES * 3.5))
+    for n, key in enumerate(("aa01", "bb02", "cc03"), start=1):
+        _put(cache, key, 1000 * n)
+    assert cache.get("aa01") == ENTRY  # Now the most recently used
+    cache.put("dd04", ENTRY)  # Over budget → back under 90% by dropping the oldest
+
+    assert cache.get("bb02") is None
+    assert all(cache.get(key) == ENTRY for key in ("aa01", "cc03", "dd04"))
+    stats = cache.stats()
+    assert (stats["evictions"], stats["hits"], stats["misses"]) == (1, 4, 1)
+
+
+def test_size_survives_reopening(tmp_path):
+    cache = ResponseCache(tmp_path, budget_bytes=10 * ENTRY_BYTES)
+    cache.put("aa01", ENTRY)
+    assert ResponseCache(tmp_path, budget_bytes=10 * ENTRY_BYTES)._size == ENTRY_BYTES
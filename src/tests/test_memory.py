@@ -0,0 +1,61 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from sandbox.memory import MemorySnapshot
+
+
+@pytest.fixture
+def cfg(tmp_path):
+    base = tmp_path / "ubuntu-base" / "data.img"
+    base.parent.mkdir()
+    base.write_bytes(b"disk")
+    return SimpleNamespace(
+        container_image="qemux/qemu", vm_ram="4096M", vm_cpu_cores="4", base_data=base, memory_dir=tmp_path / "memory"
+    )
+
+
+def _save(snapshot, cfg):
+    with snapshot.saving(cfg) as scratch:
+        if scratch is not None:
+            (scratch / "state.bin").write_bytes(b"ram")
+        return scratch
+
+
+def test_key_follows_the_vm_settings(cfg):
+    snapshot = MemorySnapshot.for_config(cfg)
+    assert snapshot.root.parent == cfg.memory_dir and snapshot.root.name.startswith("4096M-4-")
+    assert MemorySnapshot.for_config(cfg) == snapshot
+    assert MemorySnapshot.for_config(SimpleNamespace(**{**vars(cfg), "vm_ram": "8192M"})) != snapshot
+    st = cfg.base_data.stat()
+    os.utime(cfg.base_data, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))  # A rebuilt base disk
+    assert MemorySnapshot.for_config(cfg) != snapshot
+
+
+def test_saved_once_and_published_complete(cfg):
+    snapshot = MemorySnapshot.for_config(cfg)
+    assert not snapshot.exists()
+    assert _save(snapshot, cfg) is not None
+    assert snapshot.exists() and snapshot.state.read_bytes() == b"ram"
+    assert json.loads(snapshot.manifest.read_text()) == MemorySnapshot.settings(cfg)
+    assert _save(snapshot, cfg) is None  # Already there
+    assert sorted(p.name for p in cfg.memory_dir.iterdir()) == [f".{snapshot.root.name}.lock", snapshot.root.name]
+
+
+def test_failed_save_leaves_nothing(cfg):
+    snapshot = MemorySnapshot.for_config(cfg)
+    with pytest.raises(RuntimeError):
+        with snapshot.saving(cfg) as scratch:
+            (scratch / "state.bin").write_bytes(b"half")
+            raise RuntimeError("migration failed")
+    assert not snapshot.exists() and not snapshot.root.with_name(snapshot.root.name + ".tmp").exists()
+
+
+def test_only_one_vm_saves(cfg):
+    snapshot = MemorySnapshot.for_config(cfg)
+    with snapshot.saving(cfg) as scratch:
+        assert scratch is not None
+        assert _save(snapshot, cfg) is None  # Another VM holds the lock
+    assert snapshot.exists()
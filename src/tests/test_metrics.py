@@ -0,0 +1,81 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from telemetry.metrics import Metrics, start_metrics_server
+
+
+def _span(name, seconds, **args):
+    return {"name": name, "dur": seconds * 1e6, "args": args}
+
+
+def test_spans_and_transitions_become_series():
+    metrics = Metrics()
+    metrics.observe_span(_span("llm.call", 0.4, input_tokens=100, output_tokens=20))
+    metrics.observe_span(_span("llm.call", 0.1, outcome="rate_limited"))
+    metrics.observe_span(_span("ssh.put", 0.2, bytes=2048))
+    metrics.observe_span(_span("vm.ready", 42.0, phase="ssh"))
+    metrics.observe_transition("failed", {"failure": "infra"})
+    metrics.observe_transition("done", {})
+    text = metrics.render()
+
+    assert 'orchestrator_llm_calls_total{outcome="ok"} 1' in text
+    assert 'orchestrator_llm_calls_total{outcome="rate_limited"} 1' in text
+    assert 'orchestrator_llm_tokens_total{direction="input"} 100' in text
+    assert 'orchestrator_ssh_bytes_total{direction="up"} 2048' in text
+    assert 'orchestrator_task_failures_total{kind="infra"} 1' in text
+    assert 'orchestrator_task_events_total{stage="done"} 1' in text
+    assert 'orchestrator_vm_ready_seconds_bucket{phase="ssh",le="30"} 0' in text
+    assert 'orchestrator_vm_ready_seconds_bucket{phase="ssh",le="60"} 1' in text
+    assert 'orchestrator_span_seconds_count{span="llm.call"} 2' in text
+    assert "# TYPE orchestrator_span_seconds histogram" in text
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = Metrics()
+    for value in (0.5, 1.5, 99.0):
+        metrics.observe("latency", value, buckets=(1, 2))
+    lines = [line for line in metrics.render().splitlines() if line.startswith("latency")]
+    assert lines == [
+        'latency_bucket{le="1"} 1',
+        'latency_bucket{le="2"} 2',
+        'latency_bucket{le="+Inf"} 3',
+        "latency_sum 101",
+        "latency_count 3",
+    ]
+
+
+def test_collectors_run_per_scrape_and_failures_are_skipped():
+    metrics = Metrics()
+    depth = [3]
+
+    def broken():
+        raise RuntimeError("scheduler gone")
+
+    def queue():
+        yield "orchestrator_queue_depth", {"stage": "admit"}, depth[0]
+
+    metrics.add_collector(broken)
+    metrics.add_collector(queue)
+    assert 'orchestrator_queue_depth{stage="admit"} 3' in metrics.render()
+    depth[0] = 1
+    assert 'orchestrator_queue_depth{stage="admit"} 1' in metrics.render()
+    metrics.remove_collector(queue)
+    assert "orchestrator_queue_depth" not in metrics.render()
+
+
+def test_http_endpoint():
+    metrics = Metrics()
+    metrics.inc("orchestrator_task_events_total", stage="done")
+    server = start_metrics_server(0, registry=metrics)
+    port = server.server_address[1]
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert 'orchestrator_task_events_total{stage="done"} 1' in response.read().decode()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/other", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
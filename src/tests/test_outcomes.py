@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from orchestration.outcomes import OutcomeStore, load_outcomes, outcome_row
+
+
+def _spec(uid, **overrides):
+    fields = {"tool": "dbt", "tags": ["cli"], "sample": None, "status": "success", "score": 1.0, "failure": None}
+    return SimpleNamespace(uid=uid, **{"attempt": 1, "started": 1_718_000_000.0, **fields, **overrides})
+
+
+def test_row_sums_stage_and_llm_spans():
+    events = [
+        {"name": "boot", "dur": 2_000_000, "args": {}},
+        {"name": "agent", "dur": 30_000_000, "args": {}},
+        {"name": "boot", "dur": 1_500_000, "args": {}},  # Second attempt
+        {"name": "agent.step", "dur": 1, "args": {}},
+        {"name": "agent.step", "dur": 1, "args": {}},
+        {"name": "llm.call", "dur": 1, "args": {"input_tokens": 100, "output_tokens": 20}},
+        {"name": "llm.call", "dur": 1, "args": {"input_tokens": None}},
+        {"name": "vm.create_overlay", "dur": 5, "args": {}},
+    ]
+    row = outcome_row(_spec("t1", attempt=2), events, 40.0, status="failed")
+    assert row["status"] == "failed" and row["attempts"] == 2
+    assert row["boot_seconds"] == 3.5 and row["agent_seconds"] == 30.0 and row["teardown_seconds"] == 0.0
+    assert (row["steps"], row["llm_calls"], row["input_tokens"], row["output_tokens"]) == (2, 2, 100, 20)
+
+
+def test_rows_are_flushed_to_parts_and_loaded_back(tmp_path):
+    root = tmp_path / "outcomes"
+    assert load_outcomes(root).empty
+    store = OutcomeStore(root, flush_rows=2, flush_seconds=3600)
+    for uid in ("t1", "t2", "t3"):
+        store.record(outcome_row(_spec(uid), [], 1.0))
+    assert len(list(root.glob("part-*.parquet"))) == 1  # Third row still buffered
+    store.close()
+    assert not list(root.glob("*.tmp"))
+
+    frame = load_outcomes(root)
+    assert list(frame["uid"]) == ["t1", "t2", "t3"]
+    assert list(frame.loc[0, "tags"]) == ["cli"]
+    assert store.flush() is None
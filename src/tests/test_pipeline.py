@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from orchestration.pipeline import STAGE_NAMES, Stage, StagePipeline, parse_stage_limits
+
+
+def _run(pipeline, items, **kwargs):
+    asyncio.run(pipeline.run(items, **kwargs))
+
+
+def test_every_item_passes_every_stage_in_order():
+    seen = []
+    stages = [Stage(name, lambda item, name=name: seen.append((name, item)), 2) for name in ("boot", "agent")]
+    _run(StagePipeline(stages, on_error=lambda *a: None), [1, 2, 3])
+    assert sorted(seen) == sorted((name, item) for name in ("boot", "agent") for item in (1, 2, 3))
+    for item in (1, 2, 3):
+        assert seen.index(("boot", item)) < seen.index(("agent", item))
+
+
+def test_failure_skips_to_always_stages():
+    ran, errors = [], []
+
+    def boot(item):
+        if item == "bad":
+            raise RuntimeError("no VM")
+        ran.append(("boot", item))
+
+    stages = [
+        Stage("boot", boot, 1),
+        Stage("agent", lambda item: ran.append(("agent", item)), 1),
+        Stage("teardown", lambda item: ran.append(("teardown", item)), 1, always=True),
+    ]
+    pipeline = StagePipeline(stages, on_error=lambda item, stage, exc: errors.append((item, stage)))
+    _run(pipeline, ["ok", "bad"])
+    assert ("agent", "bad") not in ran
+    assert ("teardown", "bad") in ran and ("teardown", "ok") in ran
+    assert errors == [("bad", "boot")]
+
+
+def test_retry_goes_back_to_the_first_stage_keeping_admission():
+    attempts, admitted, released = {"flaky": 0}, [], []
+
+    def boot(item):
+        attempts[item] += 1
+        if attempts[item] == 1:
+            raise ConnectionError("boot timed out")
+
+    async def admit(item):
+        admitted.append(item)
+
+    async def release(item):
+        released.append(item)
+
+    stages = [Stage("boot", boot, 1), Stage("teardown", lambda item: None, 1, always=True)]
+    _run(
+        StagePipeline(stages, on_error=lambda *a: None),
+        ["flaky"],
+        admit=admit,
+        release=release,
+        retry=lambda item: attempts[item] < 2,
+    )
+    assert attempts == {"flaky": 2}
+    assert admitted == released == ["flaky"]
+
+
+def test_feeder_exception_is_raised():
+    async def admit(item):
+        if item == 2:
+            raise RuntimeError("admission broke")
+
+    pipeline = StagePipeline([Stage("boot", lambda item: None, 1)], on_error=lambda *a: None)
+    with pytest.raises(RuntimeError, match="admission broke"):
+        asyncio.run(asyncio.wait_for(pipeline.run([1, 2, 3], admit=admit), 5))
+
+
+def test_parse_stage_limits():
+    assert parse_stage_limits("", 3) == dict.fromkeys(STAGE_NAMES, 3)
+    assert parse_stage_limits("boot=2, agent=8", 4) == {**dict.fromkeys(STAGE_NAMES, 4), "boot": 2, "agent": 8}
+    for bad in ("boot=0", "boot=x", "deploy=2", "boot"):
+        with pytest.raises(ValueError):
+            parse_stage_limits(bad, 1)
@@ -0,0 +1,96 @@
+import json
+from pathlib import Path
+
+from benchmark.plan import compile_task, plan_report
+from orchestrator import TaskSpec
+
+
+def upload_file_to_vm(task, agent, local_path, remote_path):
+    pass
+
+
+def compare_csv(task, agent, result, expected):
+    pass
+
+
+def check_file(task, agent, result, expected=None):
+    pass
+
+
+CONFIG = {"upload_file_to_vm": upload_file_to_vm}
+EVAL = {"compare_csv": compare_csv, "check_file": check_file}
+
+
+def _spec(root, uid, **meta):
+    folder = root / "dbt" / uid
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / f"{uid}.json").write_text(json.dumps({"instruction": f"do {uid}", **meta}))
+    return TaskSpec("dbt", uid, root, root / "results")
+
+
+def _upload(local_path):
+    return {"type": "upload_file_to_vm", "parameters": {"local_path": local_path, "remote_path": "/tmp/x"}}
+
+
+def test_compiles_both_task_formats(tmp_path):
+    root = tmp_path / "evaluation_examples" / "examples"
+    old = _spec(
+        root,
+        "old",
+        config=[{"func": "upload_file_to_vm", "arguments": {"local_path": "a.csv", "remote_path": "/tmp/a"}}],
+        evaluation={"func": "compare_csv", "arguments": {"result": "/tmp/a", "expected": "a.csv"}},
+    )
+    new = _spec(
+        root,
+        "new",
+        evaluator={
+            "func": ["compare_csv", "check_file"],
+            "conj": "or",
+            "result": [{"type": "vm_file", "path": "/tmp/a"}, {"type": "vm_file", "path": "/tmp/b"}],
+            "expected": [{"type": "local_file", "path": "b.csv"}, {}],
+        },
+    )
+    (old.folder / "a.csv").write_text("a\n")
+    (new.folder / "b.csv").write_text("b\n")
+
+    plan = compile_task(old, CONFIG, EVAL)
+    assert plan.ok, plan.problems
+    assert [(s.name, s.func) for s in plan.config] == [("upload_file_to_vm", upload_file_to_vm)]
+    assert [s.func for s in plan.evaluators] == [compare_csv]
+
+    plan = compile_task(new, CONFIG, EVAL)
+    assert plan.ok, plan.problems
+    assert [s.func for s in plan.evaluators] == [compare_csv, check_file]
+    assert plan.combine([1.0, 0.0]) == 1.0
+
+
+def test_lists_what_stops_a_task(tmp_path):
+    root = tmp_path / "evaluation_examples" / "examples"
+    spec = _spec(
+        root,
+        "t1",
+        config=[_upload("missing.csv"), {"type": "launch", "parameters": {}}],
+        evaluator={"func": "compare_csv", "result": {"path": "/tmp/a"}, "options": {"bogus": True}},
+    )
+    plan = compile_task(spec, CONFIG, EVAL)
+    assert not plan.ok
+    assert plan.missing == ["launch"]
+    assert "config[1]: missing file missing.csv" in plan.problems
+    assert any(p.startswith("evaluator: compare_csv()") for p in plan.problems)
+    assert plan_report([plan])["missing_handlers"] == {"launch": 1}
+
+
+def test_files_anchored_at_benchmark_dir(tmp_path):
+    root = tmp_path / "evaluation_examples" / "examples"
+    (tmp_path / "evaluation_examples" / "settings").mkdir(parents=True)
+    (tmp_path / "evaluation_examples" / "settings" / "s.json").write_text("{}")
+    spec = _spec(root, "t1", config=[_upload("evaluation_examples/settings/s.json")], evaluation={"func": "check_file"})
+    assert compile_task(spec, CONFIG, EVAL).problems == [
+        "evaluator: check_file() missing a required argument: 'result'"
+    ]
+
+
+def test_shallow_examples_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    spec = _spec(Path("examples"), "t1", config=[_upload("missing.csv")], evaluation={})
+    assert compile_task(spec, CONFIG, EVAL).problems == ["config[1]: missing file missing.csv", "no evaluator"]
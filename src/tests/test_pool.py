@@ -0,0 +1,93 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from orchestration.pool import PoolExhaustedError, WarmPool
+
+
+class FakeExecutor:
+    def __init__(self, name):
+        self.vm = SimpleNamespace(cfg=SimpleNamespace(container_name=name))
+        self.healthy = True
+        self.resets = 0
+
+    def is_healthy(self):
+        return self.healthy
+
+    def reset(self):
+        self.resets += 1
+
+
+class Factory:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.booted, self.torn_down = [], []
+        self._lock = threading.Lock()
+
+    def boot(self, name):
+        with self._lock:
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("container exited")
+            self.booted.append(name)
+        return FakeExecutor(name)
+
+    def pool(self, **kwargs):
+        return WarmPool(factory=self.boot, teardown=lambda e: self.torn_down.append(e), **kwargs)
+
+
+def test_boot_budget_is_spent_then_exhausted():
+    factory = Factory()
+    pool = factory.pool(size=2, max_boots=3)
+    pool.start()
+    leased = [pool.lease(timeout=5) for _ in range(3)]
+    for executor in leased:
+        pool.release(executor)
+    with pytest.raises(PoolExhaustedError):
+        pool.lease(timeout=5)
+    assert len(factory.booted) == 3 and len(factory.torn_down) == 3
+    pool.shutdown()
+
+
+def test_retry_gets_a_boot_of_its_own():
+    # One task, one infra failure: the retry lease needs a second boot
+    factory = Factory()
+    pool = factory.pool(size=1, max_boots=1)
+    pool.start()
+    pool.release(pool.lease(timeout=5))  # Torn down after the infra failure
+    pool.add_boots()
+    pool.release(pool.lease(timeout=5))
+    assert len(factory.booted) == 2
+    pool.shutdown()
+
+
+def test_failed_boots_do_not_spend_the_budget():
+    factory = Factory(failures=2)
+    pool = factory.pool(size=1, max_boots=1, max_boot_failures=3)
+    pool.start()
+    pool.release(pool.lease(timeout=5))
+    assert len(factory.booted) == 1
+    pool.shutdown()
+
+
+def test_unhealthy_idle_vm_is_replaced():
+    factory = Factory()
+    pool = factory.pool(size=1, max_boots=1)
+    pool.start()
+    first = pool.lease(timeout=5)
+    first.healthy = False
+    pool.release(first, recycle=True)  # Unhealthy after the reset → torn down, not pooled
+    assert factory.torn_down == [first] and first.resets == 1
+    pool.shutdown()
+
+
+def test_recycled_vm_is_leased_again():
+    factory = Factory()
+    pool = factory.pool(size=1, max_boots=1)
+    pool.start()
+    first = pool.lease(timeout=5)
+    pool.release(first, recycle=True)
+    assert pool.lease(timeout=5) is first
+    assert len(factory.booted) == 1
+    pool.shutdown()
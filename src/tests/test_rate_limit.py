@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from agent.utils.rate_limit import RateLimitedModel, RateLimiter, RateLimits
+
+
+def _call(limiter, **outcome):
+    reserved = limiter.acquire(100)
+    limiter.release(reserved, 100, outcome.pop("latency", 0.1), **outcome)
+    return limiter.stats()["window"]
+
+
+def test_aimd_window(tmp_path):
+    limits = RateLimits(max_concurrency=8, min_concurrency=1, slow_latency=5.0)
+    limiter = RateLimiter(limits, tmp_path / "limit.json")
+    assert _call(limiter) == 8  # Capped at max_concurrency
+    assert _call(limiter, rate_limited=True, pause=0.01) == 4  # Multiplicative decrease
+    assert _call(limiter) == 4.25  # Additive increase of 1/window
+    assert _call(limiter, latency=6.0) == pytest.approx(4.25 * 0.9, abs=0.01)  # Slow completion
+    assert _call(limiter, failed=True) == pytest.approx(4.25 * 0.9, abs=0.01)  # Other errors leave it alone
+    for _ in range(4):
+        _call(limiter, rate_limited=True, pause=0.01)
+    assert limiter.stats()["window"] == 1  # Floor at min_concurrency
+    assert limiter.stats()["rate_limited"] == 5
+
+
+def test_window_and_pause_are_shared_through_the_state_file(tmp_path):
+    limits = RateLimits(max_concurrency=8)
+    first, second = RateLimiter(limits, tmp_path / "limit.json"), RateLimiter(limits, tmp_path / "limit.json")
+    _call(first, rate_limited=True, pause=0.3)
+    t0 = time.perf_counter()
+    second.release(second.acquire(100), 100, 0.1)
+    assert time.perf_counter() - t0 >= 0.2  # Waited out the other limiter's Retry-After
+    assert second.stats()["window"] == pytest.approx(4.25)
+
+
+def test_inflight_calls_are_capped_by_the_window(tmp_path):
+    limiter = RateLimiter(RateLimits(max_concurrency=1), tmp_path / "limit.json")
+    reserved = limiter.acquire(100)
+    entered = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.acquire(100), entered.set()))
+    thread.start()
+    assert not entered.wait(0.2)
+    limiter.release(reserved, 100, 0.1)
+    assert entered.wait(2)
+    thread.join()
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class ThrottledModel:
+    model_id = "throttled"
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, messages, **kwargs):
+        self.calls += 1
+        raise RateLimitError("slow down")
+
+
+def test_the_429_that_exhausts_the_retries_is_still_a_429(monkeypatch, tmp_path):
+    monkeypatch.setattr("agent.utils.rate_limit.retry_after", lambda e: 0.01)
+    limiter = RateLimiter(RateLimits(max_concurrency=8, max_retries=2), tmp_path / "limit.json")
+    model = ThrottledModel()
+    with pytest.raises(RateLimitError):
+        RateLimitedModel(model, limiter).generate([{"role": "user", "content": "hi"}])
+    assert model.calls == 3
+    assert limiter.stats()["rate_limited"] == 3
+    assert limiter.stats()["window"] == 1
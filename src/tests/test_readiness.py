@@ -0,0 +1,34 @@
+import time
+
+import pytest
+
+from sandbox.errors import VMCreationError
+from sandbox.readiness import Backoff, Readiness
+
+
+def _probe_ready_on(call: int):
+    calls = []
+
+    def probe() -> bool:
+        calls.append(time.monotonic())
+        return len(calls) >= call
+
+    return probe, calls
+
+
+def test_earlier_mark_does_not_skip_the_backoff():
+    readiness = Readiness("vm", final="ssh")
+    readiness.mark("qemu")  # Sets the wake event before the next phase is waited for
+    probe, calls = _probe_ready_on(2)
+    readiness.wait("tcp", probe, time.monotonic() + 5, Backoff(initial=0.2, jitter=0))
+    assert calls[1] - calls[0] >= 0.15
+    assert list(readiness.phases) == ["qemu", "tcp"]
+
+
+def test_failure_and_deadline():
+    readiness = Readiness("vm", final="ssh")
+    with pytest.raises(TimeoutError):
+        readiness.wait("tcp", lambda: False, time.monotonic() + 0.1, Backoff(initial=0.02))
+    readiness.fail("container exited (1)")
+    with pytest.raises(VMCreationError):
+        readiness.wait("banner", lambda: True, time.monotonic() + 5)
@@ -0,0 +1,80 @@
+import os
+import threading
+import time
+
+import pytest
+
+from orchestration.reaper import Reaper
+from sandbox.virtualmachine import orphan_snapshot_dirs
+
+
+class SlowTeardown:
+    """Teardown that blocks until released; executors named "bad" fail."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.done = []
+
+    def __call__(self, executor):
+        self.release.wait(5)
+        if executor == "bad":
+            raise RuntimeError("container would not stop")
+        self.done.append(executor)
+
+
+def test_submit_returns_at_once_and_wait_blocks_until_reaped():
+    teardown = SlowTeardown()
+    reaper = Reaper(teardown, workers=1)
+    reaper.submit("vm-1", "sandbox-1")
+    assert reaper.stats() == {"pending": 1, "reaped": 0, "failed": 0}
+
+    waited = threading.Thread(target=reaper.wait, args=("sandbox-1",))
+    waited.start()
+    waited.join(0.1)
+    assert waited.is_alive()
+    teardown.release.set()
+    waited.join(5)
+    assert teardown.done == ["vm-1"]
+    reaper.shutdown()
+    assert reaper.stats() == {"pending": 0, "reaped": 1, "failed": 0}
+
+
+def test_submit_blocks_at_max_pending():
+    teardown = SlowTeardown()
+    reaper = Reaper(teardown, workers=1, max_pending=2)
+    reaper.submit("vm-1", "sandbox-1")
+    reaper.submit("vm-2", "sandbox-2")
+    third = threading.Thread(target=reaper.submit, args=("vm-3", "sandbox-3"))
+    third.start()
+    third.join(0.1)
+    assert third.is_alive()
+    teardown.release.set()
+    third.join(5)
+    reaper.shutdown()
+    assert teardown.done == ["vm-1", "vm-2", "vm-3"]
+
+
+def test_failed_teardown_is_counted():
+    teardown = SlowTeardown()
+    teardown.release.set()
+    reaper = Reaper(teardown, workers=2)
+    reaper.submit("bad", "sandbox-1")
+    reaper.submit("vm-2", "sandbox-2")
+    reaper.shutdown()
+    assert reaper.stats() == {"pending": 0, "reaped": 1, "failed": 1}
+
+
+def test_needs_a_worker():
+    with pytest.raises(ValueError):
+        Reaper(lambda executor: None, workers=0)
+
+
+def test_orphan_snapshot_dirs(tmp_path):
+    old = time.time() - 3600
+    names = ["sandbox-live", "sandbox-dead", "sandbox-task-samples", "sandbox-gone-samples", "setup", "sandbox-new"]
+    for name in names:
+        (tmp_path / name).mkdir()
+        if name != "sandbox-new":
+            os.utime(tmp_path / name, (old, old))
+    live = ["sandbox-live", "sandbox-task-s2"]
+    assert [p.name for p in orphan_snapshot_dirs(tmp_path, live)] == ["sandbox-dead", "sandbox-gone-samples"]
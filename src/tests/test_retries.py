@@ -0,0 +1,51 @@
+import asyncio
+import itertools
+from pathlib import Path
+
+import pytest
+
+import orchestrator
+from orchestration import HostCapacity, InfraError, RetryPolicy
+from orchestration.failures import CAPACITY, classify
+from orchestration.pool import PoolExhaustedError
+from simulation import SimBackend, generate_examples
+
+GB = 1024**3
+
+
+def test_pool_exhaustion_is_not_retried():
+    assert classify(PoolExhaustedError("Warm pool has no executors left to lease"), "booting") == CAPACITY
+
+
+@pytest.mark.parametrize("infra_failures", [1, 4])
+def test_every_task_runs_despite_infra_failures(monkeypatch, tmp_path, infra_failures):
+    """The warm pool's boot budget is one per task; each infra retry must still get a fresh VM."""
+    examples, results = tmp_path / "examples", tmp_path / "results"
+    mapping = generate_examples(examples, 6)
+    acted = []
+    failures = itertools.count()
+    act = orchestrator.Orchestrator._act
+
+    def flaky_act(self, spec):
+        if next(failures) < infra_failures:
+            raise InfraError(f"injected: sandbox of {spec.uid} died")
+        act(self, spec)
+        acted.append(spec.uid)
+
+    monkeypatch.setattr(orchestrator.Orchestrator, "_act", flaky_act)
+    orch = orchestrator.Orchestrator(
+        2,
+        mapping,
+        examples,
+        results_root=results,
+        warm_pool=2,
+        capacity=HostCapacity(ram_bytes=64 * GB, cpu_cores=64, disk_bytes=64 * GB, disk_path=Path(tmp_path)),
+        backend=SimBackend(tmp_path / "sim", speed=1000),
+        retry_policy=RetryPolicy(max_attempts=infra_failures + 1),
+    )
+    assert orch.warm_pool.max_boots == len(orch.tasks)
+    asyncio.run(orch.run_all())
+
+    assert sorted(acted) == sorted(uid for uids in mapping.values() for uid in uids)
+    assert all(task.failure is None for task in orch.tasks)
+    assert sum(task.attempt - 1 for task in orch.tasks) == infra_failures
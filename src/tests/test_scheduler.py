@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from orchestration.scheduler import HostCapacity, ResourceScheduler, VMProfile, parse_size
+
+MB = 1024**2
+
+
+def _scheduler(tmp_path, cpu_cores=2, max_conc=None):
+    capacity = HostCapacity(ram_bytes=64 * MB, cpu_cores=cpu_cores, disk_bytes=64 * MB, disk_path=tmp_path)
+    return ResourceScheduler(capacity, max_conc=max_conc, poll_interval=0.05)
+
+
+def _profile(cpu_cores):
+    return VMProfile(ram_bytes=MB, cpu_cores=cpu_cores, disk_bytes=MB)
+
+
+def test_parse_size():
+    assert parse_size("2048") == 2048
+    assert parse_size("512M") == 512 * MB
+    assert parse_size("4G") == parse_size("4GiB") == parse_size("4gb") == 4 * 1024**3
+    assert parse_size("1.5K") == 1536
+    assert parse_size(7) == 7
+    with pytest.raises(ValueError):
+        parse_size("four gigs")
+
+
+def test_admits_in_fifo_order(tmp_path):
+    scheduler, admitted = _scheduler(tmp_path), []
+
+    async def task(uid, cpu_cores):
+        async with scheduler.admit(uid, _profile(cpu_cores)):
+            admitted.append(uid)
+            await asyncio.sleep(0.05)
+
+    async def run():
+        # "small" would fit next to "first", but must not overtake "big" queued before it
+        await asyncio.gather(task("first", 1), task("big", 2), task("small", 1))
+
+    asyncio.run(run())
+    assert admitted == ["first", "big", "small"]
+
+
+def test_oversized_task_runs_alone(tmp_path):
+    scheduler, log = _scheduler(tmp_path), []
+
+    async def task(uid, cpu_cores):
+        async with scheduler.admit(uid, _profile(cpu_cores)):
+            log.append(("in", uid, scheduler.running))
+            await asyncio.sleep(0.05)
+            log.append(("out", uid))
+
+    async def run():
+        await asyncio.gather(task("huge", 16), task("small", 1))
+
+    asyncio.run(run())
+    assert log == [("in", "huge", 1), ("out", "huge"), ("in", "small", 1), ("out", "small")]
+
+
+def test_cancelled_waiter_leaves_the_queue(tmp_path):
+    scheduler, admitted = _scheduler(tmp_path, max_conc=1), []
+
+    async def task(uid, hold):
+        async with scheduler.admit(uid, _profile(1)):
+            admitted.append(uid)
+            await asyncio.sleep(hold)
+
+    async def run():
+        first = asyncio.create_task(task("first", 0.1))
+        await asyncio.sleep(0.01)
+        doomed = asyncio.create_task(task("doomed", 0))
+        last = asyncio.create_task(task("last", 0))
+        await asyncio.sleep(0.01)
+        assert scheduler.queued == 2
+        doomed.cancel()
+        await asyncio.wait_for(asyncio.gather(first, last), 2)
+
+    asyncio.run(run())
+    assert admitted == ["first", "last"]
+    assert scheduler.running == 0 and scheduler.queued == 0
@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+from orchestration.settle import SettleConfig, flush_artifacts, wait_until_settled
+
+
+class FakeSSH:
+    """Probe fails `busy` times, then exits 0."""
+
+    def __init__(self, busy):
+        self.busy = busy
+        self.commands = []
+
+    def exec_command(self, command):
+        self.commands.append(command)
+        if len(self.commands) <= self.busy:
+            raise RuntimeError("exit status 1")
+
+
+def _task(tmp_path):
+    result = tmp_path / "results" / "t1"
+    (result / "nested").mkdir(parents=True)
+    (result / "score.txt").write_text("1.0")
+    (result / "nested" / "log.txt").write_text("ok")
+    return SimpleNamespace(uid="t1", result=result)
+
+
+def test_flush_artifacts(tmp_path):
+    assert flush_artifacts(tmp_path / "missing") == 0
+    assert flush_artifacts(_task(tmp_path).result) == 2
+
+
+def test_settles_once_the_probe_passes(tmp_path):
+    agent = SimpleNamespace(ssh=FakeSSH(busy=2))
+    cfg = SettleConfig(probe="pgrep -x dbt && exit 1 || exit 0", timeout=5, interval=0.01)
+    assert wait_until_settled(_task(tmp_path), agent, cfg)
+    assert agent.ssh.commands == [cfg.probe] * 3
+
+
+def test_released_when_the_probe_times_out(tmp_path):
+    agent = SimpleNamespace(ssh=FakeSSH(busy=10**6))
+    assert not wait_until_settled(_task(tmp_path), agent, SettleConfig(probe="false", timeout=0.05, interval=0.01))
+
+
+def test_no_probe_settles_after_the_flush(tmp_path):
+    agent = SimpleNamespace(ssh=FakeSSH(busy=10**6))
+    assert wait_until_settled(_task(tmp_path), agent, SettleConfig())
+    assert agent.ssh.commands == []
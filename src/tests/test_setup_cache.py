@@ -0,0 +1,41 @@
+import json
+from pathlib import Path
+
+from orchestration.setup_cache import plan_setup_snapshots
+from orchestrator import TaskSpec
+
+UPLOAD = {"type": "upload_file_to_vm", "parameters": {"local_path": "shared.csv", "remote_path": "/home/user/data.csv"}}
+LAUNCH = {"type": "launch", "parameters": {"command": ["code"]}}
+
+
+def _task(root, tool, uid, config):
+    folder = root / tool / uid
+    folder.mkdir(parents=True, exist_ok=True)
+    meta = {"instruction": f"do {uid}", "config": config}
+    (folder / f"{uid}.json").write_text(json.dumps(meta))
+    return TaskSpec(tool, uid, root, root / "results")
+
+
+def test_shared_disk_prefix_gets_one_key(tmp_path):
+    root = tmp_path / "evaluation_examples" / "examples"
+    (tmp_path / "shared.csv").write_text("a,b\n1,2\n")  # Anchored at the benchmark dir
+    tasks = [_task(root, "dbt", "t1", [UPLOAD, LAUNCH]), _task(root, "dbt", "t2", [UPLOAD])]
+    plan_setup_snapshots(tasks, base_image=tmp_path / "base.img")
+    assert tasks[0].setup_key == tasks[1].setup_key
+    assert tasks[0].setup_key[1] == 1
+
+
+def test_no_key_without_setup_or_shared_prefix(tmp_path):
+    root = tmp_path / "evaluation_examples" / "examples"
+    tasks = [_task(root, "dbt", "t1", [LAUNCH]), _task(root, "excel", "t2", [UPLOAD])]
+    plan_setup_snapshots(tasks, base_image=tmp_path / "base.img")
+    assert [spec.setup_key for spec in tasks] == [None, None]
+
+
+def test_shallow_examples_root(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = Path("examples")
+    tasks = [_task(root, "dbt", "t1", [UPLOAD]), _task(root, "dbt", "t2", [UPLOAD])]
+    (root / "dbt" / "setup.sh").write_text("echo setup\n")
+    plan_setup_snapshots(tasks, base_image=tmp_path / "base.img")
+    assert tasks[0].setup_key == tasks[1].setup_key
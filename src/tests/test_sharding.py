@@ -0,0 +1,34 @@
+import pytest
+
+from orchestration.sharding import assign_shards, parse_shard, shard_mapping
+
+COSTS = {"a": 10.0, "b": 7.0, "c": 5.0, "d": 4.0, "e": 3.0, "f": 1.0}
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for bad in ("0/4", "5/4", "2", "a/b", "-1/4"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_assign_shards_balances_cost():
+    shards = assign_shards(COSTS, 2)
+    assert sorted(uid for shard in shards for uid in shard) == sorted(COSTS)
+    assert shards == [["a", "d", "f"], ["b", "c", "e"]]
+    assert [sum(COSTS[u] for u in shard) for shard in shards] == [15.0, 15.0]
+
+
+def test_assign_shards_is_deterministic():
+    # Equal costs are split by uid, whatever order the selection came in
+    costs = {f"task-{i}": 1.0 for i in range(9)}
+    reversed_costs = dict(reversed(list(costs.items())))
+    assert assign_shards(costs, 3) == assign_shards(reversed_costs, 3)
+
+
+def test_shard_mappings_partition_the_selection():
+    mapping = {"excel": ["a", "b", "c"], "jupyter": ["d", "e", "f"]}
+    parts = [shard_mapping(mapping, COSTS, i, 3) for i in (1, 2, 3)]
+    seen = [(tool, uid) for part in parts for tool, uids in part.items() for uid in uids]
+    assert sorted(seen) == sorted((tool, uid) for tool, uids in mapping.items() for uid in uids)
+    assert all(uids for part in parts for uids in part.values())  # No empty tools
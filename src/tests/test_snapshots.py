@@ -0,0 +1,60 @@
+import os
+
+from sandbox import disks
+from sandbox.snapshots import SnapshotStore
+
+MB = 1024**2
+
+
+def _write_image(path, size=MB):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def _write_overlay(path, backing):
+    """Just enough of a qcow2 header for `disks.backing_file` to follow."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    name = str(backing).encode()
+    offset = disks._QCOW2_HEADER.size
+    path.write_bytes(disks._QCOW2_HEADER.pack(disks.QCOW2_MAGIC, 3, offset, len(name)) + name)
+    return path
+
+
+def _store(tmp_path, budget):
+    store = SnapshotStore(budget, root=tmp_path / "snapshots" / "setup")
+    for age, fingerprint in enumerate(("old", "mid", "new")):
+        _write_image(store.image(fingerprint))
+        mtime = 1_000_000 + age
+        os.utime(store.image(fingerprint).parent, (mtime, mtime))
+    return store
+
+
+def test_evicts_least_recently_used_first(tmp_path):
+    store = _store(tmp_path, budget=2 * MB)
+    store.enforce_budget(keep="new")
+    assert [d.name for d, _, _ in store.entries()] == ["mid", "new"]
+
+
+def test_keeps_snapshots_backing_live_overlays(tmp_path):
+    store = _store(tmp_path, budget=MB)
+    _write_overlay(tmp_path / "snapshots" / "sandbox-1" / "data.img", store.image("old"))
+    store.enforce_budget(keep="new")
+    assert store.lookup("old") is not None
+    assert store.lookup("mid") is None
+
+
+def test_evicts_once_the_overlay_is_gone(tmp_path):
+    store = _store(tmp_path, budget=MB)
+    overlay = _write_overlay(tmp_path / "snapshots" / "sandbox-1" / "data.img", store.image("old"))
+    store.enforce_budget(keep="new")
+    overlay.unlink()
+    store.enforce_budget(keep="new")
+    assert [d.name for d, _, _ in store.entries()] == ["new"]
+
+
+def test_keeps_new_snapshot_when_only_pinned_ones_are_left(tmp_path):
+    store = _store(tmp_path, budget=MB)
+    _write_overlay(tmp_path / "snapshots" / "sandbox-1" / "data.img", store.image("old"))
+    store.enforce_budget(keep="new")
+    assert [d.name for d, _, _ in store.entries()] == ["old", "new"]